@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CampaignRequest, MetaAdsConfig, CampaignCreativeFile, CampaignActivityLog
+from .models import CampaignRequest, MetaAdsConfig, CampaignCreativeFile, CampaignActivityLog, FacebookPushJob, MetaAdImage
 
 
 class CampaignCreativeFileInline(admin.TabularInline):
@@ -133,3 +133,38 @@ class CampaignActivityLogAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(FacebookPushJob)
+class FacebookPushJobAdmin(admin.ModelAdmin):
+    """Facebook gönderim işleri (manage.py run_facebook_push_jobs çalıştırır) - salt okunur"""
+
+    list_display = ['id', 'campaign_request', 'status', 'current_step', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['campaign_request__campaign_name', 'error']
+    readonly_fields = [
+        'campaign_request', 'status', 'current_step', 'steps', 'error', 'requested_by',
+        'created_at', 'started_at', 'finished_at'
+    ]
+    ordering = ['-created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MetaAdImage)
+class MetaAdImageAdmin(admin.ModelAdmin):
+    """Meta'ya yüklenmiş görsel önbelleği - salt okunur (kayıt silinirse görsel tekrar yüklenir)"""
+
+    list_display = ['ad_account_id', 'content_sha256', 'image_hash', 'created_at']
+    search_fields = ['content_sha256', 'image_hash']
+    readonly_fields = ['ad_account_id', 'content_sha256', 'image_hash', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
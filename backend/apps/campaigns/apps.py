@@ -9,6 +9,11 @@ class CampaignsConfig(AppConfig):
     def ready(self):
         """Import signals when app is ready"""
         import apps.campaigns.signals
+        
+        # Kayıt değişince cache'lenmiş status istatistiklerini geçersiz kıl
+        from config.status_stats import register_status_statistics
+        from .models import CampaignRequest
+        register_status_statistics(CampaignRequest)
 
 
 
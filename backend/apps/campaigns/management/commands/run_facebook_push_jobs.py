@@ -0,0 +1,108 @@
+import logging
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.campaigns.models import MetaAdsConfig
+from apps.campaigns.services.facebook_push import process_facebook_push_jobs, push_queue_depth
+from apps.campaigns.services.meta_api_client import get_meta_api_usage
+from config.db_router import brand_context
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Facebook gönderim işlerini (FacebookPushJob) çalıştıran worker; varsayılan olarak sürekli çalışır'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Kuyruktaki işleri çalıştırıp çık'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Kuyruk boşken bekleme süresi (saniye)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.FB_PUSH_BATCH_SIZE,
+            help='Graph API batch isteğiyle birlikte gönderilecek iş sayısı (1: tek tek)'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Sadece kuyruk durumunu yazdır'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+
+        if options['stats']:
+            for brand in brands:
+                self.report(brand)
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            processed = 0
+            for brand in brands:
+                if self.stopping:
+                    break
+                with brand_context(brand):
+                    try:
+                        # Markalar arasında sırayla: her turda marka başına bir batch
+                        count = process_facebook_push_jobs(
+                            limit=options['batch_size'], batch_size=options['batch_size']
+                        )
+                    except Exception:
+                        logger.exception(f"[PushToFB] {brand} iş çalıştırılamadı")
+                        continue
+                if count:
+                    self.stdout.write(f'  [{brand}] {count} iş çalıştırıldı')
+                processed += count
+
+            if options['once'] and not processed:
+                for brand in brands:
+                    self.report(brand)
+                break
+
+            if not processed:
+                connections.close_all()
+                time.sleep(options['interval'])
+
+    def report(self, brand):
+        with brand_context(brand):
+            stats = push_queue_depth()
+            config = MetaAdsConfig.get_config()
+            usage = get_meta_api_usage(config.ad_account_id) if config else None
+        self.stdout.write(
+            f"[{brand}] kuyruk: {stats['queued']} kuyrukta, {stats['running']} çalışan, "
+            f"en eski kuyruktaki {stats['oldest_queued_s']}s"
+        )
+        if usage:
+            pct = usage['usage']['pct'] if usage['usage'] else '-'
+            self.stdout.write(
+                f"[{brand}] Meta API {usage['ad_account_id']}: kullanım %{pct}, "
+                f"pencere kapasitesi {usage['capacity']}, durdurulmuş {usage['paused_for_seconds']}s"
+            )
+
+    def stop(self, *args):
+        # Çalışan iş bitirilir, yenisi alınmaz
+        self.stopping = True
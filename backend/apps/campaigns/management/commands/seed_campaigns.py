@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import router, transaction
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
@@ -6,7 +7,8 @@ import random
 
 from apps.campaigns.models import CampaignRequest
 from apps.dealers.models import Dealer
-from config.db_router import set_current_brand
+from apps.dealers.budgets import BudgetError
+from config.db_router import brand_command
 
 
 class Command(BaseCommand):
@@ -32,14 +34,12 @@ class Command(BaseCommand):
             help='Önce mevcut kayıtları sil'
         )
 
+    @brand_command
     def handle(self, *args, **options):
         brand = options['brand']
         count = options['count']
         clear = options['clear']
 
-        # Set database context for brand
-        set_current_brand(brand)
-
         # Mevcut bayileri al
         dealers = list(Dealer.objects.all())
         if not dealers:
@@ -204,24 +204,30 @@ class Command(BaseCommand):
                 admin_notes = "\n".join(notes_list)
 
             # Create campaign request
-            campaign = CampaignRequest.objects.create(
-                dealer=dealer,
-                campaign_name=campaign_name,
-                budget=budget,
-                start_date=start_date,
-                end_date=end_date,
-                platforms=platforms,
-                campaign_type=CampaignRequest.CampaignType.LINK,  # Default
-                fb_post_link="",
-                ig_post_link="",
-                post_images=[],
-                story_images=[],
-                redirect_type=redirect_type,
-                ad_model=ad_model,
-                notes=notes,
-                status=status,
-                admin_notes=admin_notes,
-            )
+            # Onay bekleyen / onaylı talepler plandan bütçe düşer; plan yetmezse atla
+            try:
+                with transaction.atomic(using=router.db_for_write(CampaignRequest)):
+                    campaign = CampaignRequest.objects.create(
+                        dealer=dealer,
+                        campaign_name=campaign_name,
+                        budget=budget,
+                        start_date=start_date,
+                        end_date=end_date,
+                        platforms=platforms,
+                        campaign_type=CampaignRequest.CampaignType.LINK,  # Default
+                        fb_post_link="",
+                        ig_post_link="",
+                        post_images=[],
+                        story_images=[],
+                        redirect_type=redirect_type,
+                        ad_model=ad_model,
+                        notes=notes,
+                        status=status,
+                        admin_notes=admin_notes,
+                    )
+            except BudgetError as e:
+                self.stdout.write(self.style.WARNING(f'  Atlandı ({campaign_name[:50]}): {e}'))
+                continue
 
             # Manually set created_at
             CampaignRequest.objects.filter(pk=campaign.pk).update(
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0008_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='campaignactivitylog',
+            name='action',
+            field=models.CharField(choices=[('created', 'Oluşturuldu'), ('updated', 'Güncellendi'), ('status_change', 'Durum Değişikliği'), ('fb_push_attempt', 'Facebook Gönderim Denemesi'), ('fb_push_success', 'Facebook Gönderim Başarılı'), ('fb_push_failed', 'Facebook Gönderim Başarısız'), ('fb_push_progress', 'Facebook Gönderim Adımı'), ('fb_status_check', 'Facebook Durum Sorgusu'), ('file_upload', 'Dosya Yüklendi'), ('file_delete', 'Dosya Silindi'), ('note', 'Not Eklendi')], max_length=30, verbose_name='İşlem Tipi'),
+        ),
+        migrations.CreateModel(
+            name='FacebookPushJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Kuyrukta'), ('running', 'Çalışıyor'), ('succeeded', 'Tamamlandı'), ('failed', 'Başarısız')], default='queued', max_length=10, verbose_name='Durum')),
+                ('current_step', models.CharField(blank=True, choices=[('campaign', 'Kampanya'), ('adset', 'Reklam Seti'), ('image', 'Görsel'), ('creative', 'Creative'), ('ad', 'Reklam')], max_length=10, verbose_name='Aktif Adım')),
+                ('steps', models.JSONField(blank=True, default=dict, help_text='{adım: {"status": "done" | "failed", "at": ISO tarih, ...detaylar}}', verbose_name='Adımlar')),
+                ('error', models.TextField(blank=True, verbose_name='Hata')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Başlangıç')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş')),
+                ('campaign_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fb_push_jobs', to='campaigns.campaignrequest', verbose_name='Kampanya Talebi')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fb_push_jobs', to=settings.AUTH_USER_MODEL, verbose_name='İsteyen')),
+            ],
+            options={
+                'verbose_name': 'Facebook Gönderim İşi',
+                'verbose_name_plural': 'Facebook Gönderim İşleri',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['created_at'], name='fbpush_queued')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('campaign_request',), name='fbpush_one_active')],
+            },
+        ),
+    ]
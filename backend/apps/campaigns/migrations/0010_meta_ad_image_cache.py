@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0009_facebook_push_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaigncreativefile',
+            name='content_sha256',
+            field=models.CharField(blank=True, editable=False, help_text='Meta görsel önbelleği anahtarı (MetaAdImage)', max_length=64, verbose_name='İçerik SHA-256'),
+        ),
+        migrations.CreateModel(
+            name='MetaAdImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ad_account_id', models.CharField(max_length=100, verbose_name='Reklam Hesabı ID')),
+                ('content_sha256', models.CharField(max_length=64, verbose_name='İçerik SHA-256')),
+                ('image_hash', models.CharField(max_length=100, verbose_name='Meta Image Hash')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Meta Görseli',
+                'verbose_name_plural': 'Meta Görselleri',
+                'unique_together': {('ad_account_id', 'content_sha256')},
+            },
+        ),
+    ]
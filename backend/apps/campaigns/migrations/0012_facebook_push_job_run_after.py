@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0011_search_document_dealer_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facebookpushjob',
+            name='run_after',
+            field=models.DateTimeField(blank=True, help_text='Meta API limiti nedeniyle tekrar kuyruğa alınan iş bu zamandan önce alınmaz', null=True, verbose_name='Tekrar Deneme Zamanı'),
+        ),
+    ]
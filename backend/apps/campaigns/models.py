@@ -1,11 +1,42 @@
+import hashlib
 import uuid
 import os
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.core.exceptions import ValidationError
+from config.change_tracking import ChangeTrackingMixin
+from config.search import SearchDocumentMixin
 from apps.dealers.models import Dealer, Brand
 
 
+def file_sha256(chunks, sink=None) -> str:
+    """İçerik SHA-256'sı; chunk'lar sırayla işlenir (sink verilirse içerik oraya da yazılır)."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return digest.hexdigest()
+
+
+def storage_chunks(field_file):
+    """
+    Storage'daki dosyanın içeriği chunk chunk. AzureStorage.open() blob'un
+    tamamını önce SpooledTemporaryFile'a indirir (büyük dosyada diske taşar);
+    Azure'da blob doğrudan indirme akışından okunur. Diğer storage'larda
+    (yerel dosya sistemi) dosya açılıp okunur.
+    """
+    storage = field_file.storage
+    client = getattr(storage, 'client', None)
+    if hasattr(client, 'download_blob'):
+        yield from client.download_blob(storage._get_valid_path(field_file.name), timeout=storage.timeout).chunks()
+        return
+
+    with field_file.open('rb') as f:
+        yield from f.chunks()
+
+
 def campaign_creative_upload_path(instance, filename):
     """Kampanya kreatif dosyaları için UUID tabanlı dosya yolu"""
     ext = os.path.splitext(filename)[1].lower()
@@ -109,9 +140,12 @@ class MetaAdsConfig(models.Model):
         return cls.objects.filter(is_active=True).first()
 
 
-class CampaignRequest(models.Model):
+class CampaignRequest(ChangeTrackingMixin, SearchDocumentMixin, models.Model):
     """Kampanya Talebi (Campaign Request) model"""
     
+    tracked_fields = ('status', 'dealer', 'created_at', 'budget', 'start_date', 'end_date')
+    search_document_fields = ('campaign_name', 'dealer__dealer_name', 'notes')
+    
     class Status(models.TextChoices):
         TASLAK = 'taslak', 'Taslak'
         ONAY_BEKLIYOR = 'onay_bekliyor', 'Onay Bekliyor'
@@ -338,10 +372,21 @@ class CampaignRequest(models.Model):
         verbose_name='Güncellenme Tarihi'
     )
     
+    # Normalize arama metni (config.search) - save() içinde üretilir
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Arama Metni'
+    )
+    
     class Meta:
         verbose_name = 'Kampanya Talebi'
         verbose_name_plural = 'Kampanya Talepleri'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(name='campaignreq_search_trgm', fields=['search_document'], opclasses=['gin_trgm_ops']),
+        ]
     
     def __str__(self):
         return f"{self.dealer.dealer_name} - {self.campaign_name}"
@@ -393,6 +438,14 @@ class CampaignCreativeFile(models.Model):
         verbose_name='Dosya Tipi'
     )
     
+    content_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name='İçerik SHA-256',
+        help_text='Meta görsel önbelleği anahtarı (MetaAdImage)'
+    )
+    
     uploaded_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Yüklenme Tarihi'
@@ -405,6 +458,33 @@ class CampaignCreativeFile(models.Model):
     
     def __str__(self):
         return f"{self.file_name} ({self.get_file_type_display()})"
+    
+    def save(self, *args, **kwargs):
+        # Yeni yüklenen dosya henüz yerelde: içerik özeti storage'a yazmadan hesaplanır
+        if self.file and not self.file._committed:
+            self.content_sha256 = file_sha256(self.file.chunks())
+        super().save(*args, **kwargs)
+
+
+class MetaAdImage(models.Model):
+    """
+    Meta'ya yüklenmiş görsel önbelleği: içerik SHA-256 + reklam hesabı → image_hash.
+    Aynı içerik (örn. bayilerde tekrar kullanılan marka kreatifi) bir reklam
+    hesabına bir kez yüklenir; sonraki gönderimlerde dosya okunmaz.
+    """
+    
+    ad_account_id = models.CharField(max_length=100, verbose_name='Reklam Hesabı ID')
+    content_sha256 = models.CharField(max_length=64, verbose_name='İçerik SHA-256')
+    image_hash = models.CharField(max_length=100, verbose_name='Meta Image Hash')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')
+    
+    class Meta:
+        verbose_name = 'Meta Görseli'
+        verbose_name_plural = 'Meta Görselleri'
+        unique_together = ['ad_account_id', 'content_sha256']
+    
+    def __str__(self):
+        return f"{self.ad_account_id} {self.content_sha256[:12]} → {self.image_hash}"
 
 
 class CampaignActivityLog(models.Model):
@@ -428,6 +508,7 @@ class CampaignActivityLog(models.Model):
         FB_PUSH_ATTEMPT = 'fb_push_attempt', 'Facebook Gönderim Denemesi'
         FB_PUSH_SUCCESS = 'fb_push_success', 'Facebook Gönderim Başarılı'
         FB_PUSH_FAILED = 'fb_push_failed', 'Facebook Gönderim Başarısız'
+        FB_PUSH_PROGRESS = 'fb_push_progress', 'Facebook Gönderim Adımı'
         FB_STATUS_CHECK = 'fb_status_check', 'Facebook Durum Sorgusu'
         # Dosya
         FILE_UPLOAD = 'file_upload', 'Dosya Yüklendi'
@@ -508,3 +589,93 @@ class CampaignActivityLog(models.Model):
             details=details or {},
         )
 
+
+class FacebookPushJob(models.Model):
+    """
+    Facebook gönderim işi (push-to-facebook).
+    İstek işi kuyruğa alır; Graph API zinciri worker'da çalışır
+    (manage.py run_facebook_push_jobs), ilerleme adım adım steps'e yazılır.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Kuyrukta'
+        RUNNING = 'running', 'Çalışıyor'
+        SUCCEEDED = 'succeeded', 'Tamamlandı'
+        FAILED = 'failed', 'Başarısız'
+
+    class Step(models.TextChoices):
+        CAMPAIGN = 'campaign', 'Kampanya'
+        ADSET = 'adset', 'Reklam Seti'
+        IMAGE = 'image', 'Görsel'
+        CREATIVE = 'creative', 'Creative'
+        AD = 'ad', 'Reklam'
+
+    ACTIVE_STATUSES = (Status.QUEUED, Status.RUNNING)
+
+    campaign_request = models.ForeignKey(
+        CampaignRequest,
+        on_delete=models.CASCADE,
+        related_name='fb_push_jobs',
+        verbose_name='Kampanya Talebi'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name='Durum'
+    )
+    current_step = models.CharField(
+        max_length=10,
+        choices=Step.choices,
+        blank=True,
+        verbose_name='Aktif Adım'
+    )
+    steps = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Adımlar',
+        help_text='{adım: {"status": "done" | "failed", "at": ISO tarih, ...detaylar}}'
+    )
+    error = models.TextField(blank=True, verbose_name='Hata')
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='fb_push_jobs',
+        verbose_name='İsteyen'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Başlangıç')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Bitiş')
+    run_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Tekrar Deneme Zamanı',
+        help_text='Meta API limiti nedeniyle tekrar kuyruğa alınan iş bu zamandan önce alınmaz'
+    )
+
+    class Meta:
+        verbose_name = 'Facebook Gönderim İşi'
+        verbose_name_plural = 'Facebook Gönderim İşleri'
+        ordering = ['-created_at']
+        indexes = [
+            # Worker kuyruğu: sadece kuyruktakiler
+            models.Index(
+                fields=['created_at'],
+                name='fbpush_queued',
+                condition=models.Q(status='queued')
+            ),
+        ]
+        constraints = [
+            # Bir kampanya için aynı anda tek aktif iş
+            models.UniqueConstraint(
+                fields=['campaign_request'],
+                name='fbpush_one_active',
+                condition=models.Q(status__in=['queued', 'running'])
+            ),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.campaign_request_id} ({self.get_status_display()})"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import CampaignRequest, CampaignCreativeFile, CampaignActivityLog
+from .models import CampaignRequest, CampaignCreativeFile, CampaignActivityLog, FacebookPushJob
 
 
 class CampaignCreativeFileSerializer(serializers.ModelSerializer):
@@ -28,6 +28,29 @@ class CampaignActivityLogSerializer(serializers.ModelSerializer):
         return 'Sistem'
 
 
+class FacebookPushJobSerializer(serializers.ModelSerializer):
+    """Facebook gönderim işi; progress tüm adımları sırayla verir (pending / done / failed)"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FacebookPushJob
+        fields = [
+            'id', 'campaign_request', 'status', 'status_display', 'current_step', 'progress',
+            'error', 'requested_by', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        progress = []
+        for step, label in FacebookPushJob.Step.choices:
+            state = obj.steps.get(step, {})
+            if not state and step == obj.current_step and obj.status == FacebookPushJob.Status.RUNNING:
+                state = {'status': 'running'}
+            progress.append({'step': step, 'label': label, 'status': 'pending', **state})
+        return progress
+
+
 class CampaignRequestSerializer(serializers.ModelSerializer):
     """Serializer for CampaignRequest (List view)"""
     dealer_name = serializers.CharField(source='dealer.dealer_name', read_only=True)
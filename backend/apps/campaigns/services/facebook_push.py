@@ -0,0 +1,377 @@
+"""
+Facebook Push Jobs
+
+push-to-facebook Graph API zincirini (kampanya → reklam seti → görsel →
+creative → reklam; ardışık 4-6 çağrı + görsel indirme/yükleme) HTTP isteği
+içinde çalıştırmaz. İstek FacebookPushJob'ı kuyruğa alır ve 202 döner;
+worker (manage.py run_facebook_push_jobs) işi FOR UPDATE SKIP LOCKED ile
+alıp çalıştırır. Her adım tamamlandıkça job.steps, CampaignRequest.fb_push_status
+ve CampaignActivityLog güncellenir.
+
+Meta API limiti uzun süre doluysa (MetaApiThrottled) iş başarısız sayılmaz:
+tamamlanan adımlarıyla run_after'a kadar tekrar kuyruğa alınır ve sonraki
+denemede kaldığı adımdan sürdürülür.
+
+İlerleme: GET /api/campaigns/requests/{id}/push-status/
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from apps.campaigns.models import CampaignActivityLog, CampaignRequest, FacebookPushJob
+
+logger = logging.getLogger(__name__)
+
+STEP_ORDER = list(FacebookPushJob.Step.values)
+# Sonucu Facebook nesne id'si olan adımlar (görsel adımı image_hash kaydeder)
+CHAIN_STEPS = [step for step in STEP_ORDER if step != FacebookPushJob.Step.IMAGE]
+
+
+class PushAlreadyQueued(Exception):
+    """Kampanya için kuyrukta / çalışan bir gönderim işi zaten var."""
+
+    def __init__(self, job):
+        super().__init__(f'Facebook gönderim işi #{job.pk if job else "?"} zaten kuyrukta')
+        self.job = job
+
+
+def _active_job(campaign_request):
+    return campaign_request.fb_push_jobs.filter(status__in=FacebookPushJob.ACTIVE_STATUSES).first()
+
+
+def enqueue_facebook_push(campaign_request, user=None) -> FacebookPushJob:
+    """
+    Gönderim işini kuyruğa al (fb_push_status: pending).
+
+    Raises:
+        PushAlreadyQueued: Kampanyanın kuyrukta / çalışan işi varsa
+    """
+    active = _active_job(campaign_request)
+    if active:
+        raise PushAlreadyQueued(active)
+
+    try:
+        # Brand DB'sinde ('default' ayrı bağlantıdır): iş, durum ve log birlikte commit edilir
+        with transaction.atomic(using=router.db_for_write(FacebookPushJob)):
+            job = FacebookPushJob.objects.create(campaign_request=campaign_request, requested_by=user)
+            campaign_request.fb_push_status = CampaignRequest.FBPushStatus.PENDING
+            campaign_request.fb_push_error = ''
+            campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
+
+            CampaignActivityLog.log(
+                campaign_request=campaign_request,
+                action=CampaignActivityLog.ActionType.FB_PUSH_ATTEMPT,
+                message='Facebook kampanya oluşturma kuyruğa alındı',
+                user=user,
+                details={'job_id': job.pk},
+            )
+    except IntegrityError:
+        # Eşzamanlı istek aynı kampanyayı kuyruğa aldı (fbpush_one_active)
+        raise PushAlreadyQueued(_active_job(campaign_request))
+
+    logger.info(f'[PushToFB] Kampanya #{campaign_request.pk} kuyruğa alındı (iş #{job.pk})')
+    return job
+
+
+def claim_jobs(count=1) -> list:
+    """
+    Sıradaki işleri al ve 'running' yap (paralel worker'lar aynı işi almaz).
+    Tekrar deneme zamanı (run_after) gelmemiş işler atlanır.
+    """
+    with transaction.atomic(using=router.db_for_write(FacebookPushJob)):
+        now = timezone.now()
+        jobs = list(
+            FacebookPushJob.objects.select_for_update(skip_locked=True)
+            .filter(status=FacebookPushJob.Status.QUEUED)
+            .filter(Q(run_after__isnull=True) | Q(run_after__lte=now))
+            .select_related('requested_by')
+            .order_by('created_at')[:count]
+        )
+        for job in jobs:
+            job.status = FacebookPushJob.Status.RUNNING
+            job.started_at = now
+            job.current_step = next((step for step in STEP_ORDER if not _step_done(job, step)), STEP_ORDER[0])
+        FacebookPushJob.objects.bulk_update(jobs, ['status', 'started_at', 'current_step'])
+    return jobs
+
+
+def _step_done(job, step):
+    return (job.steps.get(step) or {}).get('status') == 'done'
+
+
+def _completed_steps(job) -> dict:
+    """Önceki denemede tamamlanan adımlar {adım: detaylar} (create_full_campaign completed'ı)."""
+    return {step: details for step, details in job.steps.items() if _step_done(job, step)}
+
+
+def _start_job(job):
+    """İşin kampanyasını yükle ve fb_push_status=pushing yap; kampanya artık onaylı değilse işi başarısız say."""
+    campaign_request = CampaignRequest.objects.select_related('dealer').get(pk=job.campaign_request_id)
+
+    # Kuyruktayken durum değişmiş olabilir
+    if campaign_request.status != CampaignRequest.Status.ONAYLANDI:
+        _fail(job, campaign_request, 'Kampanya artık onaylı durumda değil, gönderim iptal edildi.', job.requested_by)
+        return None
+
+    campaign_request.fb_push_status = CampaignRequest.FBPushStatus.PUSHING
+    campaign_request.save(update_fields=['fb_push_status'])
+    return campaign_request
+
+
+def _step_recorder(job, campaign_request):
+    """MetaAdsService on_step callback'i: adımı job.steps'e ve aktivite loguna yaz."""
+
+    def on_step(step, **details):
+        job.steps[step] = {'status': 'done', 'at': timezone.now().isoformat(), **details}
+        # Batch modunda görsel adımı önce tamamlanır; aktif adım: sıradaki tamamlanmamış adım
+        job.current_step = next((name for name in STEP_ORDER if name not in job.steps), '')
+        job.save(update_fields=['steps', 'current_step'])
+
+        CampaignActivityLog.log(
+            campaign_request=campaign_request,
+            action=CampaignActivityLog.ActionType.FB_PUSH_PROGRESS,
+            message=f'Facebook gönderimi: {FacebookPushJob.Step(step).label} adımı tamamlandı',
+            user=job.requested_by,
+            details={'job_id': job.pk, 'step': step, **details},
+        )
+
+    return on_step
+
+
+def run_facebook_push_job(job) -> FacebookPushJob:
+    """
+    İşi çalıştır: MetaAdsService.create_full_campaign, adım adım ilerleme kaydı.
+    Sonuç (başarı / hata) job, kampanya ve aktivite loguna yazılır; hata fırlatmaz.
+    """
+    from .meta_ads_service import MetaAdsService, MetaAdsServiceError
+    from .meta_api_client import MetaApiThrottled
+
+    campaign_request = _start_job(job)
+    if campaign_request is None:
+        return job
+
+    try:
+        service = MetaAdsService()
+        result = service.create_full_campaign(
+            campaign_request, on_step=_step_recorder(job, campaign_request), completed=_completed_steps(job),
+        )
+    except MetaApiThrottled as e:
+        return _requeue(job, campaign_request, e)
+    except MetaAdsServiceError as e:
+        return _fail(job, campaign_request, str(e), job.requested_by, {'error_type': 'MetaAdsServiceError'})
+    except Exception as e:
+        logger.error(f'[PushToFB] Beklenmeyen hata (iş #{job.pk}): {e}', exc_info=True)
+        return _fail(job, campaign_request, f'Beklenmeyen hata: {e}', job.requested_by, {'error_type': type(e).__name__})
+
+    return _finish_job(job, campaign_request, result)
+
+
+def run_facebook_push_batch(jobs) -> list:
+    """
+    İşleri MetaAdsService.create_campaigns_batch ile birlikte çalıştır
+    (Graph API batch; her işin sonucu kendi kampanyasına yazılır).
+    """
+    from .meta_ads_service import MetaAdsService
+    from .meta_api_client import MetaApiThrottled
+
+    started = {}
+    for job in jobs:
+        campaign_request = _start_job(job)
+        if campaign_request is not None:
+            started[campaign_request.pk] = (job, campaign_request, _step_recorder(job, campaign_request))
+    if not started:
+        return jobs
+
+    try:
+        service = MetaAdsService()
+        results = service.create_campaigns_batch(
+            [campaign_request for _, campaign_request, _ in started.values()],
+            on_step=lambda campaign_request, step, **details: started[campaign_request.pk][2](step, **details),
+        )
+    except MetaApiThrottled as e:
+        # Tamamlanan adımlar kaydedildi: zinciri bitenler sonuçlanır, diğerleri
+        # tekrar kuyruğa alınır ve sonraki denemede kaldığı yerden tek başına sürer
+        for job, campaign_request, _ in started.values():
+            completed = _completed_steps(job)
+            if all(step in completed for step in STEP_ORDER):
+                _finish_job(job, campaign_request, {
+                    'success': True, **{f'{step}_id': completed[step][f'{step}_id'] for step in CHAIN_STEPS},
+                })
+            else:
+                _requeue(job, campaign_request, e)
+        return jobs
+    except Exception as e:
+        logger.error(f'[PushToFB] Batch gönderim hatası ({len(started)} iş): {e}', exc_info=True)
+        results = {pk: {'success': False, 'error': str(e), 'error_type': type(e).__name__} for pk in started}
+
+    for pk, (job, campaign_request, _) in started.items():
+        _finish_job(job, campaign_request, results.get(pk) or {'success': False, 'error': 'Sonuç alınamadı'})
+    return jobs
+
+
+def _finish_job(job, campaign_request, result) -> FacebookPushJob:
+    user = job.requested_by
+    if not result.get('success'):
+        return _fail(
+            job, campaign_request, result.get('error', 'Bilinmeyen hata'), user,
+            {'result': result}, step=result.get('failed_step'),
+        )
+
+    campaign_request.fb_campaign_id = result['campaign_id']
+    campaign_request.fb_adset_id = result['adset_id']
+    campaign_request.fb_creative_id = result['creative_id']
+    campaign_request.fb_ad_id = result['ad_id']
+    campaign_request.fb_push_status = CampaignRequest.FBPushStatus.SUCCESS
+    campaign_request.fb_push_error = ''
+    campaign_request.fb_pushed_at = timezone.now()
+    campaign_request.status = CampaignRequest.Status.YAYINDA
+    campaign_request.save()
+
+    job.status = FacebookPushJob.Status.SUCCEEDED
+    job.current_step = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'current_step', 'finished_at'])
+
+    logger.info(f'[PushToFB] Kampanya #{campaign_request.pk} başarıyla gönderildi. FB ID: {result["campaign_id"]}')
+
+    CampaignActivityLog.log(
+        campaign_request=campaign_request,
+        action=CampaignActivityLog.ActionType.FB_PUSH_SUCCESS,
+        message=f'Facebook kampanya başarıyla oluşturuldu (Campaign: {result["campaign_id"]})',
+        user=user,
+        details={
+            'job_id': job.pk,
+            'campaign_id': result['campaign_id'],
+            'adset_id': result['adset_id'],
+            'creative_id': result['creative_id'],
+            'ad_id': result['ad_id'],
+        },
+    )
+    return job
+
+
+def _requeue(job, campaign_request, throttled) -> FacebookPushJob:
+    """Meta API limiti: işi tamamlanan adımlarıyla retry_after sonrasına tekrar kuyruğa al."""
+    job.status = FacebookPushJob.Status.QUEUED
+    job.run_after = timezone.now() + timedelta(seconds=throttled.retry_after)
+    job.started_at = None
+    job.save(update_fields=['status', 'run_after', 'started_at'])
+
+    campaign_request.fb_push_status = CampaignRequest.FBPushStatus.PENDING
+    campaign_request.fb_push_error = ''
+    campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
+
+    logger.warning(
+        f'[PushToFB] Kampanya #{campaign_request.pk} Meta API limiti nedeniyle tekrar kuyruğa alındı '
+        f'(iş #{job.pk}, {int(throttled.retry_after)} sn sonra)'
+    )
+
+    CampaignActivityLog.log(
+        campaign_request=campaign_request,
+        action=CampaignActivityLog.ActionType.FB_PUSH_PROGRESS,
+        message=f'Facebook gönderimi Meta API limiti nedeniyle ertelendi (~{int(throttled.retry_after)} sn)',
+        user=job.requested_by,
+        details={'job_id': job.pk, 'retry_after': throttled.retry_after, 'completed_steps': list(_completed_steps(job))},
+    )
+    return job
+
+
+def _fail(job, campaign_request, error_msg, user=None, details=None, step=None) -> FacebookPushJob:
+    step = step or job.current_step
+    if step:
+        job.steps[step] = {'status': 'failed', 'at': timezone.now().isoformat(), 'error': error_msg[:500]}
+    job.status = FacebookPushJob.Status.FAILED
+    job.error = error_msg
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'steps', 'error', 'finished_at'])
+
+    campaign_request.fb_push_status = CampaignRequest.FBPushStatus.FAILED
+    campaign_request.fb_push_error = error_msg
+    campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
+
+    logger.error(f'[PushToFB] Kampanya #{campaign_request.pk} gönderilemedi (iş #{job.pk}): {error_msg}')
+
+    CampaignActivityLog.log(
+        campaign_request=campaign_request,
+        action=CampaignActivityLog.ActionType.FB_PUSH_FAILED,
+        message=f'Facebook gönderim başarısız: {error_msg[:200]}',
+        user=user,
+        details={'job_id': job.pk, 'step': step, 'error': error_msg, **(details or {})},
+    )
+    return job
+
+
+def fail_stale_jobs() -> int:
+    """
+    FB_PUSH_JOB_TIMEOUT_SECONDS'tan uzun 'running' kalan işleri (worker çöktü)
+    başarısız işaretle. Yarım kalmış zincir tekrar çalıştırılmaz (Facebook'ta
+    mükerrer nesne oluşmasın); admin yeniden gönderir.
+
+    Returns:
+        Başarısız işaretlenen iş sayısı
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.FB_PUSH_JOB_TIMEOUT_SECONDS)
+    stale = FacebookPushJob.objects.filter(status=FacebookPushJob.Status.RUNNING, started_at__lt=cutoff)
+
+    failed = 0
+    for job in stale.select_related('campaign_request', 'requested_by'):
+        # Worker tam bu sırada bitirdiyse dokunma
+        claimed = FacebookPushJob.objects.filter(pk=job.pk, status=FacebookPushJob.Status.RUNNING).update(
+            status=FacebookPushJob.Status.FAILED
+        )
+        if not claimed:
+            continue
+        _fail(job, job.campaign_request, 'Gönderim zaman aşımına uğradı (worker yanıt vermedi).', job.requested_by)
+        failed += 1
+    return failed
+
+
+def process_facebook_push_jobs(limit=None, batch_size=None) -> int:
+    """
+    Kuyruktaki işleri çalıştır (aktif brand DB'si). Birden çok iş varsa
+    batch_size'lık gruplar Graph API batch isteğiyle birlikte gönderilir.
+
+    Args:
+        limit: En fazla çalıştırılacak iş (None: kuyruk boşalana kadar)
+        batch_size: Bir batch'teki iş sayısı (varsayılan FB_PUSH_BATCH_SIZE, 1: batch yok)
+
+    Returns:
+        Çalıştırılan iş sayısı
+    """
+    batch_size = max(batch_size or settings.FB_PUSH_BATCH_SIZE, 1)
+    fail_stale_jobs()
+
+    processed = 0
+    while limit is None or processed < limit:
+        count = batch_size if limit is None else min(batch_size, limit - processed)
+        jobs = claim_jobs(count)
+        if not jobs:
+            break
+        # Limit nedeniyle ertelenip adımları yarım kalan işler kaldığı yerden tek tek sürer
+        fresh = [job for job in jobs if not _completed_steps(job)]
+        for job in jobs:
+            if _completed_steps(job):
+                run_facebook_push_job(job)
+        if len(fresh) == 1:
+            run_facebook_push_job(fresh[0])
+        elif fresh:
+            run_facebook_push_batch(fresh)
+        processed += len(jobs)
+    return processed
+
+
+def push_queue_depth() -> dict:
+    """Kuyruk durumu (aktif brand DB'si): kuyrukta, çalışan, en eski kuyruktaki (sn)."""
+    now = timezone.now()
+    stats = FacebookPushJob.objects.aggregate(
+        queued=Count('pk', filter=Q(status=FacebookPushJob.Status.QUEUED)),
+        running=Count('pk', filter=Q(status=FacebookPushJob.Status.RUNNING)),
+        oldest=Min('created_at', filter=Q(status=FacebookPushJob.Status.QUEUED)),
+    )
+    oldest = stats.pop('oldest')
+    stats['oldest_queued_s'] = round((now - oldest).total_seconds()) if oldest else 0
+    return stats
@@ -7,39 +7,80 @@ Kullanım:
 
     service = MetaAdsService()
     result = service.create_full_campaign(campaign_request)
+
+    # Toplu gönderim (Graph API batch): {campaign_request.pk: sonuç}
+    results = service.create_campaigns_batch(campaign_requests)
+
+HTTP isteği içinden çağrılmaz; push-to-facebook işi kuyruğa alır ve worker
+çalıştırır (apps.campaigns.services.facebook_push).
 """
+import base64
+import io
+import json
 import logging
-import os
-import tempfile
-import requests
+import re
 from datetime import datetime, timedelta
+from urllib.parse import quote, unquote
 
-from facebook_business.api import FacebookAdsApi
 from facebook_business.adobjects.adaccount import AdAccount
 from facebook_business.adobjects.campaign import Campaign
 from facebook_business.adobjects.adset import AdSet
 from facebook_business.adobjects.adcreative import AdCreative
 from facebook_business.adobjects.ad import Ad
-from facebook_business.adobjects.adimage import AdImage
+
+from .meta_api_client import THROTTLE_ERROR_CODES, MetaApiThrottled, build_meta_api
 
 logger = logging.getLogger(__name__)
 
+# Graph API batch isteği başına en fazla istek sayısı
+GRAPH_BATCH_LIMIT = 50
+# Batch'te bağımlı istek zinciri (görseller zincirden önce ayrı batch'te yüklenir)
+BATCH_CHAIN_STEPS = ('campaign', 'adset', 'creative', 'ad')
+
+# URL-encode edilmiş {result=...} referansı
+_ENCODED_RESULT_REF = re.compile(r'%7Bresult%3D.*?%7D')
+
 
 class MetaAdsServiceError(Exception):
     """MetaAdsService özel hata sınıfı"""
     pass
 
 
+def _batch_body(params):
+    """
+    Batch isteği gövdesi (form-encoded). dict / list / bool değerler JSON'a
+    çevrilir; {result=...} referansları Graph API çözebilsin diye kodlanmaz.
+    """
+    parts = []
+    for key, value in params.items():
+        if isinstance(value, (dict, list, tuple, bool)):
+            value = json.dumps(value, sort_keys=True, separators=(',', ':'))
+        encoded = quote(str(value), safe='')
+        encoded = _ENCODED_RESULT_REF.sub(lambda match: unquote(match.group(0)), encoded)
+        parts.append(f'{key}={encoded}')
+    return '&'.join(parts)
+
+
+def _batch_throttled(body):
+    return ((body or {}).get('error') or {}).get('code') in THROTTLE_ERROR_CODES
+
+
+def _batch_error(body):
+    error = (body or {}).get('error') or {}
+    return error.get('error_user_msg') or error.get('message') or ''
+
+
 class MetaAdsService:
     """
     Meta (Facebook) Ads API servisi.
     Campaign -> AdSet -> Creative -> Ad zincirini yönetir.
     """
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, max_wait=None):
         """
         Args:
             config: MetaAdsConfig model instance veya None (DB'den otomatik alır)
+            max_wait: Rate limit için en fazla bekleme (sn); None ise META_API_MAX_WAIT_SECONDS
         """
         if config is None:
             from apps.campaigns.models import MetaAdsConfig
@@ -56,12 +97,145 @@ class MetaAdsService:
         self.default_billing_event = config.default_billing_event
         self.default_optimization_goal = config.default_optimization_goal
 
-        # Facebook API'yi başlat
-        FacebookAdsApi.init(self.app_id, self.app_secret, self.access_token)
-        self.api = FacebookAdsApi.get_default_api()
-        self.ad_account = AdAccount(self.ad_account_id)
+        # Facebook API'yi başlat (reklam hesabı bazında rate limit, bkz. meta_api_client)
+        self.api = build_meta_api(
+            self.app_id, self.app_secret, self.access_token, self.ad_account_id, max_wait=max_wait
+        )
+        self.ad_account = AdAccount(self.ad_account_id, api=self.api)
+
+    def _prepare(self, campaign_request):
+        """
+        Talebin Facebook'a gönderilebilirliğini kontrol et ve ortak değerleri hazırla.
 
-    def create_full_campaign(self, campaign_request):
+        Raises:
+            MetaAdsServiceError: Sayfa ID veya yönlendirme URL'si yoksa
+        """
+        dealer = campaign_request.dealer
+
+        # Gerekli alanları kontrol et
+        page_id = dealer.fb_page_id
+        if not page_id:
+            raise MetaAdsServiceError(
+                f'Bayi "{dealer.dealer_name}" için Facebook Sayfa ID tanımlanmamış.'
+            )
+
+        # Website URL'yi belirle (redirect_type'a göre)
+        website_url = campaign_request.website_url
+        if not website_url:
+            if campaign_request.redirect_type == 'satis' and dealer.sales_url:
+                website_url = dealer.sales_url
+            elif campaign_request.redirect_type == 'servis' and dealer.service_url:
+                website_url = dealer.service_url
+
+        if not website_url:
+            raise MetaAdsServiceError(
+                'Yönlendirme URL\'si bulunamadı. Kampanyada veya bayi profilinde URL tanımlayın.'
+            )
+
+        # Günlük bütçeyi hesapla (kuruş cinsinden)
+        days = (campaign_request.end_date - campaign_request.start_date).days or 1
+        total_budget_kurus = int(float(campaign_request.budget) * 100)
+        daily_budget = max(total_budget_kurus // days, 100)  # Min 1 TL/gün
+
+        return {
+            'dealer': dealer,
+            'page_id': page_id,
+            'website_url': website_url,
+            'daily_budget': daily_budget,
+        }
+
+    def _campaign_params(self, campaign_request):
+        return {
+            Campaign.Field.name: campaign_request.campaign_name,
+            Campaign.Field.objective: self.default_objective,
+            Campaign.Field.status: Campaign.Status.paused,
+            'special_ad_categories': ['NONE'],
+            'is_adset_budget_sharing_enabled': False,
+        }
+
+    def _adset_params(self, campaign_request, campaign_id, daily_budget):
+        adset_name = f'{campaign_request.campaign_name} - Reklam Seti'
+
+        # Optimization goal'a göre bid_amount belirle
+        # REACH + IMPRESSIONS => bid_amount zorunlu (kuruş cinsinden, min 100 = 1 TL)
+        optimization_goal = self.default_optimization_goal
+        billing_event = self.default_billing_event
+        bid_amount = None
+
+        if optimization_goal == 'REACH' and billing_event == 'IMPRESSIONS':
+            # CPM bazlı: 1000 gösterim başına teklif (kuruş cinsinden)
+            bid_amount = max(daily_budget // 10, 100)  # Günlük bütçenin ~%10'u, min 1 TL
+
+        adset_params = {
+            AdSet.Field.name: adset_name,
+            AdSet.Field.optimization_goal: optimization_goal,
+            AdSet.Field.billing_event: billing_event,
+            AdSet.Field.daily_budget: daily_budget,
+            AdSet.Field.campaign_id: campaign_id,
+            AdSet.Field.targeting: {
+                'geo_locations': {
+                    'countries': ['TR'],
+                },
+                'age_min': 18,
+                'age_max': 65,
+            },
+            AdSet.Field.status: AdSet.Status.paused,
+            'start_time': campaign_request.start_date.strftime('%Y-%m-%dT00:00:00Z'),
+            'end_time': campaign_request.end_date.strftime('%Y-%m-%dT23:59:59Z'),
+        }
+
+        if bid_amount:
+            adset_params[AdSet.Field.bid_amount] = bid_amount
+        return adset_params
+
+    def _creative_image(self, campaign_request):
+        """Talebin ilk post / story görseli (CampaignCreativeFile) veya None."""
+        return campaign_request.creative_files.filter(
+            file_type__in=['post', 'story']
+        ).order_by('-uploaded_at').first()
+
+    def _creative_params(self, campaign_request, prepared, image_hash=None, with_instagram=True):
+        dealer = prepared['dealer']
+        creative_name = f'{campaign_request.campaign_name} - Creative'
+        ad_message = campaign_request.ad_message or campaign_request.campaign_name
+        cta_type = campaign_request.cta_type or 'LEARN_MORE'
+
+        object_story_spec = {
+            'page_id': prepared['page_id'],
+        }
+
+        # Instagram ID varsa ekle
+        if with_instagram and dealer.instagram_account_id:
+            object_story_spec['instagram_actor_id'] = dealer.instagram_account_id
+
+        # Link data oluştur
+        link_data = {
+            'message': ad_message,
+            'link': prepared['website_url'],
+            'call_to_action': {
+                'type': cta_type,
+            },
+        }
+
+        if image_hash:
+            link_data['image_hash'] = image_hash
+
+        object_story_spec['link_data'] = link_data
+
+        return {
+            AdCreative.Field.name: creative_name,
+            AdCreative.Field.object_story_spec: object_story_spec,
+        }
+
+    def _ad_params(self, campaign_request, adset_id, creative_id):
+        return {
+            Ad.Field.name: f'{campaign_request.campaign_name} - Reklam',
+            Ad.Field.adset_id: adset_id,
+            Ad.Field.creative: {'creative_id': creative_id},
+            Ad.Field.status: Ad.Status.paused,
+        }
+
+    def create_full_campaign(self, campaign_request, on_step=None, completed=None):
         """
         Tam bir Facebook kampanyası oluşturur:
         1. Campaign
@@ -71,6 +245,14 @@ class MetaAdsService:
 
         Args:
             campaign_request: CampaignRequest model instance
+            on_step: Her adım tamamlandığında çağrılır: on_step(adım, **detaylar)
+                     adımlar: campaign, adset, image, creative, ad
+            completed: Önceki denemede tamamlanmış adımlar {adım: detaylar};
+                       bu adımlar tekrar çalıştırılmaz, id'leri kullanılır
+
+        Raises:
+            MetaApiThrottled: Hesap limiti uzun süre dolu; iş daha sonra
+                              completed ile kaldığı yerden sürdürülmeli
 
         Returns:
             dict: {
@@ -82,164 +264,79 @@ class MetaAdsService:
                 'error': str (sadece hata durumunda)
             }
         """
-        try:
-            dealer = campaign_request.dealer
-
-            # Gerekli alanları kontrol et
-            page_id = dealer.fb_page_id
-            if not page_id:
-                raise MetaAdsServiceError(
-                    f'Bayi "{dealer.dealer_name}" için Facebook Sayfa ID tanımlanmamış.'
-                )
-
-            # Website URL'yi belirle (redirect_type'a göre)
-            website_url = campaign_request.website_url
-            if not website_url:
-                if campaign_request.redirect_type == 'satis' and dealer.sales_url:
-                    website_url = dealer.sales_url
-                elif campaign_request.redirect_type == 'servis' and dealer.service_url:
-                    website_url = dealer.service_url
-
-            if not website_url:
-                raise MetaAdsServiceError(
-                    'Yönlendirme URL\'si bulunamadı. Kampanyada veya bayi profilinde URL tanımlayın.'
-                )
+        on_step = on_step or (lambda step, **details: None)
+        completed = completed or {}
 
-            # Günlük bütçeyi hesapla (kuruş cinsinden)
-            days = (campaign_request.end_date - campaign_request.start_date).days or 1
-            total_budget_kurus = int(float(campaign_request.budget) * 100)
-            daily_budget = max(total_budget_kurus // days, 100)  # Min 1 TL/gün
+        try:
+            prepared = self._prepare(campaign_request)
 
             # ===== 1. Kampanya Oluştur =====
-            logger.info(f'[MetaAds] Kampanya oluşturuluyor: {campaign_request.campaign_name}')
-
-            campaign_params = {
-                Campaign.Field.name: campaign_request.campaign_name,
-                Campaign.Field.objective: self.default_objective,
-                Campaign.Field.status: Campaign.Status.paused,
-                'special_ad_categories': ['NONE'],
-                'is_adset_budget_sharing_enabled': False,
-            }
+            if 'campaign' in completed:
+                campaign_id = completed['campaign']['campaign_id']
+            else:
+                logger.info(f'[MetaAds] Kampanya oluşturuluyor: {campaign_request.campaign_name}')
 
-            campaign = self.ad_account.create_campaign(params=campaign_params)
-            campaign_id = campaign.get_id()
-            logger.info(f'[MetaAds] Kampanya oluşturuldu: {campaign_id}')
+                campaign = self.ad_account.create_campaign(params=self._campaign_params(campaign_request))
+                campaign_id = campaign.get_id()
+                logger.info(f'[MetaAds] Kampanya oluşturuldu: {campaign_id}')
+                on_step('campaign', campaign_id=campaign_id)
 
             # ===== 2. AdSet Oluştur =====
-            adset_name = f'{campaign_request.campaign_name} - Reklam Seti'
-
-            # Optimization goal'a göre bid_amount belirle
-            # REACH + IMPRESSIONS => bid_amount zorunlu (kuruş cinsinden, min 100 = 1 TL)
-            optimization_goal = self.default_optimization_goal
-            billing_event = self.default_billing_event
-            bid_amount = None
-
-            if optimization_goal == 'REACH' and billing_event == 'IMPRESSIONS':
-                # CPM bazlı: 1000 gösterim başına teklif (kuruş cinsinden)
-                bid_amount = max(daily_budget // 10, 100)  # Günlük bütçenin ~%10'u, min 1 TL
-
-            adset_params = {
-                AdSet.Field.name: adset_name,
-                AdSet.Field.optimization_goal: optimization_goal,
-                AdSet.Field.billing_event: billing_event,
-                AdSet.Field.daily_budget: daily_budget,
-                AdSet.Field.campaign_id: campaign_id,
-                AdSet.Field.targeting: {
-                    'geo_locations': {
-                        'countries': ['TR'],
-                    },
-                    'age_min': 18,
-                    'age_max': 65,
-                },
-                AdSet.Field.status: AdSet.Status.paused,
-                'start_time': campaign_request.start_date.strftime('%Y-%m-%dT00:00:00Z'),
-                'end_time': campaign_request.end_date.strftime('%Y-%m-%dT23:59:59Z'),
-            }
-
-            if bid_amount:
-                adset_params[AdSet.Field.bid_amount] = bid_amount
-
-            adset = self.ad_account.create_ad_set(params=adset_params)
-            adset_id = adset.get_id()
-            logger.info(f'[MetaAds] AdSet oluşturuldu: {adset_id}')
+            if 'adset' in completed:
+                adset_id = completed['adset']['adset_id']
+            else:
+                adset = self.ad_account.create_ad_set(
+                    params=self._adset_params(campaign_request, campaign_id, prepared['daily_budget'])
+                )
+                adset_id = adset.get_id()
+                logger.info(f'[MetaAds] AdSet oluşturuldu: {adset_id}')
+                on_step('adset', adset_id=adset_id)
 
             # ===== 3. Görsel yükleme (CampaignCreativeFile'dan) =====
-            image_hash = None
-            creative_files = campaign_request.creative_files.filter(
-                file_type__in=['post', 'story']
-            ).order_by('-uploaded_at')
-
-            if creative_files.exists():
-                first_image = creative_files.first()
-                # file.url Azure Blob / local storage URL'sini verir
-                image_url = first_image.file.url
-                logger.info(f'[MetaAds] Görsel yükleniyor: {first_image.file_name} ({image_url})')
-                image_result = self.upload_image(image_url)
-                if image_result.get('success'):
-                    image_hash = image_result['hash']
-                else:
-                    logger.warning(f'[MetaAds] Görsel yükleme başarısız: {image_result.get("error")}')
+            if 'image' in completed:
+                image_hash = completed['image'].get('image_hash')
+            else:
+                image_hash = None
+                first_image = self._creative_image(campaign_request)
+
+                if first_image:
+                    logger.info(f'[MetaAds] Görsel hazırlanıyor: {first_image.file_name}')
+                    image_result = self.creative_image_hash(first_image)
+                    if image_result.get('success'):
+                        image_hash = image_result['hash']
+                    else:
+                        logger.warning(f'[MetaAds] Görsel yükleme başarısız: {image_result.get("error")}')
+                on_step('image', image_hash=image_hash)
 
             # ===== 4. Creative Oluştur =====
-            creative_name = f'{campaign_request.campaign_name} - Creative'
-            ad_message = campaign_request.ad_message or campaign_request.campaign_name
-            cta_type = campaign_request.cta_type or 'LEARN_MORE'
-
-            object_story_spec = {
-                'page_id': page_id,
-            }
-
-            # Instagram ID varsa ekle
-            if dealer.instagram_account_id:
-                object_story_spec['instagram_actor_id'] = dealer.instagram_account_id
-
-            # Link data oluştur
-            link_data = {
-                'message': ad_message,
-                'link': website_url,
-                'call_to_action': {
-                    'type': cta_type,
-                },
-            }
-
-            if image_hash:
-                link_data['image_hash'] = image_hash
-
-            object_story_spec['link_data'] = link_data
-
-            creative_params = {
-                AdCreative.Field.name: creative_name,
-                AdCreative.Field.object_story_spec: object_story_spec,
-            }
-
             # Creative oluştur, Instagram ID hata verirse onsuz dene
-            try:
-                creative = self.ad_account.create_ad_creative(params=creative_params)
-            except Exception as e:
-                if 'instagram_actor_id' in str(e) and 'instagram_actor_id' in object_story_spec:
-                    logger.warning('[MetaAds] Instagram ID hatası, onsuz tekrar deneniyor...')
-                    del object_story_spec['instagram_actor_id']
-                    creative_params[AdCreative.Field.object_story_spec] = object_story_spec
-                    creative = self.ad_account.create_ad_creative(params=creative_params)
-                else:
+            if 'creative' in completed:
+                creative_id = completed['creative']['creative_id']
+            else:
+                try:
+                    creative = self.ad_account.create_ad_creative(
+                        params=self._creative_params(campaign_request, prepared, image_hash)
+                    )
+                except MetaApiThrottled:
                     raise
-
-            creative_id = creative.get_id()
-            logger.info(f'[MetaAds] Creative oluşturuldu: {creative_id}')
+                except Exception as e:
+                    if 'instagram_actor_id' in str(e) and prepared['dealer'].instagram_account_id:
+                        logger.warning('[MetaAds] Instagram ID hatası, onsuz tekrar deneniyor...')
+                        creative = self.ad_account.create_ad_creative(
+                            params=self._creative_params(campaign_request, prepared, image_hash, with_instagram=False)
+                        )
+                    else:
+                        raise
+
+                creative_id = creative.get_id()
+                logger.info(f'[MetaAds] Creative oluşturuldu: {creative_id}')
+                on_step('creative', creative_id=creative_id)
 
             # ===== 5. Ad Oluştur =====
-            ad_name = f'{campaign_request.campaign_name} - Reklam'
-
-            ad_params = {
-                Ad.Field.name: ad_name,
-                Ad.Field.adset_id: adset_id,
-                Ad.Field.creative: {'creative_id': creative_id},
-                Ad.Field.status: Ad.Status.paused,
-            }
-
-            ad = self.ad_account.create_ad(params=ad_params)
+            ad = self.ad_account.create_ad(params=self._ad_params(campaign_request, adset_id, creative_id))
             ad_id = ad.get_id()
             logger.info(f'[MetaAds] Ad oluşturuldu: {ad_id}')
+            on_step('ad', ad_id=ad_id)
 
             return {
                 'success': True,
@@ -249,7 +346,7 @@ class MetaAdsService:
                 'ad_id': ad_id,
             }
 
-        except MetaAdsServiceError:
+        except (MetaAdsServiceError, MetaApiThrottled):
             raise
         except Exception as e:
             logger.error(f'[MetaAds] Kampanya oluşturma hatası: {e}', exc_info=True)
@@ -258,56 +355,329 @@ class MetaAdsService:
                 'error': str(e),
             }
 
-    def upload_image(self, image_path_or_url):
+    # ===== Batch API =====
+
+    def _graph_batch(self, requests_):
         """
-        Görsel yükle ve image_hash döndür.
+        Graph API batch çağrısı (tek HTTP isteği, en fazla GRAPH_BATCH_LIMIT istek).
 
         Args:
-            image_path_or_url: Yerel dosya yolu veya URL
+            requests_: [{'method', 'relative_url', 'body' (dict), 'name' (opsiyonel)}]
 
         Returns:
-            dict: {'success': True, 'hash': str} veya {'success': False, 'error': str}
-        """
-        try:
-            temp_file = None
+            İstek sırasıyla [(başarılı mı, gövde dict)] - yanıtsız (çalıştırılmamış) istek: (False, {})
 
-            # URL ise önce indir
-            if image_path_or_url.startswith(('http://', 'https://')):
-                response = requests.get(image_path_or_url, timeout=30)
-                response.raise_for_status()
+        Alt isteklerdeki throttling hataları için çağıran, başarılı sonuçları
+        kaydettikten sonra _raise_if_throttled'ı çağırır.
+        """
+        batch = []
+        for request in requests_:
+            call = {'method': request['method'], 'relative_url': request['relative_url']}
+            if request.get('body'):
+                call['body'] = _batch_body(request['body'])
+            if request.get('name'):
+                call['name'] = request['name']
+                # Bağımlı istekler için id'ler yanıtta da lazım
+                call['omit_response_on_success'] = False
+            batch.append(call)
+
+        responses = self.api.call('POST', (), params={'batch': batch, 'include_headers': False}).json()
+
+        results = []
+        for response in responses:
+            if not response:
+                results.append((False, {}))
+                continue
+            try:
+                body = json.loads(response.get('body') or '{}')
+            except ValueError:
+                body = {'error': {'message': response.get('body')}}
+            results.append((response.get('code') == 200 and 'error' not in body, body))
+        return results
 
-                ext = os.path.splitext(image_path_or_url)[1].lower()
-                if ext not in ['.jpg', '.jpeg', '.png', '.gif']:
-                    ext = '.jpg'
+    def _raise_if_throttled(self, results):
+        """
+        Alt istekler throttling'e takıldıysa hesabı durdur (sonraki istekler,
+        tüm worker'lar bekler) ve MetaApiThrottled fırlat: takılan adımlar
+        başarısız sayılmaz, iş tamamlanan adımlardan tekrar kuyruğa alınır.
+        """
+        if any(_batch_throttled(body) for _, body in results):
+            raise MetaApiThrottled(self.ad_account_id, self.api.register_throttle())
 
-                temp_file = tempfile.NamedTemporaryFile(suffix=ext, delete=False)
-                temp_file.write(response.content)
-                temp_file.close()
-                file_path = temp_file.name
+    def _batch_upload_images(self, items, on_step):
+        """
+        Görsellerin image_hash'lerini doldur (item['image_hash']): önbellekteki
+        içerikler okunmaz; kalanlar içerik başına bir kez base64 ile batch halinde yüklenir.
+        """
+        files = {}
+        for item in items:
+            item['image_hash'] = None
+            first_image = self._creative_image(item['request'])
+            if first_image:
+                files[item['request'].pk] = first_image
+
+        cached = self._cached_image_hashes(creative_file.content_sha256 for creative_file in files.values())
+
+        pending = {}  # content_sha256 -> (içerik, [item])
+        for item in items:
+            creative_file = files.get(item['request'].pk)
+            if creative_file is None:
+                continue
+            if creative_file.content_sha256 not in cached:
+                try:
+                    content = self._read_creative_file(creative_file)
+                except Exception as e:
+                    logger.warning(f'[MetaAds] Görsel okunamadı (#{item["request"].pk}): {e}')
+                    continue
+                pending.setdefault(creative_file.content_sha256, (content, []))[1].append(item)
             else:
-                file_path = image_path_or_url
+                item['image_hash'] = cached[creative_file.content_sha256]
 
-            # Dosya uzantısı kontrolü
-            ext = os.path.splitext(file_path)[1].lower()
-            if ext not in ['.jpg', '.jpeg', '.png', '.gif']:
-                raise MetaAdsServiceError(
-                    f'Desteklenmeyen dosya uzantısı: {ext}. Sadece jpg, jpeg, png ve gif.'
-                )
+        # Önceden bilinmeyen özetler (ilk kez okunan dosyalar) başka dosyadan yüklenmiş olabilir
+        for content_sha256, image_hash in self._cached_image_hashes(pending).items():
+            for item in pending.pop(content_sha256)[1]:
+                item['image_hash'] = image_hash
 
-            # Facebook'a yükle
-            image = AdImage(parent_id=self.ad_account_id)
-            image[AdImage.Field.filename] = file_path
-            image.remote_create()
+        uploads = list(pending.items())
+        for start in range(0, len(uploads), GRAPH_BATCH_LIMIT):
+            chunk = uploads[start:start + GRAPH_BATCH_LIMIT]
+            try:
+                results = self._graph_batch([{
+                    'method': 'POST',
+                    'relative_url': f'{self.ad_account_id}/adimages',
+                    'body': {'bytes': base64.b64encode(content).decode()},
+                } for _, (content, _) in chunk])
+            except MetaApiThrottled:
+                raise
+            except Exception as e:
+                logger.warning(f'[MetaAds] Görsel batch yüklemesi başarısız: {e}')
+                continue
+            for (content_sha256, (_, chunk_items)), (ok, body) in zip(chunk, results):
+                images = body.get('images') or {}
+                if ok and images:
+                    image_hash = next(iter(images.values())).get('hash')
+                    self._remember_image_hash(content_sha256, image_hash)
+                    for item in chunk_items:
+                        item['image_hash'] = image_hash
+                else:
+                    logger.warning(f'[MetaAds] Görsel yükleme başarısız ({content_sha256[:12]}): {_batch_error(body)}')
+            # Yüklenen hash'ler önbellekte; görsel adımı tekrar denemede tamamlanır
+            self._raise_if_throttled(results)
 
-            image_hash = image[AdImage.Field.hash]
-            logger.info(f'[MetaAds] Görsel yüklendi, hash: {image_hash}')
+        for item in items:
+            on_step(item['request'], 'image', image_hash=item['image_hash'])
 
-            return {
-                'success': True,
-                'hash': image_hash,
-            }
+    def _chain_requests(self, item, with_instagram=True):
+        """
+        Kampanya → AdSet → Creative → Ad bağımlı istek zinciri. Önceki batch'te
+        oluşan adımların id'si (item['ids']) doğrudan, diğerleri {result=...} ile verilir.
+        """
+        campaign_request, prepared, ids = item['request'], item['prepared'], item['ids']
+        prefix = f'cr{campaign_request.pk}'
+
+        def ref(step):
+            return ids.get(step) or f'{{result={prefix}_{step}:$.id}}'
+
+        params = {
+            'campaign': lambda: ('campaigns', self._campaign_params(campaign_request)),
+            'adset': lambda: ('adsets', self._adset_params(campaign_request, ref('campaign'), prepared['daily_budget'])),
+            'creative': lambda: ('adcreatives', self._creative_params(
+                campaign_request, prepared, item['image_hash'], with_instagram=with_instagram
+            )),
+            'ad': lambda: ('ads', self._ad_params(campaign_request, ref('adset'), ref('creative'))),
+        }
+
+        requests_ = []
+        for step in BATCH_CHAIN_STEPS:
+            if step in ids:
+                continue
+            edge, body = params[step]()
+            requests_.append((step, {
+                'method': 'POST',
+                'relative_url': f'{self.ad_account_id}/{edge}',
+                'body': body,
+                'name': f'{prefix}_{step}',
+            }))
+        return requests_
+
+    def _run_chains(self, items, on_step, with_instagram=True):
+        """
+        Zincirleri batch'lere böl ve çalıştır; başarılı adımlar item['ids'], ilk hata item['error'].
+
+        Raises:
+            MetaApiThrottled: Bir alt istek throttling'e takıldı (kalan batch'ler gönderilmez)
+        """
+        per_batch = max(GRAPH_BATCH_LIMIT // len(BATCH_CHAIN_STEPS), 1)
+
+        for start in range(0, len(items), per_batch):
+            chunk = [(item, self._chain_requests(item, with_instagram)) for item in items[start:start + per_batch]]
+            try:
+                results = self._graph_batch([request for _, chain in chunk for _, request in chain])
+            except MetaApiThrottled:
+                raise
+            except Exception as e:
+                logger.error(f'[MetaAds] Batch çağrısı başarısız: {e}', exc_info=True)
+                for item, _ in chunk:
+                    item['error'] = str(e)
+                continue
+
+            responses = iter(results)
+            for item, chain in chunk:
+                item['error'] = None
+                for step, _ in chain:
+                    ok, body = next(responses, (False, {}))
+                    if item['error']:
+                        continue  # Bağımlı adımlar zaten çalışmadı
+                    if ok:
+                        item['ids'][step] = body['id']
+                        on_step(item['request'], step, **{f'{step}_id': body['id']})
+                    else:
+                        item['error'] = _batch_error(body) or f'{step} adımı çalıştırılmadı'
+                        item['failed_step'] = step
+
+            # Oluşan adımlar on_step ile kaydedildi; takılan zincirler tekrar denemede sürer
+            self._raise_if_throttled(results)
+
+    def create_campaigns_batch(self, campaign_requests, on_step=None):
+        """
+        Birden çok kampanyayı Graph API batch istekleriyle oluşturur:
+        görseller tek batch'te, Campaign → AdSet → Creative → Ad zinciri
+        {result=...} bağımlılıklarıyla batch başına GRAPH_BATCH_LIMIT // 4
+        kampanya olacak şekilde. Instagram ID hatası alan creative'ler
+        onsuz ikinci bir batch'le tekrar denenir.
 
-        except MetaAdsServiceError:
+        Args:
+            campaign_requests: CampaignRequest instance listesi
+            on_step: Adım tamamlandığında: on_step(campaign_request, adım, **detaylar)
+
+        Returns:
+            dict: {campaign_request.pk: create_full_campaign ile aynı yapıda sonuç}
+
+        Raises:
+            MetaApiThrottled: Hesap limiti uzun süre dolu veya bir alt istek
+                              throttling'e takıldı; tamamlanan adımlar on_step
+                              ile kaydedilmiştir
+        """
+        on_step = on_step or (lambda campaign_request, step, **details: None)
+        results, items = {}, []
+
+        for campaign_request in campaign_requests:
+            try:
+                prepared = self._prepare(campaign_request)
+            except MetaAdsServiceError as e:
+                results[campaign_request.pk] = {'success': False, 'error': str(e), 'failed_step': 'campaign'}
+                continue
+            items.append({'request': campaign_request, 'prepared': prepared, 'ids': {}, 'error': None})
+
+        if items:
+            logger.info(f'[MetaAds] Batch: {len(items)} kampanya oluşturuluyor')
+            self._batch_upload_images(items, on_step)
+            self._run_chains([item for item in items if not item['error']], on_step)
+
+            retry = [
+                item for item in items
+                if item.get('failed_step') == 'creative' and 'instagram_actor_id' in (item['error'] or '')
+                and item['prepared']['dealer'].instagram_account_id
+            ]
+            if retry:
+                logger.warning(f'[MetaAds] {len(retry)} creative Instagram ID hatası, onsuz tekrar deneniyor...')
+                self._run_chains(retry, on_step, with_instagram=False)
+
+        for item in items:
+            pk, ids = item['request'].pk, item['ids']
+            if item['error']:
+                results[pk] = {
+                    'success': False,
+                    'error': item['error'],
+                    'failed_step': item.get('failed_step'),
+                    # Facebook'ta oluşmuş ama zinciri tamamlanmamış nesneler
+                    'partial_ids': dict(ids),
+                }
+            else:
+                results[pk] = {
+                    'success': True,
+                    'campaign_id': ids['campaign'],
+                    'adset_id': ids['adset'],
+                    'creative_id': ids['creative'],
+                    'ad_id': ids['ad'],
+                }
+
+        failed = sum(1 for result in results.values() if not result['success'])
+        logger.info(f'[MetaAds] Batch tamamlandı: {len(results) - failed} başarılı, {failed} başarısız')
+        return results
+
+    # ===== Görsel önbelleği (MetaAdImage) =====
+
+    def _cached_image_hashes(self, content_hashes) -> dict:
+        """{content_sha256: image_hash} - bu reklam hesabına daha önce yüklenmiş içerikler."""
+        from apps.campaigns.models import MetaAdImage
+
+        content_hashes = {content_hash for content_hash in content_hashes if content_hash}
+        if not content_hashes:
+            return {}
+        return dict(
+            MetaAdImage.objects.filter(ad_account_id=self.ad_account_id, content_sha256__in=content_hashes)
+            .values_list('content_sha256', 'image_hash')
+        )
+
+    def _remember_image_hash(self, content_sha256, image_hash) -> None:
+        from apps.campaigns.models import MetaAdImage
+
+        MetaAdImage.objects.bulk_create(
+            [MetaAdImage(ad_account_id=self.ad_account_id, content_sha256=content_sha256, image_hash=image_hash)],
+            ignore_conflicts=True,
+        )
+
+    def _read_creative_file(self, creative_file) -> bytes:
+        """Dosyayı storage'dan akış olarak oku (geçici dosya yok); SHA-256 eksikse kaydet."""
+        from apps.campaigns.models import file_sha256, storage_chunks
+
+        buffer = io.BytesIO()
+        content_sha256 = file_sha256(storage_chunks(creative_file.file), sink=buffer)
+
+        if creative_file.content_sha256 != content_sha256:
+            creative_file.content_sha256 = content_sha256
+            type(creative_file).objects.filter(pk=creative_file.pk).update(content_sha256=content_sha256)
+        return buffer.getvalue()
+
+    def _upload_image_bytes(self, content) -> str:
+        """Görsel içeriğini base64 ile yükle, image_hash döndür."""
+        response = self.api.call(
+            'POST', (self.ad_account_id, 'adimages'),
+            params={'bytes': base64.b64encode(content).decode()},
+        ).json()
+        images = response.get('images') or {}
+        if not images:
+            raise MetaAdsServiceError(f'Görsel yüklenemedi: {_batch_error(response) or response}')
+        return next(iter(images.values()))['hash']
+
+    def creative_image_hash(self, creative_file):
+        """
+        Kreatif dosyanın bu reklam hesabındaki image_hash'i.
+
+        İçerik özeti (content_sha256) önbellekte (MetaAdImage) varsa dosya
+        okunmaz ve yüklenmez. Yoksa dosya storage'dan okunurken özet
+        hesaplanır; aynı içerik başka dosyadan yüklenmişse yine yükleme yapılmaz.
+
+        Returns:
+            dict: {'success': True, 'hash': str, 'cached': bool} veya {'success': False, 'error': str}
+        """
+        try:
+            cached = self._cached_image_hashes([creative_file.content_sha256])
+            if not cached:
+                content = self._read_creative_file(creative_file)
+                cached = self._cached_image_hashes([creative_file.content_sha256])
+            if cached:
+                image_hash = cached[creative_file.content_sha256]
+                logger.info(f'[MetaAds] Görsel önbellekten: {creative_file.file_name}, hash: {image_hash}')
+                return {'success': True, 'hash': image_hash, 'cached': True}
+
+            image_hash = self._upload_image_bytes(content)
+            self._remember_image_hash(creative_file.content_sha256, image_hash)
+            logger.info(f'[MetaAds] Görsel yüklendi: {creative_file.file_name}, hash: {image_hash}')
+            return {'success': True, 'hash': image_hash, 'cached': False}
+
+        except MetaApiThrottled:
             raise
         except Exception as e:
             logger.error(f'[MetaAds] Görsel yükleme hatası: {e}', exc_info=True)
@@ -315,10 +685,6 @@ class MetaAdsService:
                 'success': False,
                 'error': str(e),
             }
-        finally:
-            # Geçici dosyayı temizle
-            if temp_file and os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
 
     def check_campaign_status(self, fb_campaign_id):
         """
@@ -331,7 +697,7 @@ class MetaAdsService:
             dict: {'status': str, 'effective_status': str, ...}
         """
         try:
-            campaign = Campaign(fb_campaign_id)
+            campaign = Campaign(fb_campaign_id, api=self.api)
             campaign_data = campaign.api_get(fields=[
                 Campaign.Field.name,
                 Campaign.Field.status,
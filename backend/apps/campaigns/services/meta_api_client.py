@@ -0,0 +1,376 @@
+"""
+Rate-limit Farkındalıklı Meta Graph API İstemcisi
+
+facebook-business SDK'sının FacebookAdsApi sınıfını genişletir; SDK nesneleri
+(AdAccount, Campaign ...) ve doğrudan api.call() istekleri aynı yoldan geçer:
+
+- Her yanıttaki x-business-use-case-usage, x-app-usage ve x-ad-account-usage
+  header'ları okunur; en yüksek kullanım yüzdesi reklam hesabı bazında
+  paylaşımlı cache'e yazılır (tüm worker'lar görür)
+- İstekten önce reklam hesabının token bucket'ından token alınır. Bucket
+  META_API_WINDOW_SECONDS'lık pencerelerle dolar; kapasite kullanım
+  META_API_USAGE_THRESHOLD yüzdesini geçince doğrusal olarak düşer, Meta
+  estimated_time_to_regain_access bildirirse hesap o süre boyunca durdurulur
+- Throttling hata kodlarında (4, 17, 32, 613, 80000-80014) istek jitter'lı
+  üstel bekleme ile tekrar denenir; geçici hatalar (1, 2, 5xx) yalnızca
+  GET isteklerinde tekrar denenir (POST idempotent değil)
+- Beklenecek süre max_wait'i aşarsa beklenmez, MetaApiThrottled fırlatılır
+
+Token bucket ve durdurma kayıtları atomik incr ve container'lar arası paylaşım
+ister; cache Redis değilse (DEBUG'da dosya tabanlı cache) devre dışı kalır,
+yalnızca tekrar denemeler çalışır (bkz. shared_throttling_available).
+
+Kullanım:
+    from apps.campaigns.services.meta_api_client import build_meta_api
+
+    api = build_meta_api(app_id, app_secret, access_token, ad_account_id)
+    AdAccount(ad_account_id, api=api).get_campaigns()
+
+Anlık kullanım: get_meta_api_usage(ad_account_id) (bkz. api/health/meta-api/).
+Sayaçlar (istek / tekrar / bekleme) process bazlıdır.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.redis import RedisCache
+from facebook_business.api import FacebookAdsApi
+from facebook_business.exceptions import FacebookRequestError
+from facebook_business.session import FacebookSession
+
+logger = logging.getLogger(__name__)
+
+# Meta rate limit hata kodları: app (4), kullanıcı (17), Pages (32), reklam hesabı (613)
+# ve Business Use Case limitleri (80000-80014)
+THROTTLE_ERROR_CODES = frozenset({4, 17, 32, 613, *range(80000, 80015)})
+# Bilinmeyen / geçici servis hataları
+TRANSIENT_ERROR_CODES = frozenset({1, 2})
+
+USAGE_HEADERS = ('x-business-use-case-usage', 'x-app-usage', 'x-ad-account-usage')
+
+# Kullanım kaydı, son yanıttan bu kadar sonra düşer (Meta pencereleri 1 saatlik)
+_USAGE_TTL = 3600
+
+_stats = defaultdict(lambda: {
+    'requests': 0, 'retries': 0, 'throttled': 0, 'waits': 0, 'wait_seconds': 0.0,
+})
+_stats_lock = threading.Lock()
+# Paylaşımlı bucket devre dışı uyarısı verilen hesaplar (process başına bir kez)
+_unshared_warned = set()
+
+
+class MetaApiThrottled(Exception):
+    """Reklam hesabı throttling altında ve beklenecek süre max_wait'i aşıyor."""
+
+    def __init__(self, ad_account_id, retry_after):
+        self.ad_account_id = ad_account_id
+        self.retry_after = retry_after
+        super().__init__(
+            f'Meta API limiti: {ad_account_id} için yaklaşık {int(retry_after)} sn sonra tekrar deneyin.'
+        )
+
+
+def shared_throttling_available() -> bool:
+    """Paylaşımlı token bucket için cache atomik incr yapan Redis mi."""
+    return isinstance(caches[DEFAULT_CACHE_ALIAS], RedisCache)
+
+
+def _count(ad_account_id, field, amount=1):
+    with _stats_lock:
+        _stats[ad_account_id][field] += amount
+
+
+def _usage_key(ad_account_id):
+    return f'meta_api:usage:{ad_account_id}'
+
+
+def _pause_key(ad_account_id):
+    return f'meta_api:pause:{ad_account_id}'
+
+
+def _json_header(headers, name):
+    value = headers.get(name)
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        logger.warning(f"[MetaAPI] {name} header'ı okunamadı: {value!r}")
+        return None
+
+
+def parse_usage_headers(headers):
+    """
+    Graph API yanıt header'larındaki kullanım bilgisi.
+
+    Args:
+        headers: Yanıt header'ları (büyük / küçük harf duyarsız mapping)
+
+    Returns:
+        dict veya None (kullanım header'ı yoksa):
+            {'pct': en yüksek kullanım yüzdesi, 'regain_seconds': erişimin
+             geri geleceği süre (yoksa 0), 'app': {...}, 'business': {...},
+             'ad_account': {...}}
+    """
+    if not headers:
+        return None
+
+    app = _json_header(headers, 'x-app-usage')
+    business = _json_header(headers, 'x-business-use-case-usage')
+    ad_account = _json_header(headers, 'x-ad-account-usage')
+    if app is None and business is None and ad_account is None:
+        return None
+
+    percentages = [0]
+    regain_seconds = 0
+    if app:
+        percentages += [app.get(k) or 0 for k in ('call_count', 'total_cputime', 'total_time')]
+    for entries in (business or {}).values():
+        for entry in entries:
+            percentages += [entry.get(k) or 0 for k in ('call_count', 'total_cputime', 'total_time')]
+            # estimated_time_to_regain_access dakika cinsinden
+            regain_seconds = max(regain_seconds, (entry.get('estimated_time_to_regain_access') or 0) * 60)
+    if ad_account:
+        percentages.append(ad_account.get('acc_id_util_pct') or 0)
+
+    return {
+        'pct': float(max(percentages)),
+        'regain_seconds': regain_seconds,
+        'app': app,
+        'business': business,
+        'ad_account': ad_account,
+    }
+
+
+def get_meta_api_usage(ad_account_id):
+    """
+    Reklam hesabının paylaşımlı kullanım durumu ve bu process'in sayaçları.
+
+    Returns:
+        dict: {'ad_account_id', 'usage' (son yanıttaki kullanım, yoksa None),
+               'paused_for_seconds', 'capacity' (pencere başına token), 'process': {...}}
+    """
+    usage = cache.get(_usage_key(ad_account_id))
+    paused_until = cache.get(_pause_key(ad_account_id)) or 0
+    with _stats_lock:
+        process = dict(_stats[ad_account_id])
+    process['wait_seconds'] = round(process['wait_seconds'], 2)
+
+    return {
+        'ad_account_id': ad_account_id,
+        'shared_throttling': shared_throttling_available(),
+        'usage': usage,
+        'paused_for_seconds': max(0, round(paused_until - time.time(), 1)),
+        'capacity': _window_capacity(usage['pct'] if usage else 0),
+        'window_seconds': settings.META_API_WINDOW_SECONDS,
+        'process': process,
+    }
+
+
+def _window_capacity(pct):
+    """
+    Pencere başına token: eşiğe kadar tam kapasite, eşikten %100'e doğru
+    doğrusal azalır (en az 1).
+    """
+    full = settings.META_API_RATE_PER_SECOND * settings.META_API_WINDOW_SECONDS
+    threshold = settings.META_API_USAGE_THRESHOLD
+    if pct <= threshold:
+        return max(1, int(full))
+    remaining = max(0.0, (100 - pct) / (100 - threshold))
+    return max(1, int(full * remaining))
+
+
+def _request_cost(params):
+    """Batch isteği içindeki her istek ayrı sayılır."""
+    batch = (params or {}).get('batch')
+    if not batch:
+        return 1
+    if isinstance(batch, str):
+        try:
+            batch = json.loads(batch)
+        except ValueError:
+            return 1
+    return max(1, len(batch))
+
+
+class RateLimitedFacebookAdsApi(FacebookAdsApi):
+    """
+    Reklam hesabı bazında token bucket, kullanım header'ı takibi ve
+    throttling tekrarları ekleyen FacebookAdsApi.
+    """
+
+    def __init__(self, session, ad_account_id, max_wait=None, **kwargs):
+        super().__init__(session, **kwargs)
+        self.ad_account_id = ad_account_id
+        self.max_wait = settings.META_API_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self.shared = shared_throttling_available()
+        if not self.shared and ad_account_id not in _unshared_warned:
+            _unshared_warned.add(ad_account_id)
+            logger.warning(
+                f"[MetaAPI] Cache Redis değil (CACHE_URL); {ad_account_id} için paylaşımlı "
+                f"token bucket devre dışı, sadece throttling hatalarında tekrar denenir"
+            )
+
+    def call(self, method, path, params=None, headers=None, files=None, url_override=None, api_version=None):
+        cost = _request_cost(params)
+        max_retries = settings.META_API_MAX_RETRIES
+        attempt = 0
+
+        while True:
+            self._acquire(cost)
+            _count(self.ad_account_id, 'requests')
+            try:
+                response = super().call(
+                    method, path, params=params, headers=headers, files=files,
+                    url_override=url_override, api_version=api_version,
+                )
+            except FacebookRequestError as e:
+                usage = self.record_usage(e.http_headers())
+                if not self._is_retryable(e, method) or attempt >= max_retries:
+                    raise
+                attempt += 1
+                delay = self._backoff(attempt, usage)
+                if self._is_throttle(e):
+                    _count(self.ad_account_id, 'throttled')
+                    # Diğer worker'lar da bu hesaba istek atmasın
+                    self._pause(delay)
+                if delay > self.max_wait:
+                    raise MetaApiThrottled(self.ad_account_id, delay) from e
+                logger.warning(
+                    f"[MetaAPI] {self.ad_account_id} hata {e.api_error_code()} "
+                    f"({e.api_error_message()}), {delay:.1f} sn sonra tekrar ({attempt}/{max_retries})"
+                )
+                _count(self.ad_account_id, 'retries')
+                self._sleep(delay)
+                continue
+
+            self.record_usage(response.headers())
+            return response
+
+    @staticmethod
+    def _is_throttle(error):
+        return error.api_error_code() in THROTTLE_ERROR_CODES
+
+    def _is_retryable(self, error, method):
+        if self._is_throttle(error):
+            # Throttling'de istek işlenmeden reddedilir; POST da güvenle tekrarlanır
+            return True
+        if method != 'GET':
+            return False
+        return (
+            error.api_transient_error()
+            or error.api_error_code() in TRANSIENT_ERROR_CODES
+            or (error.http_status() or 0) >= 500
+        )
+
+    def _backoff(self, attempt, usage):
+        """Jitter'lı üstel bekleme; Meta erişim süresi bildirdiyse en az o kadar."""
+        ceiling = min(
+            settings.META_API_RETRY_MAX_SECONDS,
+            settings.META_API_RETRY_BASE_SECONDS * 2 ** (attempt - 1),
+        )
+        delay = random.uniform(ceiling / 2, ceiling)
+        if usage and usage['regain_seconds']:
+            delay = max(delay, usage['regain_seconds'])
+        return delay
+
+    def record_usage(self, headers):
+        """
+        Yanıt header'larındaki kullanımı paylaşımlı cache'e yaz; kullanım
+        duraklatma eşiğini geçtiyse veya erişim süresi bildirildiyse hesabı durdur.
+        """
+        usage = parse_usage_headers(headers)
+        if usage is None:
+            return None
+
+        usage['updated_at'] = time.time()
+        cache.set(_usage_key(self.ad_account_id), usage, timeout=_USAGE_TTL)
+
+        if usage['regain_seconds']:
+            self._pause(usage['regain_seconds'])
+        elif usage['pct'] >= settings.META_API_USAGE_PAUSE:
+            # Meta süre vermedi: kullanım düşene kadar kısa aralıklarla dene
+            self._pause(settings.META_API_WINDOW_SECONDS)
+        return usage
+
+    def register_throttle(self, seconds=None):
+        """
+        Batch içindeki alt isteklerden gelen throttling için hesabı durdur.
+
+        Returns:
+            Durdurma süresi (sn) - tekrar deneme için
+        """
+        _count(self.ad_account_id, 'throttled')
+        seconds = seconds or self._backoff(1, cache.get(_usage_key(self.ad_account_id)))
+        self._pause(seconds)
+        return seconds
+
+    def _pause(self, seconds):
+        if not self.shared:
+            return
+        until = time.time() + seconds
+        key = _pause_key(self.ad_account_id)
+        if until > (cache.get(key) or 0):
+            cache.set(key, until, timeout=int(seconds) + 1)
+
+    def _acquire(self, cost):
+        """
+        Reklam hesabının bucket'ından cost kadar token al; yoksa pencere
+        dolana kadar bekle.
+
+        Raises:
+            MetaApiThrottled: Beklenecek süre max_wait'i aşarsa
+        """
+        if not self.shared:
+            return
+
+        window = settings.META_API_WINDOW_SECONDS
+        waited = 0.0
+        while True:
+            now = time.time()
+            paused_until = cache.get(_pause_key(self.ad_account_id)) or 0
+            if paused_until > now:
+                delay = paused_until - now
+            else:
+                usage = cache.get(_usage_key(self.ad_account_id))
+                capacity = _window_capacity(usage['pct'] if usage else 0)
+                window_start = int(now // window) * window
+                key = f'meta_api:bucket:{self.ad_account_id}:{window_start}'
+                cache.add(key, 0, timeout=window * 2)
+                try:
+                    used = cache.incr(key, cost)
+                except ValueError:
+                    # Pencere key'i bu arada düştü: bir sonraki turda yeniden açılır
+                    continue
+                # Tek başına kapasiteyi aşan batch boş pencerede geçer
+                if used <= capacity or used == cost:
+                    return
+                delay = window_start + window - now
+
+            # Worker'lar aynı anda uyanmasın
+            delay += random.uniform(0, min(1.0, window / 4))
+            if waited + delay > self.max_wait:
+                raise MetaApiThrottled(self.ad_account_id, delay)
+            waited += delay
+            self._sleep(delay)
+
+    def _sleep(self, seconds):
+        _count(self.ad_account_id, 'waits')
+        _count(self.ad_account_id, 'wait_seconds', seconds)
+        time.sleep(seconds)
+
+
+def build_meta_api(app_id, app_secret, access_token, ad_account_id, max_wait=None):
+    """
+    Reklam hesabı için RateLimitedFacebookAdsApi oluştur ve SDK'nın
+    varsayılan api'si yap (api verilmeden oluşturulan SDK nesneleri için).
+    """
+    session = FacebookSession(app_id, app_secret, access_token)
+    api = RateLimitedFacebookAdsApi(session, ad_account_id, max_wait=max_wait)
+    FacebookAdsApi.set_default_api(api)
+    return api
@@ -51,85 +51,84 @@ def campaign_created_notification(sender, instance, created, **kwargs):
 @receiver(pre_save, sender=CampaignRequest)
 def campaign_status_changed(sender, instance, **kwargs):
     """Kampanya durumu değiştiğinde bayiye mail gönder"""
-    if instance.pk:  # Sadece güncelleme için
-        try:
-            old_instance = CampaignRequest.objects.get(pk=instance.pk)
-            
-            # Kampanya bilgileri
-            campaign_name = instance.campaign_name
-            campaign_id = instance.id
+    if not instance._state.adding:  # Sadece güncelleme için
+        # Eski durum yüklemede saklanan değerden okunur (ChangeTrackingMixin)
+        previous_status = instance.previous('status')
+        if not instance.has_changed('status'):
+            return
+
+        # Kampanya bilgileri
+        campaign_name = instance.campaign_name
+        campaign_id = instance.id
+        
+        # Dealer email kontrolü
+        if not instance.dealer or not instance.dealer.email:
+            return
             
-            # Dealer email kontrolü
-            if not instance.dealer or not instance.dealer.email:
-                return
-                
-            dealer_email = instance.dealer.email
+        dealer_email = instance.dealer.email
+        
+        # 1. Kampanya ONAYLANDI
+        if previous_status != 'onaylandi' and instance.status == 'onaylandi':
+            detail_link = f"{settings.FRONTEND_URL}/dealer/campaign-requests/{campaign_id}"
             
-            # 1. Kampanya ONAYLANDI
-            if old_instance.status != 'onaylandi' and instance.status == 'onaylandi':
-                detail_link = f"{settings.FRONTEND_URL}/dealer/campaign-requests/{campaign_id}"
-                
-                send_templated_email(
-                    subject='Kampanya talebiniz onaylandı.',
-                    template_name='emails/base_email.html',
-                    context={
-                        'content': f"""
-                            <strong>{campaign_name}</strong> için ilettiğiniz talep onaylandı.<br><br>
-                            Kampanyanız yayına alındığında tarafınıza bilgilendirme geçilecektir.<br><br>
-                            Detaylar için bu sayfayı ziyaret ediniz: <a href="{detail_link}">{detail_link}</a>
-                        """
-                    },
-                    recipient_list=[dealer_email],
-                )
+            send_templated_email(
+                subject='Kampanya talebiniz onaylandı.',
+                template_name='emails/base_email.html',
+                context={
+                    'content': f"""
+                        <strong>{campaign_name}</strong> için ilettiğiniz talep onaylandı.<br><br>
+                        Kampanyanız yayına alındığında tarafınıza bilgilendirme geçilecektir.<br><br>
+                        Detaylar için bu sayfayı ziyaret ediniz: <a href="{detail_link}">{detail_link}</a>
+                    """
+                },
+                recipient_list=[dealer_email],
+            )
+        
+        # 2. Kampanya YAYINDA
+        elif previous_status != 'yayinda' and instance.status == 'yayinda':
+            report_link = f"{settings.FRONTEND_URL}/backoffice/campaigns/requests/{campaign_id}/report"
             
-            # 2. Kampanya YAYINDA
-            elif old_instance.status != 'yayinda' and instance.status == 'yayinda':
-                report_link = f"{settings.FRONTEND_URL}/backoffice/campaigns/requests/{campaign_id}/report"
-                
-                send_templated_email(
-                    subject='Kampanyanız yayında!',
-                    template_name='emails/base_email.html',
-                    context={
-                        'content': f"""
-                            <strong>{campaign_name}</strong> yayına alındı.<br><br>
-                            Kampanyanıza dair istatistiklere raporlama sayfasından ulaşabilirsiniz:<br><br>
-                            Raporlama sayfası için link: <a href="{report_link}">{report_link}</a>
-                        """
-                    },
-                    recipient_list=[dealer_email],
-                )
+            send_templated_email(
+                subject='Kampanyanız yayında!',
+                template_name='emails/base_email.html',
+                context={
+                    'content': f"""
+                        <strong>{campaign_name}</strong> yayına alındı.<br><br>
+                        Kampanyanıza dair istatistiklere raporlama sayfasından ulaşabilirsiniz:<br><br>
+                        Raporlama sayfası için link: <a href="{report_link}">{report_link}</a>
+                    """
+                },
+                recipient_list=[dealer_email],
+            )
+        
+        # 3. Kampanya REDDEDİLDİ
+        elif previous_status != 'reddedildi' and instance.status == 'reddedildi':
+            detail_link = f"{settings.FRONTEND_URL}/dealer/campaign-requests/{campaign_id}"
             
-            # 3. Kampanya REDDEDİLDİ
-            elif old_instance.status != 'reddedildi' and instance.status == 'reddedildi':
-                detail_link = f"{settings.FRONTEND_URL}/dealer/campaign-requests/{campaign_id}"
-                
-                send_templated_email(
-                    subject='Kampanya talebiniz güncellendi',
-                    template_name='emails/base_email.html',
-                    context={
-                        'content': f"""
-                            Kampanya talebiniz yönetici tarafından güncellendi.<br><br>
-                            Detayları görmek için bu sayfayı ziyaret ediniz: <a href="{detail_link}">{detail_link}</a>
-                        """
-                    },
-                    recipient_list=[dealer_email],
-                )
+            send_templated_email(
+                subject='Kampanya talebiniz güncellendi',
+                template_name='emails/base_email.html',
+                context={
+                    'content': f"""
+                        Kampanya talebiniz yönetici tarafından güncellendi.<br><br>
+                        Detayları görmek için bu sayfayı ziyaret ediniz: <a href="{detail_link}">{detail_link}</a>
+                    """
+                },
+                recipient_list=[dealer_email],
+            )
+        
+        # 4. Kampanya TAMAMLANDI
+        elif previous_status != 'tamamlandi' and instance.status == 'tamamlandi':
+            detail_link = f"{settings.FRONTEND_URL}/dealer/campaign-requests/{campaign_id}"
             
-            # 4. Kampanya TAMAMLANDI
-            elif old_instance.status != 'tamamlandi' and instance.status == 'tamamlandi':
-                detail_link = f"{settings.FRONTEND_URL}/dealer/campaign-requests/{campaign_id}"
-                
-                send_templated_email(
-                    subject='Kampanya talebiniz güncellendi',
-                    template_name='emails/base_email.html',
-                    context={
-                        'content': f"""
-                            Kampanya talebiniz yönetici tarafından güncellendi.<br><br>
-                            Detayları görmek için bu sayfayı ziyaret ediniz: <a href="{detail_link}">{detail_link}</a>
-                        """
-                    },
-                    recipient_list=[dealer_email],
-                )
-                    
-        except CampaignRequest.DoesNotExist:
-            pass
+            send_templated_email(
+                subject='Kampanya talebiniz güncellendi',
+                template_name='emails/base_email.html',
+                context={
+                    'content': f"""
+                        Kampanya talebiniz yönetici tarafından güncellendi.<br><br>
+                        Detayları görmek için bu sayfayı ziyaret ediniz: <a href="{detail_link}">{detail_link}</a>
+                    """
+                },
+                recipient_list=[dealer_email],
+            )
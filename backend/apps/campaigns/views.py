@@ -1,9 +1,10 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from django.db import router, transaction
 from django.utils import timezone
 from decimal import Decimal
 import random
@@ -16,8 +17,15 @@ from .serializers import (
     CampaignRequestCreateUpdateSerializer,
     CampaignReportSerializer,
     CampaignCreativeFileSerializer,
+    FacebookPushJobSerializer,
 )
+from apps.dealers.budgets import BudgetError
+from apps.dealers.models import DealerMonthlySummary
+from apps.dealers.summaries import request_summary_statistics
 from apps.users.permissions import IsAdminOrModerator, IsOwnerOrAdmin
+from config.search import DocumentSearchFilter
+from config.status_board import status_board
+from config.status_stats import status_statistics
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +34,7 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
     """ViewSet for CampaignRequest CRUD operations"""
     queryset = CampaignRequest.objects.select_related('dealer')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, DocumentSearchFilter]
     filterset_fields = ['status', 'dealer', 'campaign_type', 'redirect_type', 'fb_push_status']
     search_fields = ['campaign_name', 'dealer__dealer_name', 'notes']
     ordering_fields = ['created_at', 'budget', 'start_date', 'end_date', 'updated_at', 'id', 'status', 'campaign_name', 'dealer__dealer_name']
@@ -44,7 +52,7 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
         """Admin/Moderator for status changes, Bayi can create own requests"""
         if self.action in ['update', 'partial_update', 'destroy']:
             return [IsOwnerOrAdmin()]
-        if self.action in ['push_to_facebook', 'check_fb_status']:
+        if self.action in ['push_to_facebook', 'push_to_facebook_bulk', 'push_status', 'check_fb_status']:
             return [IsAdminOrModerator()]
         return [IsAuthenticated()]
     
@@ -57,27 +65,41 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
             return self.queryset
         
         # Bayi can only see their own requests
-        if user.is_bayi and user.dealer:
-            return self.queryset.filter(dealer=user.dealer)
+        if user.is_bayi and user.dealer_id:
+            return self.queryset.filter(dealer_id=user.dealer_id)
         
         return self.queryset.none()
     
     def perform_create(self, serializer):
         """Set dealer automatically for dealer users"""
         user = self.request.user
-        
-        # If dealer user, automatically set their dealer
-        if user.is_bayi and user.dealer:
-            instance = serializer.save(dealer=user.dealer)
-        else:
-            instance = serializer.save()
 
-        CampaignActivityLog.log(
-            campaign_request=instance,
-            action=CampaignActivityLog.ActionType.CREATED,
-            message=f'Kampanya talebi oluşturuldu: {instance.campaign_name}',
-            user=user,
-        )
+        # Talep, bütçe rezervasyonu, aktivite logu ve bildirim e-postası (outbox)
+        # brand DB'sinde birlikte commit edilir
+        try:
+            with transaction.atomic(using=router.db_for_write(CampaignRequest)):
+                # If dealer user, automatically set their dealer
+                if user.is_bayi and user.dealer:
+                    instance = serializer.save(dealer=user.dealer)
+                else:
+                    instance = serializer.save()
+
+                CampaignActivityLog.log(
+                    campaign_request=instance,
+                    action=CampaignActivityLog.ActionType.CREATED,
+                    message=f'Kampanya talebi oluşturuldu: {instance.campaign_name}',
+                    user=user,
+                )
+        except BudgetError as e:
+            raise serializers.ValidationError({'budget': [str(e)]})
+
+    def perform_update(self, serializer):
+        # Tutar / tarih değişikliği plandan düşen bütçeyi artırabilir; yetmezse kayıt geri alınır
+        try:
+            with transaction.atomic(using=router.db_for_write(CampaignRequest)):
+                serializer.save()
+        except BudgetError as e:
+            raise serializers.ValidationError({'budget': [str(e)]})
     
     @action(detail=True, methods=['post'])
     def change_status(self, request, pk=None):
@@ -106,21 +128,28 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
         
         old_status = campaign_request.status
         campaign_request.status = new_status
-        campaign_request.save()
 
-        # Durum değişikliğini logla
-        status_labels = dict(CampaignRequest.Status.choices)
-        CampaignActivityLog.log(
-            campaign_request=campaign_request,
-            action=CampaignActivityLog.ActionType.STATUS_CHANGE,
-            message=f'Durum değiştirildi: {status_labels.get(old_status, old_status)} → {status_labels.get(new_status, new_status)}',
-            user=request.user,
-            details={
-                'old_status': old_status,
-                'new_status': new_status,
-                'admin_notes': request.data.get('admin_notes', ''),
-            },
-        )
+        # Durum, log, bütçe defteri ve bildirim e-postası (outbox) tek transaction'da;
+        # plan bütçesi onayı karşılamıyorsa hiçbiri yazılmaz
+        try:
+            with transaction.atomic(using=router.db_for_write(CampaignRequest)):
+                campaign_request.save()
+
+                # Durum değişikliğini logla
+                status_labels = dict(CampaignRequest.Status.choices)
+                CampaignActivityLog.log(
+                    campaign_request=campaign_request,
+                    action=CampaignActivityLog.ActionType.STATUS_CHANGE,
+                    message=f'Durum değiştirildi: {status_labels.get(old_status, old_status)} → {status_labels.get(new_status, new_status)}',
+                    user=request.user,
+                    details={
+                        'old_status': old_status,
+                        'new_status': new_status,
+                        'admin_notes': request.data.get('admin_notes', ''),
+                    },
+                )
+        except BudgetError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         
         serializer = CampaignRequestDetailSerializer(campaign_request)
         return Response(serializer.data)
@@ -128,10 +157,15 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='push-to-facebook')
     def push_to_facebook(self, request, pk=None):
         """
-        Kampanya talebini Facebook'a gönder.
+        Kampanya talebini Facebook'a gönderim kuyruğuna al.
         Sadece admin/moderator kullanabilir.
         Kampanya durumu 'onaylandi' olmalıdır.
+
+        Graph API zinciri worker'da çalışır (manage.py run_facebook_push_jobs);
+        202 + iş id döner, ilerleme: GET push-status/
         """
+        from .services.facebook_push import PushAlreadyQueued, enqueue_facebook_push
+
         campaign_request = self.get_object()
 
         # Durum kontrolü
@@ -149,120 +183,89 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Push durumunu güncelle
-        campaign_request.fb_push_status = 'pushing'
-        campaign_request.fb_push_error = ''
-        campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
-
-        # Deneme logu
-        CampaignActivityLog.log(
-            campaign_request=campaign_request,
-            action=CampaignActivityLog.ActionType.FB_PUSH_ATTEMPT,
-            message='Facebook kampanya oluşturma başlatıldı',
-            user=request.user,
-        )
-
         try:
-            from .services.meta_ads_service import MetaAdsService, MetaAdsServiceError
-
-            service = MetaAdsService()
-            result = service.create_full_campaign(campaign_request)
-
-            if result.get('success'):
-                campaign_request.fb_campaign_id = result['campaign_id']
-                campaign_request.fb_adset_id = result['adset_id']
-                campaign_request.fb_creative_id = result['creative_id']
-                campaign_request.fb_ad_id = result['ad_id']
-                campaign_request.fb_push_status = 'success'
-                campaign_request.fb_push_error = ''
-                campaign_request.fb_pushed_at = timezone.now()
-                campaign_request.status = CampaignRequest.Status.YAYINDA
-                campaign_request.save()
+            job = enqueue_facebook_push(campaign_request, user=request.user)
+        except PushAlreadyQueued as e:
+            return Response(
+                {'error': 'Bu kampanya için Facebook gönderimi zaten kuyrukta.',
+                 'job': FacebookPushJobSerializer(e.job).data if e.job else None},
+                status=status.HTTP_409_CONFLICT
+            )
 
-                logger.info(f'[PushToFB] Kampanya #{campaign_request.id} başarıyla gönderildi. FB ID: {result["campaign_id"]}')
+        return Response({
+            'success': True,
+            'message': 'Kampanya Facebook gönderim kuyruğuna alındı.',
+            'fb_push_status': campaign_request.fb_push_status,
+            'job': FacebookPushJobSerializer(job).data,
+        }, status=status.HTTP_202_ACCEPTED)
 
-                # Başarı logu
-                CampaignActivityLog.log(
-                    campaign_request=campaign_request,
-                    action=CampaignActivityLog.ActionType.FB_PUSH_SUCCESS,
-                    message=f'Facebook kampanya başarıyla oluşturuldu (Campaign: {result["campaign_id"]})',
-                    user=request.user,
-                    details={
-                        'campaign_id': result['campaign_id'],
-                        'adset_id': result['adset_id'],
-                        'creative_id': result['creative_id'],
-                        'ad_id': result['ad_id'],
-                    },
-                )
+    @action(detail=False, methods=['post'], url_path='push-to-facebook-bulk')
+    def push_to_facebook_bulk(self, request):
+        """
+        Birden çok onaylı kampanyayı Facebook gönderim kuyruğuna al ({"ids": [...]}).
+        Sadece admin/moderator kullanabilir. Worker kuyruktaki işleri Graph API
+        batch istekleriyle birlikte gönderir (FB_PUSH_BATCH_SIZE).
 
-                serializer = CampaignRequestDetailSerializer(campaign_request)
-                return Response({
-                    'success': True,
-                    'message': 'Kampanya başarıyla Facebook\'a gönderildi.',
-                    'data': serializer.data,
-                })
+        Returns:
+            202: {'jobs': [...], 'errors': {id: hata}}
+        """
+        from .services.facebook_push import PushAlreadyQueued, enqueue_facebook_push
+
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(str(pk).isdigit() for pk in ids):
+            return Response({'error': 'ids: kampanya id listesi gereklidir.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        campaign_requests = {cr.pk: cr for cr in self.get_queryset().filter(pk__in=ids)}
+        jobs, errors = [], {}
+        for pk in dict.fromkeys(int(pk) for pk in ids):
+            campaign_request = campaign_requests.get(pk)
+            if campaign_request is None:
+                errors[pk] = 'Kampanya bulunamadı.'
+            elif campaign_request.status != CampaignRequest.Status.ONAYLANDI:
+                errors[pk] = 'Sadece onaylanmış kampanyalar Facebook\'a gönderilebilir.'
+            elif campaign_request.fb_push_status == 'success':
+                errors[pk] = 'Bu kampanya zaten Facebook\'a gönderilmiş.'
             else:
-                error_msg = result.get('error', 'Bilinmeyen hata')
-                campaign_request.fb_push_status = 'failed'
-                campaign_request.fb_push_error = error_msg
-                campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
-
-                logger.error(f'[PushToFB] Kampanya #{campaign_request.id} gönderilemedi: {error_msg}')
-
-                # Hata logu
-                CampaignActivityLog.log(
-                    campaign_request=campaign_request,
-                    action=CampaignActivityLog.ActionType.FB_PUSH_FAILED,
-                    message=f'Facebook gönderim başarısız: {error_msg[:200]}',
-                    user=request.user,
-                    details={'error': error_msg, 'result': result},
-                )
-
-                return Response(
-                    {'error': error_msg,
-                     'fb_push_status': 'failed'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
-        except MetaAdsServiceError as e:
-            error_msg = str(e)
-            campaign_request.fb_push_status = 'failed'
-            campaign_request.fb_push_error = error_msg
-            campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
+                try:
+                    jobs.append(enqueue_facebook_push(campaign_request, user=request.user))
+                except PushAlreadyQueued:
+                    errors[pk] = 'Bu kampanya için Facebook gönderimi zaten kuyrukta.'
+
+        return Response({
+            'success': bool(jobs),
+            'message': f'{len(jobs)} kampanya Facebook gönderim kuyruğuna alındı.',
+            'jobs': FacebookPushJobSerializer(jobs, many=True).data,
+            'errors': errors,
+        }, status=status.HTTP_202_ACCEPTED if jobs else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=['get'], url_path='push-status')
+    def push_status(self, request, pk=None):
+        """
+        Facebook gönderim işinin adım adım ilerlemesi (son iş veya ?job=<id>).
+        Sadece admin/moderator kullanabilir.
+        """
+        campaign_request = self.get_object()
 
-            CampaignActivityLog.log(
-                campaign_request=campaign_request,
-                action=CampaignActivityLog.ActionType.FB_PUSH_FAILED,
-                message=f'Facebook gönderim hatası: {error_msg[:200]}',
-                user=request.user,
-                details={'error': error_msg, 'error_type': 'MetaAdsServiceError'},
-            )
+        jobs = campaign_request.fb_push_jobs.all()
+        job_id = request.query_params.get('job')
+        if job_id:
+            if not job_id.isdigit():
+                return Response({'error': 'Geçersiz iş id.'}, status=status.HTTP_400_BAD_REQUEST)
+            jobs = jobs.filter(pk=job_id)
 
+        job = jobs.order_by('-created_at').first()
+        if job is None:
             return Response(
-                {'error': error_msg, 'fb_push_status': 'failed'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Bu kampanya için Facebook gönderim işi bulunamadı.'},
+                status=status.HTTP_404_NOT_FOUND
             )
-        except Exception as e:
-            error_msg = str(e)
-            campaign_request.fb_push_status = 'failed'
-            campaign_request.fb_push_error = error_msg
-            campaign_request.save(update_fields=['fb_push_status', 'fb_push_error'])
 
-            logger.error(f'[PushToFB] Beklenmeyen hata: {e}', exc_info=True)
-
-            CampaignActivityLog.log(
-                campaign_request=campaign_request,
-                action=CampaignActivityLog.ActionType.FB_PUSH_FAILED,
-                message=f'Beklenmeyen hata: {error_msg[:200]}',
-                user=request.user,
-                details={'error': error_msg, 'error_type': type(e).__name__},
-            )
-
-            return Response(
-                {'error': f'Beklenmeyen bir hata oluştu: {error_msg}',
-                 'fb_push_status': 'failed'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response({
+            'fb_push_status': campaign_request.fb_push_status,
+            'fb_push_error': campaign_request.fb_push_error,
+            'fb_campaign_id': campaign_request.fb_campaign_id,
+            'job': FacebookPushJobSerializer(job).data,
+        })
 
     @action(detail=True, methods=['get'], url_path='check-fb-status')
     def check_fb_status(self, request, pk=None):
@@ -281,7 +284,8 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
         try:
             from .services.meta_ads_service import MetaAdsService
 
-            service = MetaAdsService()
+            # HTTP isteği içinde rate limit için uzun beklenmez
+            service = MetaAdsService(max_wait=5)
             result = service.check_campaign_status(campaign_request.fb_campaign_id)
 
             if result.get('success'):
@@ -446,46 +450,33 @@ class CampaignRequestViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_status(self, request):
-        """Get requests grouped by status"""
+        """
+        Get requests grouped by status.
+        Tek sorgu (window function); ?limit=N, kolon için ?column=<status>&cursor=<next_cursor>
+        """
         queryset = self.filter_queryset(self.get_queryset())
-        
-        result = {}
-        for status_choice in CampaignRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            requests = queryset.filter(status=status_code)
-            result[status_code] = {
-                'label': status_label,
-                'count': requests.count(),
-                'requests': CampaignRequestSerializer(requests[:10], many=True).data
-            }
-        
-        return Response(result)
+        return Response(status_board(queryset, CampaignRequestSerializer, request))
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get statistics for campaign requests"""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        from django.db.models import Sum, Count, Avg
-        
-        stats = queryset.aggregate(
-            total_count=Count('id'),
-            total_budget=Sum('budget'),
-            avg_budget=Avg('budget')
+        # Filtre yoksa (veya sadece ?dealer) bayi aylık özet tablosundan
+        stats = request_summary_statistics(
+            request,
+            DealerMonthlySummary.Kind.CAMPAIGN,
+            sums={'total_budget': 'amount'},
+            averages={'avg_budget': 'amount'},
         )
+        if stats is not None:
+            return Response(stats)
         
-        # Count by status
-        status_counts = {}
-        for status_choice in CampaignRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            count = queryset.filter(status=status_code).count()
-            status_counts[status_code] = {
-                'label': status_label,
-                'count': count
-            }
+        queryset = self.filter_queryset(self.get_queryset())
         
-        stats['by_status'] = status_counts
+        # Toplamlar ve status bazlı sayılar tek sorguda (brand bazlı cache'li)
+        stats = status_statistics(
+            queryset,
+            sums={'total_budget': 'budget'},
+            averages={'avg_budget': 'budget'},
+        )
         
         return Response(stats)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Dealer, DealerBudget
+from .models import BudgetLedgerEntry, Dealer, DealerBudget
 
 
 class DealerBudgetInline(admin.TabularInline):
@@ -76,3 +76,30 @@ class DealerBudgetAdmin(admin.ModelAdmin):
     def usage_percentage_display(self, obj):
         return f"{obj.usage_percentage:.1f}%"
     usage_percentage_display.short_description = 'Usage %'
+
+
+@admin.register(BudgetLedgerEntry)
+class BudgetLedgerEntryAdmin(admin.ModelAdmin):
+    """Bütçe defteri - append-only, sadece görüntüleme"""
+    
+    list_display = [
+        'created_at', 'dealer', 'year', 'plan', 'kind',
+        'used_delta', 'reserved_delta', 'campaign_request', 'incentive_request', 'applied'
+    ]
+    
+    list_filter = ['kind', 'year', 'applied']
+    
+    search_fields = ['dealer__dealer_code', 'dealer__dealer_name', 'note']
+    
+    list_select_related = ['dealer', 'plan__dealer']
+    
+    raw_id_fields = ['dealer', 'plan', 'campaign_request', 'incentive_request', 'created_by']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -9,10 +9,11 @@ class DealersConfig(AppConfig):
     def ready(self):
         """Import signals when app is ready"""
         import apps.dealers.signals
-
-
-
-
-
-
-
+        
+        # Kampanya / teşvik / görsel / bütçe planı değişince aylık özeti güncelle
+        from .summaries import register_dealer_summaries
+        register_dealer_summaries()
+        
+        # Kampanya / teşvik durumu değişince bütçe defterine satır ekle
+        from .budgets import register_budget_ledger
+        register_budget_ledger()
@@ -0,0 +1,528 @@
+"""
+Bütçe Planı Kontrol, Rezervasyon ve Bütçe Defteri (Ledger)
+
+Bütçe kullanımı append-only BudgetLedgerEntry satırlarıyla tutulur
+(reserve / commit / release / adjust). Plan ve yıl toplamları
+(DealerBudgetPlan.used_amount / reserved_amount, DealerBudget.used_budget)
+bu satırlardan artımlı güncellenen önbelleklerdir:
+
+- Yazarlar sadece satır ekler; eşzamanlı kampanya onayları aynı plan
+  satırında UPDATE için beklemez
+- apply_ledger_entries commit sonrası işlenmemiş satırları (SKIP LOCKED)
+  toplayıp plan / yıl satırlarına yansıtır; kalanlar için
+  manage.py apply_budget_ledger
+- remaining_amount / usage_percentage toplamlardan okunur
+
+Bütçe planları period daterange kolonu üzerinden sorgulanır; aktif planlar
+çakışmadığı için bir tarih aralığını kapsayan en fazla bir plan vardır.
+
+- find_budget_plan: kapsayan plan, yoksa kısmen çakışan ilk plan (tek sorgu)
+- reserve_plan_budget: kapsayan plandan rezervasyon. Kullanılabilir tutar
+  kontrolü plan satırı kilitliyken (SELECT ... FOR UPDATE) yapılır;
+  eşzamanlı rezervasyonlar bütçeyi aşamaz
+- release_plan_budget: rezervasyonu geri alır
+- sync_request_budget: kampanya / teşvik talebinin durumuna göre
+  reserve / commit / release / adjust satırları (kayıt sinyalleri ile
+  çağrılır). Onaya gönderilen talep tutarı plandan rezerve eder, onayda
+  rezervasyon harcamaya çevrilir; plandan düşen her artış plan kilitliyken
+  kontrol edilir, yetmezse BudgetError (kayıt geri alınır)
+
+Usage:
+    from apps.dealers.budgets import BudgetError, reserve_plan_budget
+
+    try:
+        plan = reserve_plan_budget(dealer.pk, start, end, Decimal('15000'), source=campaign_request)
+    except BudgetError as e:
+        return Response({'error': str(e)}, status=400)
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+
+from django.apps import apps
+from django.db import router, transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, pre_delete
+from django.utils import timezone
+
+from .models import BudgetLedgerEntry, DateRange, DealerBudget, DealerBudgetPlan
+from .summaries import schedule_summary_refresh
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+
+class BudgetError(Exception):
+    """Rezervasyon / iade yapılamadı (plan yok, kapsamıyor veya bütçe yetersiz)."""
+
+    def __init__(self, message, plan=None):
+        super().__init__(message)
+        self.plan = plan
+
+
+class RequestBudgetSource:
+    """
+    Bütçe kullanan talep modeli.
+
+    Args:
+        field: BudgetLedgerEntry'deki FK alanı
+        spent_statuses: bütçeden harcanmış sayılan durumlar (commit)
+        reserved_statuses: onay bekleyen, tutarı plandan rezerve eden durumlar
+        released_statuses: harcama ve rezervasyonların iade edildiği durumlar
+        amount: talepten harcanan tutar
+        period: talebin (başlangıç, bitiş) tarihleri - plan eşleşmesi için
+    """
+
+    def __init__(self, field, spent_statuses, reserved_statuses, released_statuses, amount, period):
+        self.field = field
+        self.spent_statuses = spent_statuses
+        self.reserved_statuses = reserved_statuses
+        self.released_statuses = released_statuses
+        self.amount = amount
+        self.period = period
+
+
+def _created_day(instance):
+    created = timezone.localtime(instance.created_at or timezone.now()).date()
+    return created, created
+
+
+REQUEST_SOURCES = {
+    'campaigns.CampaignRequest': RequestBudgetSource(
+        'campaign_request',
+        spent_statuses={'onaylandi', 'yayinda', 'tamamlandi'},
+        reserved_statuses={'onay_bekliyor'},
+        released_statuses={'reddedildi'},
+        amount=lambda instance: Decimal(str(instance.budget or 0)),
+        period=lambda instance: (instance.start_date, instance.end_date),
+    ),
+    'incentives.IncentiveRequest': RequestBudgetSource(
+        'incentive_request',
+        spent_statuses={'onaylandi', 'tamamlandi'},
+        reserved_statuses={'onay_bekliyor', 'degerlendirme'},
+        released_statuses={'reddedildi'},
+        amount=lambda instance: Decimal(str(instance.approved_amount or instance.incentive_amount or 0)),
+        period=_created_day,
+    ),
+}
+
+
+def _active_plans(dealer_id):
+    return DealerBudgetPlan.objects.filter(dealer_id=dealer_id, is_active=True)
+
+
+def _source_kwargs(source) -> dict:
+    if source is None:
+        return {}
+    return {REQUEST_SOURCES[source._meta.label].field: source}
+
+
+def find_budget_plan(dealer_id, start, end):
+    """
+    Tarih aralığı için bütçe planı (tek sorgu).
+
+    Returns:
+        Kapsayan plan (covers=True), yoksa aralıkla kısmen çakışan ilk plan
+        (covers=False), hiç çakışan yoksa None
+    """
+    requested = DateRange(start, end)
+    return (
+        _active_plans(dealer_id)
+        .filter(period__overlap=requested)
+        .annotate(covers=ExpressionWrapper(Q(period__contains=requested), output_field=BooleanField()))
+        .order_by('-covers', 'start_date', '-end_date')
+        .first()
+    )
+
+
+def _fit_error(plan, amount, available=None) -> str:
+    if plan is None:
+        return 'Bu tarih aralığında tanımlı bir bütçe planı bulunmuyor.'
+    if not plan.covers:
+        return (
+            f'Seçilen tarih aralığı bütçe planını tam kapsamıyor. Mevcut plan: '
+            f'{plan.start_date.strftime("%d.%m.%Y")} - {plan.end_date.strftime("%d.%m.%Y")}'
+        )
+    available = plan.remaining_amount if available is None else available
+    return f'Yetersiz bütçe. Kullanılabilir: ₺{available:,.0f}, Talep edilen: ₺{amount:,.0f}'
+
+
+def _pending_deltas(plan_id) -> tuple[Decimal, Decimal]:
+    """Plan için henüz toplamlara işlenmemiş (used, reserved) değişimi."""
+    totals = BudgetLedgerEntry.objects.filter(plan_id=plan_id, applied=False).aggregate(
+        used=Coalesce(Sum('used_delta'), ZERO),
+        reserved=Coalesce(Sum('reserved_delta'), ZERO),
+    )
+    return totals['used'], totals['reserved']
+
+
+def record_entries(entries) -> list:
+    """
+    Ledger satırlarını ekle (sıfır değişimliler atlanır); toplamlar commit
+    sonrası apply_ledger_entries ile güncellenir.
+    """
+    entries = [entry for entry in entries if entry.used_delta or entry.reserved_delta]
+    if not entries:
+        return []
+
+    alias = router.db_for_write(BudgetLedgerEntry)
+    created = BudgetLedgerEntry.objects.using(alias).bulk_create(entries)
+    transaction.on_commit(partial(_apply_after_commit, alias), using=alias)
+    return created
+
+
+def _apply_after_commit(alias) -> None:
+    """Commit sonrası toplamları güncelle; hata isteği bozmaz (apply_budget_ledger düzeltir)."""
+    try:
+        apply_ledger_entries(alias)
+    except Exception:
+        logger.exception(f"[BudgetLedger] {alias} toplamlar güncellenemedi")
+
+
+def reserve_plan_budget(dealer_id, start, end, amount: Decimal, source=None, user=None) -> DealerBudgetPlan:
+    """
+    Aralığı kapsayan aktif plandan tutarı rezerve et (reserve satırı).
+
+    Args:
+        source: rezervasyonun bağlı olduğu CampaignRequest / IncentiveRequest (opsiyonel)
+    Returns:
+        Rezervasyon yapılan plan
+    Raises:
+        BudgetError: plan yok / aralığı kapsamıyor / bütçe yetersiz
+    """
+    if amount <= 0:
+        raise BudgetError('Tutar sıfırdan büyük olmalı.')
+
+    with transaction.atomic(using=router.db_for_write(DealerBudgetPlan)):
+        # Sadece rezervasyonlar plan satırını kilitler; onaylar (commit) kilitsiz satır ekler
+        plan = _active_plans(dealer_id).filter(period__contains=DateRange(start, end)).select_for_update().first()
+        if plan is None:
+            raise BudgetError(_fit_error(find_budget_plan(dealer_id, start, end), amount))
+
+        plan.covers = True
+        pending_used, pending_reserved = _pending_deltas(plan.pk)
+        available = plan.remaining_amount - pending_used - pending_reserved
+        if amount > available:
+            raise BudgetError(_fit_error(plan, amount, available), plan=plan)
+
+        record_entries([BudgetLedgerEntry(
+            dealer_id=dealer_id, plan=plan, year=start.year,
+            kind=BudgetLedgerEntry.Kind.RESERVE, reserved_delta=amount,
+            created_by=user, **_source_kwargs(source),
+        )])
+        return plan
+
+
+def release_plan_budget(plan_id, amount: Decimal, source=None, user=None) -> DealerBudgetPlan:
+    """
+    Rezerve edilen tutarı plana geri ver (release satırı).
+
+    Raises:
+        BudgetError: plan yok veya rezerve tutar iade edilenden az
+    """
+    if amount <= 0:
+        raise BudgetError('Tutar sıfırdan büyük olmalı.')
+
+    with transaction.atomic(using=router.db_for_write(DealerBudgetPlan)):
+        plan = DealerBudgetPlan.objects.select_for_update().filter(pk=plan_id).first()
+        if plan is None:
+            raise BudgetError('Bütçe planı bulunamadı.')
+
+        reserved = plan.reserved_amount + _pending_deltas(plan.pk)[1]
+        if reserved < amount:
+            raise BudgetError(f'İade tutarı rezerve tutardan fazla. Rezerve: ₺{reserved:,.0f}', plan=plan)
+
+        record_entries([BudgetLedgerEntry(
+            dealer_id=plan.dealer_id, plan=plan, year=plan.start_date.year,
+            kind=BudgetLedgerEntry.Kind.RELEASE, reserved_delta=-amount,
+            created_by=user, **_source_kwargs(source),
+        )])
+        return plan
+
+
+def sync_request_budget(instance, released=False, user=None) -> list:
+    """
+    Talebin ledger bakiyesini durumuna getir.
+
+    - Onay bekleyen durumlar (örn. onay_bekliyor): tutar kapsayan plandan
+      rezerve edilir
+    - Harcama durumları (örn. onaylandi): tutar kapsayan plana / yıla commit
+      edilir, talebin rezervasyonu harcamaya çevrilir; tutar değişirse adjust
+    - İade durumları (reddedildi) veya released=True: harcama ve
+      rezervasyonlar release edilir
+    - Diğer durumlar (taslak): harcama ve rezervasyonlar geri alınır
+
+    Plandan düşen tutar artıyorsa kullanılabilir tutar plan satırı
+    kilitliyken (SELECT ... FOR UPDATE) kontrol edilir; eşzamanlı onaylar
+    planı aşamaz. Kapsayan plan yoksa tutar sadece yıla commit edilir.
+
+    Returns:
+        Eklenen ledger satırları
+    Raises:
+        BudgetError: Kapsayan planda bütçe yetersiz (çağıranın transaction'ı geri alınmalı)
+    """
+    with transaction.atomic(using=router.db_for_write(BudgetLedgerEntry)):
+        source = REQUEST_SOURCES[instance._meta.label]
+        current = {
+            (row['plan_id'], row['year']): (row['used'], row['reserved'])
+            for row in BudgetLedgerEntry.objects.filter(**{source.field: instance})
+            .values('plan_id', 'year')
+            .annotate(used=Sum('used_delta'), reserved=Sum('reserved_delta'))
+            .order_by()
+        }
+        used_total = sum((used for used, _ in current.values()), ZERO)
+        reserved_total = sum((reserved for _, reserved in current.values()), ZERO)
+
+        spent = instance.status in source.spent_statuses
+        if released or instance.status in source.released_statuses:
+            desired = {}
+            kind = BudgetLedgerEntry.Kind.RELEASE
+        elif spent or instance.status in source.reserved_statuses:
+            target = source.amount(instance)
+            if len(current) <= 1 and (used_total, reserved_total) == ((target, ZERO) if spent else (ZERO, target)):
+                return []
+            start, end = source.period(instance)
+            plan = _active_plans(instance.dealer_id).filter(period__contains=DateRange(start, end)).first()
+            if spent:
+                desired = {(plan.pk if plan else None, start.year): (target, ZERO)}
+                kind = BudgetLedgerEntry.Kind.ADJUST if used_total else BudgetLedgerEntry.Kind.COMMIT
+            else:
+                # Plansız rezervasyon bir şeyi korumaz; onayda yıla commit edilir
+                desired = {(plan.pk, start.year): (ZERO, target)} if plan and target else {}
+                kind = BudgetLedgerEntry.Kind.RESERVE
+            if plan:
+                _check_plan_increase(plan, instance, source, current, desired)
+        else:
+            desired = {}
+            kind = BudgetLedgerEntry.Kind.RELEASE
+
+        entries = []
+        for key in desired.keys() | current.keys():
+            plan_id, year = key
+            used, reserved = current.get(key, (ZERO, ZERO))
+            target_used, target_reserved = desired.get(key, (ZERO, ZERO))
+            entries.append(BudgetLedgerEntry(
+                dealer_id=instance.dealer_id, plan_id=plan_id, year=year, kind=kind,
+                used_delta=target_used - used, reserved_delta=target_reserved - reserved,
+                note=f'Durum: {instance.status}', created_by=user,
+                **{source.field: instance},
+            ))
+        return record_entries(entries)
+
+
+def _check_plan_increase(plan, instance, source, current, desired) -> None:
+    """Talebin plandan düştüğü tutar artıyorsa plan satırı kilitliyken kullanılabilir tutarı kontrol et."""
+    def plan_total(balances):
+        return sum((used + reserved for (plan_id, _), (used, reserved) in balances.items() if plan_id == plan.pk), ZERO)
+
+    increase = plan_total(desired) - plan_total(current)
+    if increase <= 0:
+        return
+
+    plan = DealerBudgetPlan.objects.select_for_update().get(pk=plan.pk)
+    plan.covers = True
+    pending_used, pending_reserved = _pending_deltas(plan.pk)
+    available = plan.remaining_amount - pending_used - pending_reserved
+    if increase > available:
+        logger.warning(
+            f"[BudgetLedger] {source.field} #{instance.pk}: plan #{plan.pk} yetersiz "
+            f"(artış {increase}, kullanılabilir {available})"
+        )
+        raise BudgetError(_fit_error(plan, increase, available), plan=plan)
+
+
+def apply_ledger_entries(alias=None, batch_size: int = 1000) -> int:
+    """
+    İşlenmemiş ledger satırlarını plan / yıl toplamlarına yansıt.
+
+    Satırlar FOR UPDATE SKIP LOCKED ile alınır; eşzamanlı çalışan işlemler
+    birbirini beklemez ve aynı satırı iki kez işlemez.
+
+    Args:
+        alias: DB alias (varsayılan: aktif brand)
+
+    Returns:
+        İşlenen satır sayısı
+    """
+    alias = alias or router.db_for_write(BudgetLedgerEntry)
+    applied = 0
+
+    while True:
+        with transaction.atomic(using=alias):
+            entries = list(
+                BudgetLedgerEntry.objects.using(alias)
+                .select_for_update(skip_locked=True)
+                .filter(applied=False)
+                .order_by('pk')
+                .values_list('pk', 'dealer_id', 'plan_id', 'year', 'used_delta', 'reserved_delta')[:batch_size]
+            )
+            if not entries:
+                return applied
+
+            plan_deltas = defaultdict(lambda: [ZERO, ZERO])
+            year_deltas = defaultdict(lambda: ZERO)
+            for _, dealer_id, plan_id, year, used_delta, reserved_delta in entries:
+                if plan_id:
+                    plan_deltas[plan_id][0] += used_delta
+                    plan_deltas[plan_id][1] += reserved_delta
+                if used_delta:
+                    year_deltas[(dealer_id, year)] += used_delta
+
+            now = timezone.now()
+            # Sabit sırada güncelle (deadlock önleme)
+            for plan_id in sorted(plan_deltas):
+                used_delta, reserved_delta = plan_deltas[plan_id]
+                DealerBudgetPlan.objects.using(alias).filter(pk=plan_id).update(
+                    used_amount=F('used_amount') + used_delta,
+                    reserved_amount=F('reserved_amount') + reserved_delta,
+                    updated_at=now,
+                )
+            for dealer_id, year in sorted(year_deltas):
+                DealerBudget.objects.using(alias).get_or_create(dealer_id=dealer_id, year=year)
+                DealerBudget.objects.using(alias).filter(dealer_id=dealer_id, year=year).update(
+                    used_budget=F('used_budget') + year_deltas[(dealer_id, year)],
+                    updated_at=now,
+                )
+
+            BudgetLedgerEntry.objects.using(alias).filter(pk__in=[entry[0] for entry in entries]).update(applied=True)
+
+            # Bütçe planı aylık özeti used_amount'u içerir
+            plans = DealerBudgetPlan.objects.using(alias).filter(pk__in=list(plan_deltas)).only('pk', 'dealer_id', 'start_date')
+            for plan in plans:
+                schedule_summary_refresh(plan)
+
+        applied += len(entries)
+        if len(entries) < batch_size:
+            return applied
+
+
+def _record_request_openings(alias) -> list:
+    """
+    Ledger satırı olmayan harcanmış talepler (sinyalsiz yazılanlar, örn.
+    bulk_create) için talebe bağlı commit satırları. Yoksa talebin ilk izlenen
+    kaydı (onaylandi → yayinda, tutar / tarih değişikliği) tutarı bir kez daha
+    commit ederdi. Her commit aynı plan / yıl için eşit negatif adjust ile
+    dengelenir: toplamlar (açılış bakiyesi) değişmez.
+    """
+    plans = defaultdict(list)
+    for plan in DealerBudgetPlan.objects.using(alias).filter(is_active=True).order_by('pk').only(
+        'pk', 'dealer_id', 'start_date', 'end_date'
+    ):
+        plans[plan.dealer_id].append(plan)
+
+    def covering_plan(dealer_id, start, end):
+        return next((plan.pk for plan in plans[dealer_id] if plan.start_date <= start and end <= plan.end_date), None)
+
+    entries = []
+    offsets = defaultdict(lambda: ZERO)
+    for label, source in REQUEST_SOURCES.items():
+        requests = (
+            apps.get_model(label)._base_manager.using(alias)
+            .filter(status__in=source.spent_statuses, budget_ledger_entries__isnull=True)
+            .order_by('pk')
+        )
+        for request in requests.iterator(chunk_size=2000):
+            amount = source.amount(request)
+            start, end = source.period(request)
+            if not amount or start is None or end is None:
+                continue
+            key = (request.dealer_id, covering_plan(request.dealer_id, start, end), start.year)
+            entries.append(BudgetLedgerEntry(
+                dealer_id=key[0], plan_id=key[1], year=key[2],
+                kind=BudgetLedgerEntry.Kind.COMMIT, used_delta=amount,
+                note='Açılış bakiyesi (talep)', applied=True, **{f'{source.field}_id': request.pk},
+            ))
+            offsets[key] += amount
+
+    entries += [
+        BudgetLedgerEntry(
+            dealer_id=dealer_id, plan_id=plan_id, year=year,
+            kind=BudgetLedgerEntry.Kind.ADJUST, used_delta=-amount,
+            note='Açılış bakiyesi (talebe bağlanan kısım)', applied=True,
+        )
+        for (dealer_id, plan_id, year), amount in offsets.items()
+    ]
+    return BudgetLedgerEntry.objects.using(alias).bulk_create(entries, batch_size=1000)
+
+
+def record_opening_balances(alias=None) -> int:
+    """
+    Ledger'da karşılığı olmayan mevcut kullanım tutarları için açılış satırları
+    ekle: harcanmış taleplere bağlı commit'ler (_record_request_openings) ve
+    kalan farklar için bağlantısız adjust satırları. Toplamlar bu tutarları
+    zaten içerdiğinden satırlar işlenmiş (applied) yazılır. Tekrar
+    çalıştırılabilir: sadece farkları yazar.
+
+    Returns:
+        Eklenen satır sayısı
+    """
+    alias = alias or router.db_for_write(BudgetLedgerEntry)
+    ledger = BudgetLedgerEntry.objects.using(alias).filter(applied=True).order_by()
+
+    with transaction.atomic(using=alias):
+        request_entries = _record_request_openings(alias)
+
+        plan_used = ledger.filter(plan=OuterRef('pk')).values('plan').annotate(total=Sum('used_delta')).values('total')
+        plans = (
+            DealerBudgetPlan.objects.using(alias)
+            .annotate(ledger_used=Coalesce(Subquery(plan_used), ZERO))
+            .exclude(used_amount=F('ledger_used'))
+            .values_list('pk', 'dealer_id', 'start_date', 'used_amount', 'ledger_used')
+        )
+        plan_entries = BudgetLedgerEntry.objects.using(alias).bulk_create([
+            BudgetLedgerEntry(
+                dealer_id=dealer_id, plan_id=plan_id, year=start_date.year,
+                kind=BudgetLedgerEntry.Kind.ADJUST, used_delta=used - ledger_used,
+                note='Açılış bakiyesi', applied=True,
+            )
+            for plan_id, dealer_id, start_date, used, ledger_used in plans
+            if used != ledger_used
+        ], batch_size=1000)
+
+        # Plan açılışları da yıl toplamına dahil; kalan fark plansız satır olarak yazılır
+        year_used = (
+            ledger.filter(dealer=OuterRef('dealer'), year=OuterRef('year'))
+            .values('dealer', 'year').annotate(total=Sum('used_delta')).values('total')
+        )
+        budgets = (
+            DealerBudget.objects.using(alias)
+            .annotate(ledger_used=Coalesce(Subquery(year_used), ZERO))
+            .exclude(used_budget=F('ledger_used'))
+            .values_list('dealer_id', 'year', 'used_budget', 'ledger_used')
+        )
+        year_entries = BudgetLedgerEntry.objects.using(alias).bulk_create([
+            BudgetLedgerEntry(
+                dealer_id=dealer_id, year=year,
+                kind=BudgetLedgerEntry.Kind.ADJUST, used_delta=used - ledger_used,
+                note='Açılış bakiyesi', applied=True,
+            )
+            for dealer_id, year, used, ledger_used in budgets
+            if used != ledger_used
+        ], batch_size=1000)
+
+    return len(request_entries) + len(plan_entries) + len(year_entries)
+
+
+def _sync_on_save(sender, instance, created=False, raw=False, **kwargs):
+    # Durum / tutar / tarih / bayi değişmediyse (örn. save(update_fields=['fb_...'])) ledger sorgusu yok
+    if not raw and (created or instance.has_changed()):
+        sync_request_budget(instance)
+
+
+def _release_on_delete(sender, instance, origin=None, **kwargs):
+    # FK'lar SET_NULL olmadan önce: silinen talebin harcama ve rezervasyonlarını iade et.
+    # Bayi silinirken (cascade) bayinin ledger satırları da silinir; yeni satır yazılmaz
+    if isinstance(origin, sender) or getattr(origin, 'model', None) is sender:
+        sync_request_budget(instance, released=True)
+
+
+def register_budget_ledger() -> None:
+    """Talep modellerinin kayıt / silme sinyallerini bağla (DealersConfig.ready)."""
+    for label in REQUEST_SOURCES:
+        model = apps.get_model(label)
+        uid = f'budget_ledger:{label}'
+        post_save.connect(_sync_on_save, sender=model, dispatch_uid=f'{uid}:post_save', weak=False)
+        pre_delete.connect(_release_on_delete, sender=model, dispatch_uid=f'{uid}:pre_delete', weak=False)
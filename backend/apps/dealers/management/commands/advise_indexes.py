@@ -0,0 +1,111 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from config.index_advisor import HIGH, advise, write_migrations
+
+
+class Command(BaseCommand):
+    help = (
+        'ViewSet filtre / sıralama tanımları ve pg_stat_statements üzerinden eksik index önerir '
+        '(brand bazlı EXPLAIN maliyet kazancı ile); istenirse migration dosyası üretir'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--min-benefit',
+            type=float,
+            default=20.0,
+            help='Migration\'a girmesi için minimum EXPLAIN maliyet kazancı (%%, hypopg gerekir)'
+        )
+        parser.add_argument(
+            '--include-low',
+            action='store_true',
+            help='Düşük öncelikli (sadece ordering_fields) önerileri de migration\'a ekle'
+        )
+        parser.add_argument(
+            '--write-migrations',
+            action='store_true',
+            help='Seçilen öneriler için app başına AddIndex migration dosyası yaz (review için)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Raporu JSON olarak yazdır'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+        selected = {}
+        report = {}
+
+        for brand in brands:
+            result = advise(brand)
+            report[brand] = {
+                'covered': result['covered'],
+                'pg_stat_statements': result['pg_stat_statements'],
+                'hypopg': result['hypopg'],
+                'candidates': [c.as_dict() for c in result['candidates']],
+            }
+
+            for candidate in result['candidates']:
+                benefit = candidate.benefit_pct
+                if benefit is not None:
+                    wanted = benefit >= options['min_benefit']
+                else:
+                    wanted = candidate.priority == HIGH or options['include_low']
+                if wanted:
+                    selected.setdefault((candidate.table, candidate.fields), candidate)
+
+            if not options['json']:
+                self.print_brand(brand, result)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
+
+        if options['write_migrations'] and selected:
+            paths = write_migrations(selected.values())
+            self.stdout.write(self.style.SUCCESS('\nMigration dosyaları (review edin):'))
+            for path in paths:
+                self.stdout.write(f'  {path}')
+            self.stdout.write('İlgili modellerin Meta.indexes listesine de ekleyin:')
+            for candidate in selected.values():
+                index = candidate.as_index()
+                self.stdout.write(
+                    f'  {candidate.model.__name__}: models.Index(fields={list(index.fields)}, name={index.name!r})'
+                )
+        elif not options['json']:
+            self.stdout.write(f'\nMigration için seçilen öneri: {len(selected)} (--write-migrations ile yazılır)')
+
+    def print_brand(self, brand, result):
+        self.stdout.write(f'\n{brand.upper()} index önerileri')
+        notes = []
+        if not result['pg_stat_statements']:
+            notes.append('pg_stat_statements yok')
+        if not result['hypopg']:
+            notes.append('hypopg yok: kazanç hesaplanmadı')
+        if notes:
+            self.stdout.write(self.style.WARNING(f'  ({", ".join(notes)})'))
+
+        self.stdout.write(
+            f'  {"tablo":<28} {"kolonlar":<34} {"öncelik":<7} {"çağrı":>8} {"süre ms":>10} '
+            f'{"maliyet":>10} {"sonra":>10} {"kazanç":>7}'
+        )
+        for candidate in result['candidates']:
+            row = candidate.as_dict()
+            self.stdout.write(
+                f'  {row["table"]:<28} {", ".join(row["columns"]):<34} {row["priority"]:<7} '
+                f'{row["statement_calls"]:>8} {row["statement_total_ms"]:>10} '
+                f'{row["cost_before"] if row["cost_before"] is not None else "-":>10} '
+                f'{row["cost_after"] if row["cost_after"] is not None else "-":>10} '
+                f'{str(row["benefit_pct"]) + "%" if row["benefit_pct"] is not None else "-":>7}'
+            )
+            self.stdout.write(f'      {"; ".join(row["reasons"])}')
+        self.stdout.write(f'  Mevcut index\'lerle kapsanan aday: {result["covered"]}')
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.dealers.budgets import apply_ledger_entries, record_opening_balances
+from config.db_router import brand_context
+
+
+class Command(BaseCommand):
+    help = 'Bütçe defterinin işlenmemiş satırlarını plan / yıl toplamlarına yansıtır'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--opening-balances',
+            action='store_true',
+            help='Ledger karşılığı olmayan mevcut kullanım tutarları için açılış satırları da yaz'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Transaction başına işlenecek satır sayısı'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+
+        for brand in brands:
+            started = time.monotonic()
+            with brand_context(brand):
+                applied = apply_ledger_entries(brand, options['batch_size'])
+                opened = record_opening_balances(brand) if options['opening_balances'] else 0
+
+            self.stdout.write(self.style.SUCCESS(
+                f'{brand.upper()}: {applied:,} satır işlendi, {opened:,} açılış satırı '
+                f'({time.monotonic() - started:.1f}s)'
+            ))
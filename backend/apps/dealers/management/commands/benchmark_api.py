@@ -0,0 +1,126 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.benchmarks import SCENARIOS, BenchmarkRunner, compare_results, git_revision
+
+
+class Command(BaseCommand):
+    help = 'API endpoint benchmark (p50/p95/p99, sorgu sayısı, response boyutu) - sonuçları JSON olarak kaydeder'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            default=[],
+            help=f'Sadece bu senaryo(lar)ı çalıştır: {", ".join(s.name for s in SCENARIOS)}'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Senaryo başına ölçülen istek sayısı'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Ölçüm öncesi ısınma isteği sayısı'
+        )
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            default=None,
+            help=(
+                'Çalışan sunucuya karşı ölç (örn. http://localhost:8084). Verilmezse test client kullanılır. '
+                'Sunucuda QUERY_SERVER_TIMING kapalıysa sorgu sayısı sadece admin senaryolarında raporlanır'
+            )
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='JSON sonuç dosyası (varsayılan: benchmark-results/<tarih>_<commit>.json)'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            default=None,
+            help='Karşılaştırılacak önceki JSON sonuç dosyası'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+
+        scenarios = SCENARIOS
+        if options['scenario']:
+            unknown = set(options['scenario']) - {s.name for s in SCENARIOS}
+            if unknown:
+                raise CommandError(f'Bilinmeyen senaryo: {", ".join(sorted(unknown))}')
+            scenarios = [s for s in SCENARIOS if s.name in options['scenario']]
+
+        runner = BenchmarkRunner(base_url=options['base_url'])
+        revision = git_revision()
+        results = {}
+
+        for brand in brands:
+            self.stdout.write(f'\n{brand.upper()} benchmark ({options["iterations"]} iterasyon)...\n')
+            self.stdout.write(f'  {"senaryo":<24} {"p50":>8} {"p95":>8} {"p99":>8} {"sorgu":>6} {"boyut":>9}  status')
+            results[brand] = {}
+
+            for scenario in scenarios:
+                result = runner.run(scenario, brand, options['iterations'], options['warmup'])
+                results[brand][scenario.name] = result
+
+                if 'skipped' in result:
+                    self.stdout.write(self.style.WARNING(f'  {scenario.name:<24} [SKIP] {result["skipped"]}'))
+                    continue
+
+                self.stdout.write(
+                    f'  {scenario.name:<24} {result["p50_ms"]:>8.1f} {result["p95_ms"]:>8.1f} '
+                    f'{result["p99_ms"]:>8.1f} {result["queries"] if result["queries"] is not None else "-":>6} '
+                    f'{result["response_bytes"]:>9}  {result["status_codes"]}'
+                )
+
+        report = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'git_revision': revision,
+                'mode': options['base_url'] or 'test-client',
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+            },
+            'results': results,
+        }
+
+        output = Path(options['output']) if options['output'] else (
+            Path(settings.BASE_DIR) / 'benchmark-results'
+            / f'{datetime.now():%Y%m%d-%H%M%S}_{revision or "local"}.json'
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f'\nSonuçlar kaydedildi: {output}'))
+
+        if options['compare']:
+            previous = json.loads(Path(options['compare']).read_text())
+            self.stdout.write(f'\nKarşılaştırma ({previous["meta"].get("git_revision")} → {revision}):')
+            for row in compare_results(previous, report):
+                change = row['p95_change_pct']
+                line = (
+                    f'  {row["brand"]:<6} {row["scenario"]:<24} p95 {row["p95_before"]:>8.1f} → {row["p95_after"]:>8.1f} '
+                    f'({change:+.1f}%)  sorgu {row["queries_before"]} → {row["queries_after"]}'
+                    if change is not None else
+                    f'  {row["brand"]:<6} {row["scenario"]:<24} p95 {row["p95_before"]} → {row["p95_after"]}'
+                )
+                style = self.style.ERROR if change is not None and change > 10 else self.style.SUCCESS
+                self.stdout.write(style(line))
@@ -0,0 +1,465 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from apps.campaigns.models import CampaignActivityLog, CampaignCreativeFile, CampaignRequest
+from apps.dealers.budgets import record_opening_balances
+from apps.dealers.models import Brand, Dealer, DealerBudget, DealerBudgetPlan
+from apps.dealers.summaries import rebuild_summaries
+from apps.incentives.models import IncentiveRequest
+from apps.users.models import User
+from apps.visuals.models import VisualRequest, VisualRequestCreative, VisualRequestSize
+from config.db_router import BrandThreadPoolExecutor, brand_context
+from config.search import SearchDocumentMixin
+from config.status_stats import invalidate_status_statistics
+
+# Sentetik kayıtların ortak prefix'i (--clear sadece bunları siler)
+SYNTHETIC_PREFIX = 'SYN'
+
+CITIES = {
+    'İstanbul': ['Kadıköy', 'Beşiktaş', 'Ümraniye', 'Bakırköy', 'Maslak', 'Pendik'],
+    'Ankara': ['Çankaya', 'Yenimahalle', 'Etimesgut', 'Keçiören'],
+    'İzmir': ['Bornova', 'Karşıyaka', 'Gaziemir', 'Çiğli'],
+    'Bursa': ['Nilüfer', 'Osmangazi', 'Yıldırım'],
+    'Antalya': ['Muratpaşa', 'Konyaaltı', 'Kepez'],
+    'Kocaeli': ['İzmit', 'Gebze', 'Körfez'],
+    'Adana': ['Seyhan', 'Çukurova', 'Yüreğir'],
+    'Konya': ['Selçuklu', 'Meram', 'Karatay'],
+    'Kayseri': ['Melikgazi', 'Kocasinan'],
+    'Samsun': ['Atakum', 'İlkadım'],
+}
+REGIONS = ['Marmara', 'Ege', 'İç Anadolu', 'Akdeniz', 'Karadeniz', 'Doğu Anadolu', 'Güneydoğu Anadolu']
+FIRST_NAMES = ['Ahmet', 'Mehmet', 'Ayşe', 'Fatma', 'Mustafa', 'Zeynep', 'Emre', 'Elif', 'Burak', 'Selin', 'Can', 'Deniz']
+LAST_NAMES = ['Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk', 'Arslan', 'Doğan']
+CAMPAIGN_THEMES = ['Lansman', 'Servis', 'Test Sürüşü', 'Yıl Sonu', 'Bahar', 'Filo', 'Stok Eritme', 'Bayram', 'Kış Bakım']
+VISUAL_SIZES = ['1080x1080', '1080x1920', '1200x628', '300x250', '728x90', '50x70 cm', '100x200 cm', '3x1 m']
+
+# Gerçekçi status dağılımları (ağırlıklar)
+CAMPAIGN_STATUS_WEIGHTS = {
+    'taslak': 5, 'onay_bekliyor': 15, 'onaylandi': 15, 'reddedildi': 5, 'yayinda': 20, 'tamamlandi': 40,
+}
+INCENTIVE_STATUS_WEIGHTS = {
+    'taslak': 5, 'onay_bekliyor': 20, 'degerlendirme': 10, 'onaylandi': 25, 'reddedildi': 10, 'tamamlandi': 30,
+}
+VISUAL_STATUS_WEIGHTS = {
+    'taslak': 5, 'gorsel_bekliyor': 15, 'bayi_onayi_bekliyor': 10, 'onay_bekliyor': 15,
+    'onaylandi': 15, 'reddedildi': 5, 'tamamlandi': 35,
+}
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    auto_now / auto_now_add alanlarını geçici olarak kapatır; böylece
+    bulk_create geçmişe yayılmış created_at / updated_at değerlerini yazar.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BatchWriter:
+    """
+    Nesneleri biriktirip batch_size'da bir bulk_create eder.
+    on_flush(created) callback'i ile child kayıtlar (id'ler hazırken) üretilebilir.
+    """
+
+    def __init__(self, model, batch_size: int, on_flush=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.pending = []
+        self.count = 0
+
+    def add(self, obj) -> None:
+        # bulk_create save() çağırmaz; arama metnini burada üret
+        if isinstance(obj, SearchDocumentMixin):
+            obj.search_document = obj.build_search_document()
+        self.pending.append(obj)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        created = self.model.objects.bulk_create(self.pending, batch_size=self.batch_size)
+        self.count += len(created)
+        self.pending = []
+        if self.on_flush:
+            self.on_flush(created)
+
+
+class SyntheticDataGenerator:
+    """Tek brand için ilişkileri tutarlı sentetik veri üretir (aktif brand context'inde)."""
+
+    def __init__(self, brand: str, options: dict, log):
+        self.brand = brand
+        self.options = options
+        self.log = log
+        self.batch_size = options['batch_size']
+        # Brand başına farklı ama tekrarlanabilir seed
+        self.rng = random.Random(f"{options['seed']}-{brand}")
+        self.now = timezone.now()
+        self.window_start = self.now - timedelta(days=365 * options['years'])
+        self.tag = f"{SYNTHETIC_PREFIX}{options['seed']}"
+
+    # --- Yardımcılar ---
+
+    def random_datetime(self, start: datetime | None = None) -> datetime:
+        start = start or self.window_start
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.random() * span)
+
+    def weighted(self, weights: dict) -> str:
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def person(self) -> tuple[str, str]:
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    # --- Üretim ---
+
+    def run(self) -> dict:
+        started = time.monotonic()
+        brand_ids = list(Brand.objects.values_list('pk', flat=True))
+        admin_ids = list(User.objects.filter(role=User.Role.ADMIN).values_list('pk', flat=True))
+
+        dealers = self.create_dealers(brand_ids)
+        self.log(f'{len(dealers)} bayi')
+
+        dealer_users = self.create_users(dealers)
+        self.log(f'{len(dealer_users)} bayi kullanıcısı')
+
+        budgets, plans = self.create_budgets(dealers)
+        self.log(f'{budgets} yıllık bütçe, {plans} bütçe planı')
+
+        counts = self.create_campaigns(dealers, brand_ids, dealer_users, admin_ids)
+        self.log(f"{counts['campaigns']} kampanya, {counts['files']} kreatif dosya, {counts['logs']} aktivite logu")
+
+        visuals, sizes, creatives = self.create_visuals(dealers)
+        self.log(f'{visuals} görsel talebi, {sizes} boyut, {creatives} kreatif')
+
+        incentives = self.create_incentives(dealers)
+        self.log(f'{incentives} teşvik talebi')
+
+        return {
+            'dealers': len(dealers),
+            'users': len(dealer_users),
+            'budgets': budgets,
+            'budget_plans': plans,
+            **counts,
+            'visual_requests': visuals,
+            'visual_sizes': sizes,
+            'visual_creatives': creatives,
+            'incentive_requests': incentives,
+            'elapsed_s': round(time.monotonic() - started, 1),
+        }
+
+    def create_dealers(self, brand_ids: list) -> list:
+        dealers = []
+        writer = BatchWriter(Dealer, self.batch_size, on_flush=dealers.extend)
+
+        for index in range(self.options['dealers']):
+            city = self.rng.choice(list(CITIES))
+            first_name, last_name = self.person()
+            created_at = self.random_datetime()
+            code = f'{self.tag}-{index:07d}'
+            writer.add(Dealer(
+                brand_id=self.rng.choice(brand_ids) if brand_ids else None,
+                dealer_code=code,
+                dealer_name=f'{city} {self.rng.choice(LAST_NAMES)} Otomotiv {index}',
+                city=city,
+                district=self.rng.choice(CITIES[city]),
+                address=f'{self.rng.randint(1, 200)}. Sokak No:{self.rng.randint(1, 99)}',
+                phone=f'0{self.rng.randint(212, 488)}{self.rng.randint(1000000, 9999999)}',
+                email=f'{code.lower()}@bayi.example.com',
+                contact_first_name=first_name,
+                contact_last_name=last_name,
+                regional_manager=' '.join(self.person()),
+                dealer_type=self.rng.choices(['yetkili', 'anlasmali', 'satis'], weights=[70, 20, 10])[0],
+                region=self.rng.choice(REGIONS),
+                status=self.rng.choices(['aktif', 'pasif', 'askida'], weights=[90, 7, 3])[0],
+                membership_date=created_at.date(),
+                updated_at=created_at,
+            ))
+
+        writer.flush()
+        return dealers
+
+    def create_users(self, dealers: list) -> dict:
+        """Bayi başına bir kullanıcı (Dealer.save tek kullanıcı varsayar). → {dealer_id: user_id}"""
+        users = []
+        writer = BatchWriter(User, self.batch_size, on_flush=users.extend)
+        password = make_password(self.options['password'])
+
+        for dealer in dealers:
+            writer.add(User(
+                username=f'{dealer.dealer_code.lower()}',
+                email=dealer.email,
+                first_name=dealer.contact_first_name,
+                last_name=dealer.contact_last_name,
+                password=password,
+                role=User.Role.BAYI,
+                dealer_id=dealer.pk,
+                is_active=dealer.status == 'aktif',
+                date_joined=datetime.combine(dealer.membership_date, datetime.min.time(), tzinfo=self.now.tzinfo),
+            ))
+
+        writer.flush()
+        return {user.dealer_id: user.pk for user in users}
+
+    def create_budgets(self, dealers: list) -> tuple[int, int]:
+        budget_writer = BatchWriter(DealerBudget, self.batch_size)
+        plan_writer = BatchWriter(DealerBudgetPlan, self.batch_size)
+        years = range(self.window_start.year, self.now.year + 1)
+
+        for dealer in dealers:
+            for year in years:
+                total = Decimal(self.rng.randrange(100_000, 2_000_000, 10_000))
+                used_ratio = 1 if year < self.now.year else self.rng.random()
+                timestamp = datetime(year, 1, 1, tzinfo=self.now.tzinfo)
+                budget_writer.add(DealerBudget(
+                    dealer_id=dealer.pk, year=year, total_budget=total,
+                    used_budget=(total * Decimal(used_ratio) * Decimal('0.9')).quantize(Decimal('1.00')),
+                    created_at=timestamp, updated_at=timestamp,
+                ))
+
+                # Çeyreklik planlar
+                for quarter in range(4):
+                    start = timestamp.date().replace(month=quarter * 3 + 1)
+                    end = (start.replace(month=quarter * 3 + 3, day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+                    amount = (total / 4).quantize(Decimal('1.00'))
+                    plan_writer.add(DealerBudgetPlan(
+                        dealer_id=dealer.pk, start_date=start, end_date=end,
+                        budget_amount=amount,
+                        used_amount=(amount * Decimal(self.rng.random())).quantize(Decimal('1.00')) if start <= self.now.date() else 0,
+                        description=f'{year} Q{quarter + 1}',
+                        is_active=end >= self.now.date(),
+                        created_at=timestamp, updated_at=timestamp,
+                    ))
+
+        budget_writer.flush()
+        plan_writer.flush()
+        return budget_writer.count, plan_writer.count
+
+    def create_campaigns(self, dealers: list, brand_ids: list, dealer_users: dict, admin_ids: list) -> dict:
+        file_writer = BatchWriter(CampaignCreativeFile, self.batch_size)
+        log_writer = BatchWriter(CampaignActivityLog, self.batch_size)
+        logs_per_campaign = self.options['logs_per_campaign']
+        log_actions = [
+            CampaignActivityLog.ActionType.UPDATED,
+            CampaignActivityLog.ActionType.STATUS_CHANGE,
+            CampaignActivityLog.ActionType.FILE_UPLOAD,
+            CampaignActivityLog.ActionType.NOTE,
+            CampaignActivityLog.ActionType.FB_STATUS_CHECK,
+        ]
+
+        def add_children(campaigns):
+            # Kampanya id'leri hazır: dosya ve log kayıtları
+            for campaign in campaigns:
+                for index in range(self.rng.randint(1, 3)):
+                    file_type = self.rng.choice(['post', 'story'])
+                    file_writer.add(CampaignCreativeFile(
+                        campaign_request_id=campaign.pk,
+                        file=f'campaign_files/synthetic/{campaign.pk}_{index}.jpg',
+                        file_name=f'{file_type}_{index + 1}.jpg',
+                        file_size=self.rng.randint(80_000, 4_000_000),
+                        file_type=file_type,
+                        uploaded_at=campaign.created_at,
+                    ))
+
+                log_writer.add(CampaignActivityLog(
+                    campaign_request_id=campaign.pk,
+                    action=CampaignActivityLog.ActionType.CREATED,
+                    message='Kampanya talebi oluşturuldu',
+                    user_id=dealer_users.get(campaign.dealer_id),
+                    created_at=campaign.created_at,
+                ))
+                for _ in range(max(0, self.rng.randint(logs_per_campaign - 2, logs_per_campaign + 2) - 1)):
+                    log_writer.add(CampaignActivityLog(
+                        campaign_request_id=campaign.pk,
+                        action=self.rng.choice(log_actions),
+                        message='Sentetik aktivite',
+                        details={'synthetic': True},
+                        user_id=self.rng.choice(admin_ids) if admin_ids else None,
+                        created_at=self.random_datetime(campaign.created_at),
+                    ))
+
+        campaign_writer = BatchWriter(CampaignRequest, self.batch_size, on_flush=add_children)
+        prefix = 'Ford' if self.brand == 'ford' else 'Fiat'
+
+        for dealer in dealers:
+            for _ in range(self.options['campaigns_per_dealer']):
+                created_at = self.random_datetime()
+                start_date = created_at.date() + timedelta(days=self.rng.randint(1, 30))
+                status = self.weighted(CAMPAIGN_STATUS_WEIGHTS)
+                campaign_writer.add(CampaignRequest(
+                    dealer=dealer,
+                    brand_id=dealer.brand_id or (self.rng.choice(brand_ids) if brand_ids else None),
+                    campaign_name=f'{prefix} {self.rng.choice(CAMPAIGN_THEMES)} Kampanyası',
+                    budget=Decimal(self.rng.randrange(2_000, 150_000, 500)),
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=self.rng.randint(7, 60)),
+                    platforms=self.rng.choice([['facebook'], ['instagram'], ['facebook', 'instagram']]),
+                    campaign_type=self.rng.choices(['link', 'upload'], weights=[60, 40])[0],
+                    redirect_type=self.rng.choices(['satis', 'servis', 'diger'], weights=[60, 30, 10])[0],
+                    ad_model=self.rng.choices(['bayi_sayfasi', 'form_yonlendirme', 'leasing'], weights=[60, 30, 10])[0],
+                    status=status,
+                    fb_push_status='success' if status in ('yayinda', 'tamamlandi') else '',
+                    created_at=created_at,
+                    updated_at=self.random_datetime(created_at),
+                ))
+
+        campaign_writer.flush()
+        file_writer.flush()
+        log_writer.flush()
+        return {'campaigns': campaign_writer.count, 'files': file_writer.count, 'logs': log_writer.count}
+
+    def create_visuals(self, dealers: list) -> tuple[int, int, int]:
+        size_writer = BatchWriter(VisualRequestSize, self.batch_size)
+        creative_writer = BatchWriter(VisualRequestCreative, self.batch_size)
+        creative_types = [choice for choice, _ in VisualRequestCreative.KreatifTipi.choices]
+
+        def add_children(visuals):
+            for visual in visuals:
+                for size in self.rng.sample(VISUAL_SIZES, self.rng.randint(1, 3)):
+                    size_writer.add(VisualRequestSize(
+                        visual_request_id=visual.pk, size=size, quantity=self.rng.randint(1, 20),
+                    ))
+                for creative_type in self.rng.sample(creative_types, self.rng.randint(1, 2)):
+                    creative_writer.add(VisualRequestCreative(
+                        visual_request_id=visual.pk, creative_type=creative_type,
+                    ))
+
+        visual_writer = BatchWriter(VisualRequest, self.batch_size, on_flush=add_children)
+
+        for dealer in dealers:
+            for _ in range(self.options['visuals_per_dealer']):
+                created_at = self.random_datetime()
+                visual_writer.add(VisualRequest(
+                    dealer=dealer,
+                    creative_work_request=f'{self.rng.choice(CAMPAIGN_THEMES)} için görsel çalışma',
+                    quantity_request=self.rng.randint(1, 10),
+                    work_details='Sentetik görsel talebi',
+                    deadline=created_at.date() + timedelta(days=self.rng.randint(3, 30)),
+                    status=self.weighted(VISUAL_STATUS_WEIGHTS),
+                    assigned_to=self.rng.choice(['creative_agency', 'dealer', 'brand']),
+                    created_at=created_at,
+                    updated_at=self.random_datetime(created_at),
+                ))
+
+        visual_writer.flush()
+        size_writer.flush()
+        creative_writer.flush()
+        return visual_writer.count, size_writer.count, creative_writer.count
+
+    def create_incentives(self, dealers: list) -> int:
+        writer = BatchWriter(IncentiveRequest, self.batch_size)
+
+        for dealer in dealers:
+            for _ in range(self.options['incentives_per_dealer']):
+                created_at = self.random_datetime()
+                status = self.weighted(INCENTIVE_STATUS_WEIGHTS)
+                amount = Decimal(self.rng.randrange(5_000, 250_000, 1_000))
+                writer.add(IncentiveRequest(
+                    dealer=dealer,
+                    incentive_title=f'{dealer.city} {self.rng.choice(CAMPAIGN_THEMES)} Etkinliği',
+                    incentive_details='Sentetik teşvik talebi',
+                    purpose='Satış artışı',
+                    target_audience='Bölge müşterileri',
+                    incentive_amount=amount,
+                    event_location=dealer.city,
+                    status=status,
+                    approved_amount=(amount * Decimal('0.8')).quantize(Decimal('1.00')) if status in ('onaylandi', 'tamamlandi') else None,
+                    created_at=created_at,
+                    updated_at=self.random_datetime(created_at),
+                ))
+
+        writer.flush()
+        return writer.count
+
+
+class Command(BaseCommand):
+    help = 'Yük testi için ilişkili sentetik veri üretir (bulk_create, --brand ford|tofas|all paralel)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='ford',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all - all iki brand\'i paralel doldurur)'
+        )
+        parser.add_argument('--dealers', type=int, default=100, help='Bayi sayısı (varsayılan: 100)')
+        parser.add_argument('--campaigns-per-dealer', type=int, default=100, help='Bayi başına kampanya talebi')
+        parser.add_argument('--logs-per-campaign', type=int, default=5, help='Kampanya başına ortalama aktivite logu')
+        parser.add_argument('--visuals-per-dealer', type=int, default=10, help='Bayi başına görsel talebi')
+        parser.add_argument('--incentives-per-dealer', type=int, default=10, help='Bayi başına teşvik talebi')
+        parser.add_argument('--years', type=int, default=2, help='Kayıtların yayılacağı geçmiş yıl sayısı')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (aynı seed aynı veriyi üretir)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk_create batch boyutu')
+        parser.add_argument('--password', type=str, default='Synthetic123!', help='Bayi kullanıcılarının şifresi')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Önce bu seed ile üretilmiş sentetik bayileri (ve bağlı kayıtları) sil'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+
+        self.stdout.write(
+            f"\nSentetik veri: {options['dealers']} bayi × {options['campaigns_per_dealer']} kampanya "
+            f"(≈{options['dealers'] * options['campaigns_per_dealer'] * options['logs_per_campaign']:,} log) "
+            f"→ {', '.join(brands)}\n"
+        )
+
+        models = (
+            Dealer, DealerBudget, DealerBudgetPlan, CampaignRequest, CampaignCreativeFile,
+            CampaignActivityLog, VisualRequest, IncentiveRequest,
+        )
+        with explicit_timestamps(*models), BrandThreadPoolExecutor(max_workers=len(brands)) as executor:
+            futures = {brand: executor.submit(self.generate, brand, options) for brand in brands}
+            results = {brand: future.result() for brand, future in futures.items()}
+
+        for brand, result in results.items():
+            self.stdout.write(self.style.SUCCESS(f'\n{brand.upper()} tamamlandı ({result.pop("elapsed_s")}s):'))
+            for name, count in result.items():
+                self.stdout.write(f'  {name:<20} {count:>12,}')
+
+    def generate(self, brand: str, options: dict) -> dict:
+        def log(message):
+            self.stdout.write(f'  [{brand}] {message}')
+
+        try:
+            with brand_context(brand):
+                if options['clear']:
+                    tag = f"{SYNTHETIC_PREFIX}{options['seed']}-"
+                    User.objects.filter(username__startswith=tag.lower()).delete()
+                    deleted = Dealer.objects.filter(dealer_code__startswith=tag).delete()[0]
+                    log(self.style.WARNING(f'{deleted} sentetik kayıt silindi'))
+
+                result = SyntheticDataGenerator(brand, options, log).run()
+                # bulk_create sinyal üretmez; istatistik cache'i, aylık özetleri ve
+                # bütçe defteri açılış satırlarını elle güncelle
+                invalidate_status_statistics(CampaignRequest, VisualRequest, IncentiveRequest)
+                rebuild_summaries(brand)
+                record_opening_balances(brand)
+                return result
+        finally:
+            connections.close_all()
@@ -0,0 +1,89 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dealers.models import DealerMonthlySummary
+from apps.dealers.summaries import month_start, next_month, rebuild_summaries
+from config.db_router import brand_context
+
+
+def parse_month(value: str) -> date:
+    try:
+        year, month = value.split('-')
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise CommandError(f'Geçersiz ay: {value} (YYYY-MM bekleniyor)')
+
+
+class Command(BaseCommand):
+    help = 'Bayi aylık özet tablosunu kaynak tablolardan yeniden kurar (ay aralığı / tip / bayi bazlı)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--from',
+            dest='month_from',
+            type=parse_month,
+            default=None,
+            help='Başlangıç ayı (YYYY-MM, dahil). Verilmezse tüm geçmiş tek seferde kurulur'
+        )
+        parser.add_argument(
+            '--to',
+            dest='month_to',
+            type=parse_month,
+            default=None,
+            help='Bitiş ayı (YYYY-MM, dahil). Varsayılan: bu ay'
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            default=[],
+            choices=DealerMonthlySummary.Kind.values,
+            help='Sadece bu tip(ler)'
+        )
+        parser.add_argument(
+            '--dealer',
+            action='append',
+            type=int,
+            default=[],
+            help='Sadece bu bayi ID(ler)i'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+        kinds = options['kind'] or None
+        dealer_ids = options['dealer'] or None
+
+        # Ay aralığı verildiyse ay ay kur: her ay kendi transaction'ında, kısa kilitlerle
+        months = [None]
+        if options['month_from']:
+            month, last = options['month_from'], options['month_to'] or month_start(date.today())
+            if month > last:
+                raise CommandError('--from, --to\'dan sonra olamaz')
+            months = []
+            while month <= last:
+                months.append(month)
+                month = next_month(month)
+        elif options['month_to']:
+            raise CommandError('--to için --from da verilmeli')
+
+        for brand in brands:
+            started = time.monotonic()
+            written = 0
+            with brand_context(brand):
+                for month in months:
+                    count = rebuild_summaries(brand, kinds, month, month, dealer_ids)
+                    written += count
+                    if month:
+                        self.stdout.write(f'  [{brand}] {month:%Y-%m}: {count:,} satır')
+
+            self.stdout.write(self.style.SUCCESS(
+                f'{brand.upper()}: {written:,} özet satırı yazıldı ({time.monotonic() - started:.1f}s)'
+            ))
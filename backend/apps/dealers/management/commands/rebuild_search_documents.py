@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.campaigns.models import CampaignRequest
+from apps.dealers.models import Dealer
+from apps.incentives.models import IncentiveRequest
+from apps.visuals.models import VisualRequest
+from config.db_router import brand_context
+from config.search import refresh_search_documents
+
+MODELS = {
+    'dealers': Dealer,
+    'campaigns': CampaignRequest,
+    'incentives': IncentiveRequest,
+    'visuals': VisualRequest,
+}
+
+
+class Command(BaseCommand):
+    help = 'Arama metinlerini (search_document) yeniden hesaplar - normalize kuralı / alan listesi değişince'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            default=[],
+            choices=list(MODELS),
+            help='Sadece bu model(ler)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='bulk_update batch boyutu'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+        names = options['model'] or list(MODELS)
+
+        for brand in brands:
+            with brand_context(brand):
+                for name in names:
+                    started = time.monotonic()
+                    updated = refresh_search_documents(MODELS[name], batch_size=options['batch_size'])
+                    self.stdout.write(self.style.SUCCESS(
+                        f'[{brand}] {name}: {updated:,} kayıt güncellendi ({time.monotonic() - started:.1f}s)'
+                    ))
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from apps.dealers.models import Brand, Dealer
-from config.db_router import set_current_brand
+from config.db_router import brand_command
 
 
 class Command(BaseCommand):
@@ -21,13 +21,11 @@ class Command(BaseCommand):
             help='Önce mevcut kayıtları sil'
         )
 
+    @brand_command
     def handle(self, *args, **options):
         brand = options['brand']
         clear = options['clear']
 
-        # Set database context for brand
-        set_current_brand(brand)
-
         if clear:
             deleted_count = Brand.objects.all().delete()[0]
             self.stdout.write(self.style.WARNING(f'{deleted_count} mevcut marka kaydı silindi.'))
@@ -5,7 +5,7 @@ from decimal import Decimal
 import random
 
 from apps.dealers.models import Dealer, DealerBudget
-from config.db_router import set_current_brand
+from config.db_router import brand_command
 
 
 class Command(BaseCommand):
@@ -25,13 +25,11 @@ class Command(BaseCommand):
             help='Önce mevcut kayıtları sil'
         )
 
+    @brand_command
     def handle(self, *args, **options):
         brand = options['brand']
         clear = options['clear']
 
-        # Set database context for brand
-        set_current_brand(brand)
-
         if clear:
             deleted_count = Dealer.objects.all().delete()[0]
             self.stdout.write(self.style.WARNING(f'{deleted_count} mevcut bayi kaydı silindi.'))
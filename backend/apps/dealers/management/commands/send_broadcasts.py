@@ -0,0 +1,136 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.users.email_utils import broadcast_dealer_queryset, queue_broadcast, run_broadcast
+from apps.users.models import EmailBroadcast
+from config.db_router import brand_context
+
+
+def parse_filter(value: str) -> tuple:
+    key, sep, filter_value = value.partition('=')
+    if not sep or not key:
+        raise CommandError(f'Geçersiz filtre: {value} (alan=değer bekleniyor)')
+    return key, filter_value
+
+
+class Command(BaseCommand):
+    help = (
+        'Bayilere toplu duyuru e-postası gönderir. --subject verilirse yeni duyuru oluşturup gönderir, '
+        'aksi halde API ile kuyruğa alınmış duyuruları gönderir'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument('--subject', type=str, help='Yeni duyurunun konusu')
+        parser.add_argument('--content', type=str, help='Yeni duyurunun içeriği (HTML)')
+        parser.add_argument('--content-file', type=str, help='İçeriği dosyadan oku (HTML)')
+        parser.add_argument('--region', type=str, help='Bölge filtresi')
+        parser.add_argument('--dealer-type', type=str, help='Bayi tipi filtresi (yetkili, anlasmali, satis)')
+        parser.add_argument('--city', type=str, help='Şehir filtresi')
+        parser.add_argument(
+            '--filter',
+            action='append',
+            type=parse_filter,
+            default=[],
+            help='Ek DealerFilter parametresi (alan=değer), birden fazla verilebilir'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=settings.EMAIL_BROADCAST_RATE,
+            help='Saniyede en fazla e-posta (0: sınırsız)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EMAIL_BROADCAST_CHUNK_SIZE,
+            help='Transaction başına alıcı sayısı'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Sadece alıcı sayısını yazdır')
+        parser.add_argument('--loop', action='store_true', help='Kuyruğu sürekli izle (worker modu)')
+        parser.add_argument('--interval', type=float, default=5.0, help='Worker modunda bekleme süresi (saniye)')
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+
+        if options['subject']:
+            if len(brands) != 1:
+                raise CommandError('Yeni duyuru için tek bir --brand seçilmeli')
+            self.create_and_send(brands[0], options)
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            processed = 0
+            for brand in brands:
+                with brand_context(brand):
+                    pending = EmailBroadcast.objects.filter(
+                        status__in=[EmailBroadcast.Status.QUEUED, EmailBroadcast.Status.SENDING]
+                    ).order_by('created_at')
+                    for broadcast in pending:
+                        if self.stopping:
+                            break
+                        self.send(brand, broadcast, options)
+                        processed += 1
+
+            if not options['loop']:
+                break
+            if not processed:
+                connections.close_all()
+                time.sleep(options['interval'])
+
+    def create_and_send(self, brand, options):
+        content = options['content']
+        if options['content_file']:
+            with open(options['content_file'], encoding='utf-8') as f:
+                content = f.read()
+        if not content:
+            raise CommandError('--content veya --content-file gerekli')
+
+        filters = dict(options['filter'])
+        for key in ('region', 'dealer_type', 'city'):
+            if options[key]:
+                filters[key] = options[key]
+
+        with brand_context(brand):
+            try:
+                if options['dry_run']:
+                    count = broadcast_dealer_queryset(filters).count()
+                    self.stdout.write(f'[{brand}] {count:,} alıcı (gönderilmedi)')
+                    return
+                broadcast, count = queue_broadcast(options['subject'], content, filters)
+            except ValueError as e:
+                raise CommandError(f'Geçersiz filtre: {e}')
+
+            self.stdout.write(f'[{brand}] #{broadcast.pk} oluşturuldu: ~{count:,} alıcı')
+            self.send(brand, broadcast, options)
+
+    def send(self, brand, broadcast, options):
+        started = time.monotonic()
+        broadcast = run_broadcast(
+            broadcast,
+            rate=options['rate'],
+            chunk_size=options['chunk_size'],
+            log=lambda message: self.stdout.write(f'  [{brand}] {message}'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'[{brand}] #{broadcast.pk} {broadcast.get_status_display()}: '
+            f'{broadcast.sent_count:,}/{broadcast.total_count:,} gönderildi, '
+            f'{broadcast.failed_count:,} başarısız ({time.monotonic() - started:.1f}s)'
+        ))
+
+    def stop(self, *args):
+        self.stopping = True
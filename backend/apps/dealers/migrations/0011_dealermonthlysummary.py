@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0010_dealer_fb_ad_account_id_dealer_fb_page_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DealerMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Ay')),
+                ('kind', models.CharField(choices=[('campaign', 'Kampanya Talebi'), ('incentive', 'Teşvik Talebi'), ('visual', 'Görsel İsteği'), ('budget_plan', 'Bütçe Planı')], max_length=20, verbose_name='Tip')),
+                ('status', models.CharField(blank=True, default='', max_length=30, verbose_name='Durum')),
+                ('request_count', models.PositiveIntegerField(default=0, verbose_name='Kayıt Sayısı')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, help_text='Kampanya: bütçe, teşvik: talep edilen tutar, bütçe planı: plan tutarı', max_digits=14, verbose_name='Tutar')),
+                ('approved_amount', models.DecimalField(decimal_places=2, default=0, help_text='Teşvik: onaylanan tutar, bütçe planı: kullanılan tutar', max_digits=14, verbose_name='Onaylanan / Kullanılan Tutar')),
+                ('approved_count', models.PositiveIntegerField(default=0, verbose_name='Onaylanan Tutarı Olan Kayıt Sayısı')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('dealer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='dealers.dealer', verbose_name='Bayi')),
+            ],
+            options={
+                'verbose_name': 'Bayi Aylık Özeti',
+                'verbose_name_plural': 'Bayi Aylık Özetleri',
+                'ordering': ['-month', 'dealer', 'kind', 'status'],
+                'indexes': [models.Index(fields=['kind', 'month'], name='dealers_dea_kind_5419d4_idx')],
+                'unique_together': {('dealer', 'month', 'kind', 'status')},
+            },
+        ),
+    ]
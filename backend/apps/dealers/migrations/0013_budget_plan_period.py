@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:09
+
+import apps.dealers.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+def deactivate_overlapping_plans(apps, schema_editor):
+    """
+    Constraint'ten önce: bayi bazında çakışan aktif planlardan sonra başlayanı
+    pasife al (erken başlayan / eşitse önce oluşturulan plan aktif kalır).
+    """
+    DealerBudgetPlan = apps.get_model('dealers', 'DealerBudgetPlan')
+    plans = (
+        DealerBudgetPlan.objects.using(schema_editor.connection.alias)
+        .filter(is_active=True)
+        .order_by('dealer_id', 'start_date', 'pk')
+        .values_list('pk', 'dealer_id', 'start_date', 'end_date')
+    )
+
+    overlapping, last_dealer, last_end = [], None, None
+    for pk, dealer_id, start_date, end_date in plans.iterator(chunk_size=2000):
+        if dealer_id == last_dealer and start_date <= last_end:
+            overlapping.append(pk)
+            continue
+        last_dealer, last_end = dealer_id, end_date
+
+    for offset in range(0, len(overlapping), 2000):
+        DealerBudgetPlan.objects.using(schema_editor.connection.alias).filter(
+            pk__in=overlapping[offset:offset + 2000]
+        ).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0012_search_document'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='dealerbudgetplan',
+            name='period',
+            field=models.GeneratedField(db_persist=True, expression=apps.dealers.models.DateRange('start_date', 'end_date'), output_field=django.contrib.postgres.fields.ranges.DateRangeField(), verbose_name='Dönem'),
+        ),
+        migrations.RunPython(deactivate_overlapping_plans, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dealerbudgetplan',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('is_active', True)), deferrable=django.db.models.constraints.Deferrable['DEFERRED'], expressions=[('dealer', '='), ('period', '&&')], name='budgetplan_no_overlap', violation_error_message='Bu bayinin aynı dönemle çakışan aktif bir bütçe planı var.'),
+        ),
+    ]
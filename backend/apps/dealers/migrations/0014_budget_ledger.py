@@ -0,0 +1,100 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def record_opening_balances(apps, schema_editor):
+    """
+    Mevcut used_amount / used_budget tutarları için işlenmiş (applied) açılış
+    satırları: ledger toplamları önbelleklerle eşleşsin.
+    """
+    alias = schema_editor.connection.alias
+    BudgetLedgerEntry = apps.get_model('dealers', 'BudgetLedgerEntry')
+    DealerBudgetPlan = apps.get_model('dealers', 'DealerBudgetPlan')
+    DealerBudget = apps.get_model('dealers', 'DealerBudget')
+
+    BudgetLedgerEntry.objects.using(alias).bulk_create([
+        BudgetLedgerEntry(
+            dealer_id=dealer_id, plan_id=plan_id, year=start_date.year, kind='adjust',
+            used_delta=used_amount, note='Açılış bakiyesi', applied=True,
+        )
+        for plan_id, dealer_id, start_date, used_amount in DealerBudgetPlan.objects.using(alias)
+        .exclude(used_amount=0).values_list('pk', 'dealer_id', 'start_date', 'used_amount').iterator(chunk_size=2000)
+    ], batch_size=1000)
+
+    year_used = (
+        BudgetLedgerEntry.objects.using(alias)
+        .filter(dealer=OuterRef('dealer'), year=OuterRef('year'))
+        .order_by().values('dealer', 'year').annotate(total=Sum('used_delta')).values('total')
+    )
+    budgets = (
+        DealerBudget.objects.using(alias)
+        .annotate(ledger_used=Coalesce(Subquery(year_used), 0, output_field=models.DecimalField()))
+        .exclude(used_budget=F('ledger_used'))
+        .values_list('dealer_id', 'year', 'used_budget', 'ledger_used')
+    )
+    BudgetLedgerEntry.objects.using(alias).bulk_create([
+        BudgetLedgerEntry(
+            dealer_id=dealer_id, year=year, kind='adjust',
+            used_delta=used_budget - ledger_used, note='Açılış bakiyesi', applied=True,
+        )
+        for dealer_id, year, used_budget, ledger_used in budgets.iterator(chunk_size=2000)
+        if used_budget != ledger_used
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0008_search_document'),
+        ('dealers', '0013_budget_plan_period'),
+        ('incentives', '0004_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dealerbudgetplan',
+            name='reserved_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Rezerve Tutar'),
+        ),
+        migrations.AlterField(
+            model_name='dealerbudget',
+            name='used_budget',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Used Budget'),
+        ),
+        migrations.AlterField(
+            model_name='dealerbudgetplan',
+            name='used_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Kullanılan Tutar'),
+        ),
+        migrations.CreateModel(
+            name='BudgetLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(verbose_name='Yıl')),
+                ('kind', models.CharField(choices=[('reserve', 'Rezervasyon'), ('commit', 'Harcama'), ('release', 'İade'), ('adjust', 'Düzeltme')], max_length=10, verbose_name='Hareket Tipi')),
+                ('used_delta', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Kullanılan Değişimi')),
+                ('reserved_delta', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Rezerve Değişimi')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='Not')),
+                ('applied', models.BooleanField(default=False, verbose_name='Toplamlara İşlendi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('campaign_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='budget_ledger_entries', to='campaigns.campaignrequest', verbose_name='Kampanya Talebi')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan')),
+                ('dealer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_ledger_entries', to='dealers.dealer', verbose_name='Bayi')),
+                ('incentive_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='budget_ledger_entries', to='incentives.incentiverequest', verbose_name='Teşvik Talebi')),
+                ('plan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='dealers.dealerbudgetplan', verbose_name='Bütçe Planı')),
+            ],
+            options={
+                'verbose_name': 'Bütçe Hareketi',
+                'verbose_name_plural': 'Bütçe Hareketleri',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('applied', False)), fields=['id'], name='budgetledger_pending')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
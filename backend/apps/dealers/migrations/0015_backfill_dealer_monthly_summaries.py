@@ -0,0 +1,67 @@
+from django.db import migrations
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+# kind -> (model, tarih alanı, status alanı, tutar alanı, onaylanan tutar alanı)
+# (apps.dealers.summaries.SOURCES ile aynı eşleme)
+SOURCES = {
+    'campaign': ('campaigns', 'CampaignRequest', 'created_at', 'status', 'budget', None),
+    'incentive': ('incentives', 'IncentiveRequest', 'created_at', 'status', 'incentive_amount', 'approved_amount'),
+    'visual': ('visuals', 'VisualRequest', 'created_at', 'status', None, None),
+    'budget_plan': ('dealers', 'DealerBudgetPlan', 'start_date', None, 'budget_amount', 'used_amount'),
+}
+
+
+def backfill_summaries(apps, schema_editor):
+    """
+    Özet tablosunu mevcut kayıtlardan doldur: DEALER_SUMMARY_READS açıkken
+    istatistik ve dashboard deploy sonrası boş tablodan okumasın.
+    """
+    alias = schema_editor.connection.alias
+    DealerMonthlySummary = apps.get_model('dealers', 'DealerMonthlySummary')
+    DealerMonthlySummary.objects.using(alias).all().delete()
+
+    for kind, (app_label, model_name, date_field, status_field, amount_field, approved_field) in SOURCES.items():
+        model = apps.get_model(app_label, model_name)
+
+        group_by = ['dealer_id', 'month'] + ([status_field] if status_field else [])
+        aggregates = {'request_count': Count('pk')}
+        if amount_field:
+            aggregates['amount_total'] = Sum(amount_field)
+        if approved_field:
+            aggregates['approved_total'] = Sum(approved_field)
+            aggregates['approved_rows'] = Count(approved_field)
+
+        rows = (
+            model._base_manager.using(alias).order_by()
+            .annotate(month=TruncMonth(date_field, output_field=DateField()))
+            .values(*group_by)
+            .annotate(**aggregates)
+        )
+        DealerMonthlySummary.objects.using(alias).bulk_create([
+            DealerMonthlySummary(
+                dealer_id=row['dealer_id'],
+                month=row['month'],
+                kind=kind,
+                status=row[status_field] if status_field else '',
+                request_count=row['request_count'],
+                amount=row.get('amount_total') or 0,
+                approved_amount=row.get('approved_total') or 0,
+                approved_count=row.get('approved_rows') or 0,
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0014_budget_ledger'),
+        ('campaigns', '0010_meta_ad_image_cache'),
+        ('incentives', '0004_search_document'),
+        ('visuals', '0008_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
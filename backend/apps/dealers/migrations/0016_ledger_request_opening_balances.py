@@ -0,0 +1,93 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+from django.utils import timezone
+
+# apps.dealers.budgets._record_request_openings'ın dondurulmuş kopyası
+# (REQUEST_SOURCES ile aynı harcama durumları ve tutarlar)
+CAMPAIGN_SPENT_STATUSES = ('onaylandi', 'yayinda', 'tamamlandi')
+INCENTIVE_SPENT_STATUSES = ('onaylandi', 'tamamlandi')
+
+
+def _campaign(request):
+    return Decimal(str(request.budget or 0)), request.start_date, request.end_date
+
+
+def _incentive(request):
+    created = timezone.localtime(request.created_at).date() if request.created_at else None
+    amount = Decimal(str(request.approved_amount or request.incentive_amount or 0))
+    return amount, created, created
+
+
+def seed_request_commits(apps, schema_editor):
+    """
+    0014'ten önce onaylanmış talepler için talebe bağlı işlenmiş commit satırları.
+
+    Açılış bakiyesi bağlantısız adjust satırı olarak yazılmıştı; bu talepler
+    ilk izlenen kayıtlarında (onaylandi → yayinda, tutar / tarih değişikliği)
+    ledger'da harcamaları olmadığı için tutarı bir kez daha commit ediyordu.
+    Her commit aynı plan / yıl için eşit negatif adjust ile dengelenir; plan ve
+    yıl toplamları (açılış bakiyesi) değişmez, kalan kısım bağlantısız kalır.
+    """
+    alias = schema_editor.connection.alias
+    BudgetLedgerEntry = apps.get_model('dealers', 'BudgetLedgerEntry')
+    DealerBudgetPlan = apps.get_model('dealers', 'DealerBudgetPlan')
+
+    plans = defaultdict(list)
+    for plan in DealerBudgetPlan.objects.using(alias).filter(is_active=True).order_by('pk').only(
+        'pk', 'dealer_id', 'start_date', 'end_date'
+    ):
+        plans[plan.dealer_id].append(plan)
+
+    def covering_plan(dealer_id, start, end):
+        for plan in plans[dealer_id]:
+            if plan.start_date <= start and end <= plan.end_date:
+                return plan.pk
+        return None
+
+    sources = (
+        ('campaigns', 'CampaignRequest', 'campaign_request', CAMPAIGN_SPENT_STATUSES, _campaign),
+        ('incentives', 'IncentiveRequest', 'incentive_request', INCENTIVE_SPENT_STATUSES, _incentive),
+    )
+    for app_label, model_name, field, statuses, values in sources:
+        Model = apps.get_model(app_label, model_name)
+        requests = (
+            Model.objects.using(alias)
+            .filter(status__in=statuses, budget_ledger_entries__isnull=True)
+            .order_by('pk')
+        )
+
+        commits = []
+        offsets = defaultdict(Decimal)
+        for request in requests.iterator(chunk_size=2000):
+            amount, start, end = values(request)
+            if not amount or start is None or end is None:
+                continue
+            key = (request.dealer_id, covering_plan(request.dealer_id, start, end), start.year)
+            commits.append(BudgetLedgerEntry(
+                dealer_id=key[0], plan_id=key[1], year=key[2], kind='commit',
+                used_delta=amount, note='Açılış bakiyesi (talep)', applied=True,
+                **{f'{field}_id': request.pk},
+            ))
+            offsets[key] += amount
+
+        BudgetLedgerEntry.objects.using(alias).bulk_create(commits, batch_size=1000)
+        BudgetLedgerEntry.objects.using(alias).bulk_create([
+            BudgetLedgerEntry(
+                dealer_id=dealer_id, plan_id=plan_id, year=year, kind='adjust',
+                used_delta=-amount, note='Açılış bakiyesi (talebe bağlanan kısım)', applied=True,
+            )
+            for (dealer_id, plan_id, year), amount in offsets.items()
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0015_backfill_dealer_monthly_summaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_request_commits, migrations.RunPython.noop),
+    ]
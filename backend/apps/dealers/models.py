@@ -1,9 +1,16 @@
 import uuid
 import os
+from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.core.validators import EmailValidator
 from django.utils import timezone
 
+from config.change_tracking import ChangeTrackingMixin
+from config.search import SearchDocumentMixin
+
 
 def brand_logo_upload_path(instance, filename):
     """Brand logo için UUID tabanlı dosya yolu"""
@@ -77,9 +84,15 @@ class Brand(models.Model):
         return self.name
 
 
-class Dealer(models.Model):
+class Dealer(ChangeTrackingMixin, SearchDocumentMixin, models.Model):
     """Bayi (Dealer) model"""
     
+    tracked_fields = ('status', 'dealer_name')
+    search_document_fields = (
+        'dealer_code', 'dealer_name', 'contact_first_name', 'contact_last_name',
+        'regional_manager', 'city', 'district', 'email',
+    )
+    
     class BayiTuru(models.TextChoices):
         YETKILI = 'yetkili', 'Yetkili Bayi'
         ANLASMALI = 'anlasmali', 'Anlaşmalı Bayi'
@@ -242,17 +255,27 @@ class Dealer(models.Model):
         verbose_name='Silinme Nedeni'
     )
     
+    # Normalize arama metni (config.search) - save() içinde üretilir
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Arama Metni'
+    )
+    
     class Meta:
         verbose_name = 'Dealer'
         verbose_name_plural = 'Dealers'
         ordering = ['dealer_name']
+        indexes = [
+            GinIndex(name='dealer_search_trgm', fields=['search_document'], opclasses=['gin_trgm_ops']),
+        ]
     
     def save(self, *args, **kwargs):
         """Override save to activate user when dealer is activated"""
         # Check if status changed to 'aktif'
-        if self.pk:  # Only for existing dealers
-            old_dealer = Dealer.objects.filter(pk=self.pk).first()
-            if old_dealer and old_dealer.status != 'aktif' and self.status == 'aktif':
+        if not self._state.adding:  # Only for existing dealers
+            if self.previous('status') != 'aktif' and self.status == 'aktif':
                 # Activate the related user account
                 try:
                     from apps.users.models import User
@@ -281,7 +304,14 @@ class Dealer(models.Model):
         
         # İlişkili kullanıcıları da pasif yap
         from apps.users.models import User
-        User.objects.filter(dealer=self).update(is_active=False)
+        from config.authentication import invalidate_user_principal
+        users = User.objects.filter(dealer=self)
+        user_ids = list(users.values_list('id', flat=True))
+        users.update(is_active=False)
+        
+        # Toplu update User.save'i çağırmaz, principal cache'i elle temizle
+        for user_id in user_ids:
+            invalidate_user_principal(user_id, brand=self._state.db)
     
     def restore(self):
         """Silinen bayiyi geri yükle"""
@@ -311,10 +341,12 @@ class DealerBudget(models.Model):
         verbose_name='Total Budget'
     )
     
+    # BudgetLedgerEntry'lerden yıllık toplam (apps.dealers.budgets.apply_ledger_entries)
     used_budget = models.DecimalField(
         max_digits=12,
         decimal_places=2,
         default=0,
+        editable=False,
         verbose_name='Used Budget'
     )
     
@@ -350,9 +382,27 @@ class DealerBudget(models.Model):
         return (self.used_budget / self.total_budget) * 100
 
 
-class DealerBudgetPlan(models.Model):
-    """Baremli Bütçe Planlaması - Tarih aralığına göre bütçe tanımlama"""
+class DateRange(models.Func):
+    """daterange(start, end, bounds) - kapalı aralık için bounds='[]'"""
+    function = 'DATERANGE'
+    output_field = DateRangeField()
+
+    def __init__(self, start, end, bounds='[]', **extra):
+        super().__init__(start, end, models.Value(bounds), **extra)
+
+
+class DealerBudgetPlan(ChangeTrackingMixin, models.Model):
+    """
+    Baremli Bütçe Planlaması - Tarih aralığına göre bütçe tanımlama.
+
+    period, start_date/end_date'ten DB tarafında üretilen kapalı daterange
+    kolonudur. Bir bayinin aktif planları çakışamaz (GiST exclusion
+    constraint; aynı index kapsama/çakışma sorgularını da karşılar).
+    Bütçe kontrolü ve rezervasyon: apps.dealers.budgets
+    """
     
+    tracked_fields = ('dealer', 'start_date', 'budget_amount', 'used_amount')
+
     dealer = models.ForeignKey(
         Dealer,
         on_delete=models.CASCADE,
@@ -362,6 +412,13 @@ class DealerBudgetPlan(models.Model):
     
     start_date = models.DateField(verbose_name='Başlangıç Tarihi')
     end_date = models.DateField(verbose_name='Bitiş Tarihi')
+
+    period = models.GeneratedField(
+        expression=DateRange('start_date', 'end_date'),
+        output_field=DateRangeField(),
+        db_persist=True,
+        verbose_name='Dönem'
+    )
     
     budget_amount = models.DecimalField(
         max_digits=12,
@@ -370,13 +427,24 @@ class DealerBudgetPlan(models.Model):
         verbose_name='Bütçe Tutarı'
     )
     
+    # used_amount / reserved_amount: BudgetLedgerEntry'lerden plan toplamları
+    # (apps.dealers.budgets.apply_ledger_entries); doğrudan yazılmaz
     used_amount = models.DecimalField(
         max_digits=12,
         decimal_places=2,
         default=0,
+        editable=False,
         verbose_name='Kullanılan Tutar'
     )
     
+    reserved_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name='Rezerve Tutar'
+    )
+    
     description = models.CharField(
         max_length=255,
         blank=True,
@@ -402,14 +470,24 @@ class DealerBudgetPlan(models.Model):
         verbose_name = 'Bütçe Planı'
         verbose_name_plural = 'Bütçe Planları'
         ordering = ['start_date']
+        constraints = [
+            # Deferred: plan listesi tek transaction'da kaydırılabilsin (serializer update)
+            ExclusionConstraint(
+                name='budgetplan_no_overlap',
+                expressions=[('dealer', RangeOperators.EQUAL), ('period', RangeOperators.OVERLAPS)],
+                condition=models.Q(is_active=True),
+                deferrable=models.Deferrable.DEFERRED,
+                violation_error_message='Bu bayinin aynı dönemle çakışan aktif bir bütçe planı var.',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.dealer.dealer_name} - {self.start_date} / {self.end_date}"
     
     @property
     def remaining_amount(self):
-        """Kalan bütçe"""
-        return self.budget_amount - self.used_amount
+        """Kalan bütçe (kullanılan ve rezerve edilen düşülmüş)"""
+        return self.budget_amount - self.used_amount - self.reserved_amount
     
     @property
     def usage_percentage(self):
@@ -425,3 +503,194 @@ class DealerBudgetPlan(models.Model):
             if self.start_date > self.end_date:
                 raise ValidationError('Başlangıç tarihi bitiş tarihinden sonra olamaz.')
 
+
+
+class BudgetLedgerEntry(models.Model):
+    """
+    Bütçe hareketi (append-only). Plan / yıl toplamları (DealerBudgetPlan.used_amount,
+    reserved_amount, DealerBudget.used_budget) bu kayıtlardan artımlı güncellenir;
+    yazarlar aynı satırı UPDATE etmek yerine satır ekler.
+    Servis: apps.dealers.budgets
+    """
+    
+    class Kind(models.TextChoices):
+        RESERVE = 'reserve', 'Rezervasyon'
+        COMMIT = 'commit', 'Harcama'
+        RELEASE = 'release', 'İade'
+        ADJUST = 'adjust', 'Düzeltme'
+    
+    dealer = models.ForeignKey(
+        Dealer,
+        on_delete=models.CASCADE,
+        related_name='budget_ledger_entries',
+        verbose_name='Bayi'
+    )
+    
+    # Kapsayan plan yoksa boş (yalnızca yıllık toplama yansır)
+    plan = models.ForeignKey(
+        DealerBudgetPlan,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ledger_entries',
+        verbose_name='Bütçe Planı'
+    )
+    
+    year = models.IntegerField(verbose_name='Yıl')
+    
+    kind = models.CharField(
+        max_length=10,
+        choices=Kind.choices,
+        verbose_name='Hareket Tipi'
+    )
+    
+    used_delta = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Kullanılan Değişimi'
+    )
+    
+    reserved_delta = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='Rezerve Değişimi'
+    )
+    
+    campaign_request = models.ForeignKey(
+        'campaigns.CampaignRequest',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='budget_ledger_entries',
+        verbose_name='Kampanya Talebi'
+    )
+    
+    incentive_request = models.ForeignKey(
+        'incentives.IncentiveRequest',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='budget_ledger_entries',
+        verbose_name='Teşvik Talebi'
+    )
+    
+    note = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Not'
+    )
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Oluşturan'
+    )
+    
+    # Plan / yıl toplamlarına işlendi mi?
+    applied = models.BooleanField(
+        default=False,
+        verbose_name='Toplamlara İşlendi'
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Oluşturulma Tarihi'
+    )
+    
+    class Meta:
+        verbose_name = 'Bütçe Hareketi'
+        verbose_name_plural = 'Bütçe Hareketleri'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['id'], name='budgetledger_pending', condition=models.Q(applied=False)),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.dealer_id} / {self.year}: {self.used_delta} / {self.reserved_delta}"
+
+
+class DealerMonthlySummary(models.Model):
+    """
+    Bayi / ay / talep tipi / status bazlı özet satırı (dashboard ve istatistikler için).
+    Kaynak tablolar: CampaignRequest, IncentiveRequest, VisualRequest, DealerBudgetPlan.
+    Kayıt değiştikçe ilgili hücre yeniden hesaplanır (apps.dealers.summaries);
+    toplu yeniden hesaplama: manage.py rebuild_dealer_summaries
+    """
+    
+    class Kind(models.TextChoices):
+        CAMPAIGN = 'campaign', 'Kampanya Talebi'
+        INCENTIVE = 'incentive', 'Teşvik Talebi'
+        VISUAL = 'visual', 'Görsel İsteği'
+        BUDGET_PLAN = 'budget_plan', 'Bütçe Planı'
+    
+    dealer = models.ForeignKey(
+        Dealer,
+        on_delete=models.CASCADE,
+        related_name='monthly_summaries',
+        verbose_name='Bayi'
+    )
+    
+    # Ayın ilk günü (talepler: created_at, bütçe planı: start_date)
+    month = models.DateField(verbose_name='Ay')
+    
+    kind = models.CharField(
+        max_length=20,
+        choices=Kind.choices,
+        verbose_name='Tip'
+    )
+    
+    # Bütçe planlarında boş
+    status = models.CharField(
+        max_length=30,
+        blank=True,
+        default='',
+        verbose_name='Durum'
+    )
+    
+    request_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Kayıt Sayısı'
+    )
+    
+    amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Tutar',
+        help_text='Kampanya: bütçe, teşvik: talep edilen tutar, bütçe planı: plan tutarı'
+    )
+    
+    approved_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Onaylanan / Kullanılan Tutar',
+        help_text='Teşvik: onaylanan tutar, bütçe planı: kullanılan tutar'
+    )
+    
+    approved_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Onaylanan Tutarı Olan Kayıt Sayısı'
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Güncellenme Tarihi'
+    )
+    
+    class Meta:
+        verbose_name = 'Bayi Aylık Özeti'
+        verbose_name_plural = 'Bayi Aylık Özetleri'
+        ordering = ['-month', 'dealer', 'kind', 'status']
+        unique_together = ['dealer', 'month', 'kind', 'status']
+        indexes = [
+            models.Index(fields=['kind', 'month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.dealer_id} - {self.month:%Y-%m} - {self.kind}/{self.status}"
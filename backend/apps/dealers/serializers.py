@@ -1,3 +1,4 @@
+from django.db import router, transaction
 from rest_framework import serializers
 from .models import Dealer, DealerBudget, DealerBudgetPlan, Brand
 from apps.users.models import User
@@ -39,7 +40,7 @@ class DealerBudgetPlanSerializer(serializers.ModelSerializer):
         model = DealerBudgetPlan
         fields = [
             'id', 'dealer', 'start_date', 'end_date', 'budget_amount',
-            'used_amount', 'remaining_amount', 'usage_percentage',
+            'used_amount', 'reserved_amount', 'remaining_amount', 'usage_percentage',
             'description', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
@@ -96,10 +97,18 @@ class DealerSerializer(serializers.ModelSerializer):
     
     def get_user_count(self, obj):
         """Get user count for this dealer"""
+        # DealerViewSet queryset'i annotate eder (satır başına sorgu yok)
+        if hasattr(obj, 'active_user_count'):
+            return obj.active_user_count
         return obj.users.filter(is_deleted=False).count()
     
     def get_current_budget(self, obj):
         """Get current year budget"""
+        # DealerViewSet bu yılın bütçesini Prefetch ile current_year_budgets'a koyar
+        if hasattr(obj, 'current_year_budgets'):
+            budget = obj.current_year_budgets[0] if obj.current_year_budgets else None
+            return DealerBudgetSerializer(budget).data if budget else None
+        
         from datetime import datetime
         current_year = datetime.now().year
         
@@ -156,7 +165,6 @@ class DealerDetailSerializer(DealerSerializer):
     # Statistics
     total_visual_requests = serializers.SerializerMethodField()
     total_incentive_requests = serializers.SerializerMethodField()
-    user_count = serializers.SerializerMethodField()
     
     class Meta(DealerSerializer.Meta):
         fields = DealerSerializer.Meta.fields + [
@@ -166,15 +174,15 @@ class DealerDetailSerializer(DealerSerializer):
     
     def get_total_visual_requests(self, obj):
         """Get total visual requests count"""
+        if hasattr(obj, 'visual_request_count'):
+            return obj.visual_request_count
         return obj.visual_requests.count()
     
     def get_total_incentive_requests(self, obj):
         """Get total incentive requests count"""
+        if hasattr(obj, 'incentive_request_count'):
+            return obj.incentive_request_count
         return obj.incentive_requests.count()
-    
-    def get_user_count(self, obj):
-        """Get user count for this dealer"""
-        return obj.users.filter(is_deleted=False).count()
 
 
 class DealerBudgetPlanWriteSerializer(serializers.ModelSerializer):
@@ -219,6 +227,22 @@ class DealerCreateUpdateSerializer(serializers.ModelSerializer):
             return value.upper()
         return value
     
+    def validate_budget_plans(self, value):
+        """Aktif planların dönemleri çakışamaz (DB'de exclusion constraint ile de korunur)"""
+        active = sorted(
+            (plan for plan in value
+             if plan.get('is_active', True) and plan.get('start_date') and plan.get('end_date')),
+            key=lambda plan: plan['start_date']
+        )
+        for previous, current in zip(active, active[1:]):
+            if current['start_date'] <= previous['end_date']:
+                raise serializers.ValidationError(
+                    f"Aktif bütçe planları çakışıyor: "
+                    f"{previous['start_date']:%d.%m.%Y} - {previous['end_date']:%d.%m.%Y} / "
+                    f"{current['start_date']:%d.%m.%Y} - {current['end_date']:%d.%m.%Y}"
+                )
+        return value
+    
     def validate(self, attrs):
         """Validate dealer data"""
         # dealer_code artık opsiyonel - admin sonradan atayacak
@@ -226,37 +250,48 @@ class DealerCreateUpdateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         budget_plans_data = validated_data.pop('budget_plans', [])
-        dealer = super().create(validated_data)
-        
-        for plan_data in budget_plans_data:
-            plan_data.pop('id', None)  # Remove id for new records
-            DealerBudgetPlan.objects.create(dealer=dealer, **plan_data)
-        
+
+        # Transaction brand DB'sinde açılmalı ('default' ayrı bağlantıdır)
+        with transaction.atomic(using=router.db_for_write(Dealer)):
+            dealer = super().create(validated_data)
+
+            for plan_data in budget_plans_data:
+                plan_data.pop('id', None)  # Remove id for new records
+                DealerBudgetPlan.objects.create(dealer=dealer, **plan_data)
+
         return dealer
-    
+
     def update(self, instance, validated_data):
         budget_plans_data = validated_data.pop('budget_plans', None)
-        dealer = super().update(instance, validated_data)
-        
-        if budget_plans_data is not None:
-            # Get existing plan IDs
-            existing_ids = set(instance.budget_plans.values_list('id', flat=True))
-            incoming_ids = set()
-            
-            for plan_data in budget_plans_data:
-                plan_id = plan_data.pop('id', None)
-                
-                if plan_id and plan_id in existing_ids:
-                    # Update existing plan
-                    DealerBudgetPlan.objects.filter(id=plan_id).update(**plan_data)
-                    incoming_ids.add(plan_id)
-                else:
-                    # Create new plan
-                    new_plan = DealerBudgetPlan.objects.create(dealer=dealer, **plan_data)
-                    incoming_ids.add(new_plan.id)
-            
-            # Delete removed plans
-            plans_to_delete = existing_ids - incoming_ids
-            DealerBudgetPlan.objects.filter(id__in=plans_to_delete).delete()
-        
+
+        # Plan dönemleri tek transaction'da kaydırılabilir (çakışma kontrolü commit'te)
+        with transaction.atomic(using=router.db_for_write(Dealer)):
+            dealer = super().update(instance, validated_data)
+
+            if budget_plans_data is not None:
+                # Get existing plan IDs
+                existing_ids = set(instance.budget_plans.values_list('id', flat=True))
+                incoming_ids = set()
+
+                for plan_data in budget_plans_data:
+                    plan_id = plan_data.pop('id', None)
+
+                    if plan_id and plan_id in existing_ids:
+                        # Update existing plan
+                        DealerBudgetPlan.objects.filter(id=plan_id).update(**plan_data)
+                        incoming_ids.add(plan_id)
+                    else:
+                        # Create new plan
+                        new_plan = DealerBudgetPlan.objects.create(dealer=dealer, **plan_data)
+                        incoming_ids.add(new_plan.id)
+
+                # Delete removed plans
+                plans_to_delete = existing_ids - incoming_ids
+                DealerBudgetPlan.objects.filter(id__in=plans_to_delete).delete()
+
+                # Toplu update sinyal üretmez; bayinin bütçe planı özetini yeniden kur
+                from .summaries import rebuild_summaries
+                from .models import DealerMonthlySummary
+                rebuild_summaries(kinds=[DealerMonthlySummary.Kind.BUDGET_PLAN], dealer_ids=[dealer.pk])
+
         return dealer
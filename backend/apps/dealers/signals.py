@@ -38,50 +38,44 @@ def dealer_created_notification(sender, instance, created, **kwargs):
 @receiver(pre_save, sender=Dealer)
 def dealer_status_changed(sender, instance, **kwargs):
     """Bayi durumu değiştiğinde (onaylandığında) mail gönder"""
-    if instance.pk:  # Sadece güncelleme için
-        try:
-            old_instance = Dealer.objects.get(pk=instance.pk)
+    if not instance._state.adding:  # Sadece güncelleme için
+        # Durum 'pasif'ten 'aktif'e değişti mi? (eski değer: ChangeTrackingMixin)
+        if instance.previous('status') != 'aktif' and instance.status == 'aktif':
+            # Bayi onaylandı! Mail gönder
+            if instance.email:
+                send_templated_email(
+                    subject='Başvurunuz Onaylandı - Tofaş Bayi Portalı',
+                    template_name='emails/base_email.html',
+                    context={
+                        'content': f"""
+                            Sayın {instance.dealer_name},<br><br>
+                            Tofaş Bayi Portalı başvurunuz <strong>onaylanmıştır</strong>! 🎉<br><br>
+                            Artık sistemimize giriş yaparak kampanya taleplerinizi oluşturabilirsiniz.<br><br>
+                            <strong>Giriş Linki:</strong> <a href="{settings.FRONTEND_URL}/dealer-login">Giriş Yap</a><br><br>
+                            İyi çalışmalar dileriz,<br>
+                            Tofaş Bayi Portalı Ekibi
+                        """
+                    },
+                    recipient_list=[instance.email],
+                )
             
-            # Durum 'pasif'ten 'aktif'e değişti mi?
-            if old_instance.status != 'aktif' and instance.status == 'aktif':
-                # Bayi onaylandı! Mail gönder
-                if instance.email:
+            # İlgili kullanıcıya da mail gönder (eğer varsa)
+            from apps.users.models import User
+            try:
+                user = User.objects.get(dealer=instance)
+                if user.email:
                     send_templated_email(
-                        subject='Başvurunuz Onaylandı - Tofaş Bayi Portalı',
+                        subject='Hesabınız Aktifleştirildi - Tofaş Bayi Portalı',
                         template_name='emails/base_email.html',
                         context={
                             'content': f"""
-                                Sayın {instance.dealer_name},<br><br>
-                                Tofaş Bayi Portalı başvurunuz <strong>onaylanmıştır</strong>! 🎉<br><br>
-                                Artık sistemimize giriş yaparak kampanya taleplerinizi oluşturabilirsiniz.<br><br>
-                                <strong>Giriş Linki:</strong> <a href="{settings.FRONTEND_URL}/dealer-login">Giriş Yap</a><br><br>
-                                İyi çalışmalar dileriz,<br>
-                                Tofaş Bayi Portalı Ekibi
+                                Merhaba,<br><br>
+                                <strong>{instance.dealer_name}</strong> bayisi için hesabınız aktifleştirildi.<br><br>
+                                <strong>Giriş için:</strong> <a href="{settings.FRONTEND_URL}/dealer-login">Giriş Yap</a><br><br>
+                                İyi çalışmalar dileriz!
                             """
                         },
-                        recipient_list=[instance.email],
+                        recipient_list=[user.email],
                     )
-                
-                # İlgili kullanıcıya da mail gönder (eğer varsa)
-                from apps.users.models import User
-                try:
-                    user = User.objects.get(dealer=instance)
-                    if user.email:
-                        send_templated_email(
-                            subject='Hesabınız Aktifleştirildi - Tofaş Bayi Portalı',
-                            template_name='emails/base_email.html',
-                            context={
-                                'content': f"""
-                                    Merhaba,<br><br>
-                                    <strong>{instance.dealer_name}</strong> bayisi için hesabınız aktifleştirildi.<br><br>
-                                    <strong>Giriş için:</strong> <a href="{settings.FRONTEND_URL}/dealer-login">Giriş Yap</a><br><br>
-                                    İyi çalışmalar dileriz!
-                                """
-                            },
-                            recipient_list=[user.email],
-                        )
-                except User.DoesNotExist:
-                    pass
-                    
-        except Dealer.DoesNotExist:
-            pass
+            except User.DoesNotExist:
+                pass
@@ -0,0 +1,335 @@
+"""
+Dealer Monthly Summaries
+
+Dashboard ve istatistik endpoint'leri için bayi / ay / talep tipi / status
+bazlı özet tablosu (DealerMonthlySummary). Her brand DB'sinin kendi özet
+tablosu vardır; okuma maliyeti geçmiş büyüdükçe değil, bayi × ay sayısıyla
+artar.
+
+Güncelleme:
+1. Kaynak kayıt kaydedilince / silinince (post_save / post_delete) etkilenen
+   bayi-ay hücresi commit sonrası yeniden hesaplanır
+2. Sinyal üretmeyen toplu işlemler (update / bulk_create) sonrası
+   rebuild_summaries() elle çağrılır
+3. manage.py rebuild_dealer_summaries istenen ay aralığını toplu yeniden kurar
+
+Usage:
+    stats = summary_statistics(
+        DealerMonthlySummary.Kind.CAMPAIGN,
+        sums={'total_budget': 'amount'},
+        averages={'avg_budget': 'amount'},
+    )
+    # status_statistics() ile aynı şekil:
+    # {'total_count', 'total_budget', 'avg_budget', 'by_status': {...}}
+"""
+import logging
+from datetime import date, datetime, time
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import Dealer, DealerMonthlySummary
+
+logger = logging.getLogger(__name__)
+
+Kind = DealerMonthlySummary.Kind
+
+# İstatistik isteğinde özet tablosunun karşılayamadığı filtre yoksa özetten okunur
+IGNORED_PARAMS = {'format', 'ordering', 'page', 'page_size'}
+SUMMARY_PARAMS = {'dealer'}
+
+# Kaynak model -> özet tipi (register_dealer_summaries doldurur)
+_KIND_BY_MODEL = {}
+
+
+class SummarySource:
+    """
+    Özet tipinin kaynak modeli ve alan eşlemesi.
+
+    Args:
+        model: 'app_label.ModelName'
+        date_field: Ayın belirlendiği alan
+        status_field: Status alanı (yoksa None)
+        amount_field: DealerMonthlySummary.amount'a toplanan alan
+        approved_field: DealerMonthlySummary.approved_amount'a toplanan alan
+    """
+
+    def __init__(self, model, date_field, status_field='status', amount_field=None, approved_field=None):
+        self.model = model
+        self.date_field = date_field
+        self.status_field = status_field
+        self.amount_field = amount_field
+        self.approved_field = approved_field
+
+    @property
+    def model_class(self):
+        return apps.get_model(self.model)
+
+    @property
+    def is_datetime(self) -> bool:
+        return self.model_class._meta.get_field(self.date_field).get_internal_type() == 'DateTimeField'
+
+    def status_choices(self) -> list:
+        if not self.status_field:
+            return []
+        return self.model_class._meta.get_field(self.status_field).choices
+
+
+SOURCES = {
+    Kind.CAMPAIGN: SummarySource('campaigns.CampaignRequest', 'created_at', amount_field='budget'),
+    Kind.INCENTIVE: SummarySource(
+        'incentives.IncentiveRequest', 'created_at',
+        amount_field='incentive_amount', approved_field='approved_amount',
+    ),
+    Kind.VISUAL: SummarySource('visuals.VisualRequest', 'created_at'),
+    Kind.BUDGET_PLAN: SummarySource(
+        'dealers.DealerBudgetPlan', 'start_date', status_field=None,
+        amount_field='budget_amount', approved_field='used_amount',
+    ),
+}
+
+
+def month_start(value) -> date:
+    """Tarih / datetime'ı (yerel saatle) ayın ilk gününe yuvarla."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.date()
+    return value.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _month_bounds(source: SummarySource, month_from: date | None, month_to: date | None) -> Q:
+    """Kaynak tabloda [month_from, month_to] ay aralığı filtresi."""
+    def bound(month):
+        if source.is_datetime:
+            return timezone.make_aware(datetime.combine(month, time.min))
+        return month
+
+    q = Q()
+    if month_from:
+        q &= Q(**{f'{source.date_field}__gte': bound(month_start(month_from))})
+    if month_to:
+        q &= Q(**{f'{source.date_field}__lt': bound(next_month(month_start(month_to)))})
+    return q
+
+
+def _aggregate(kind, alias, month_from, month_to, dealer_ids) -> list:
+    """Kaynak tablodan bayi / ay / status gruplu özet satırlarını üret (tek GROUP BY sorgusu)."""
+    source = SOURCES[kind]
+    queryset = source.model_class._base_manager.using(alias).filter(_month_bounds(source, month_from, month_to))
+    if dealer_ids is not None:
+        queryset = queryset.filter(dealer_id__in=dealer_ids)
+
+    group_by = ['dealer_id', 'month'] + ([source.status_field] if source.status_field else [])
+    aggregates = {'request_count': Count('pk')}
+    if source.amount_field:
+        aggregates['amount_total'] = Sum(source.amount_field)
+    if source.approved_field:
+        # Alias'lar kaynak alan adlarıyla çakışmasın (IncentiveRequest.approved_amount)
+        aggregates['approved_total'] = Sum(source.approved_field)
+        aggregates['approved_rows'] = Count(source.approved_field)
+
+    rows = (
+        queryset.order_by()
+        .annotate(month=TruncMonth(source.date_field, output_field=DateField()))
+        .values(*group_by)
+        .annotate(**aggregates)
+    )
+
+    return [
+        DealerMonthlySummary(
+            dealer_id=row['dealer_id'],
+            month=row['month'],
+            kind=kind,
+            status=row[source.status_field] if source.status_field else '',
+            request_count=row['request_count'],
+            amount=row.get('amount_total') or 0,
+            approved_amount=row.get('approved_total') or 0,
+            approved_count=row.get('approved_rows') or 0,
+        )
+        for row in rows
+    ]
+
+
+def rebuild_summaries(alias=None, kinds=None, month_from=None, month_to=None, dealer_ids=None) -> int:
+    """
+    Özet satırlarını kaynak tablolardan yeniden hesapla (silip toplu yazar).
+
+    Args:
+        alias: DB alias (varsayılan: aktif brand)
+        kinds: Yeniden kurulacak tipler (varsayılan: hepsi)
+        month_from / month_to: Ay aralığı (dahil); verilmezse tüm geçmiş
+        dealer_ids: Sadece bu bayiler
+
+    Returns:
+        Yazılan özet satırı sayısı
+    """
+    alias = alias or router.db_for_write(DealerMonthlySummary)
+    kinds = kinds or list(Kind)
+
+    with transaction.atomic(using=alias):
+        stale = DealerMonthlySummary.objects.using(alias).filter(kind__in=kinds)
+        if dealer_ids is not None:
+            # Aynı bayinin eşzamanlı hücre güncellemelerini sırala (unique çakışması olmasın)
+            list(
+                Dealer.objects.using(alias).select_for_update()
+                .filter(pk__in=dealer_ids).order_by('pk').values_list('pk', flat=True)
+            )
+            stale = stale.filter(dealer_id__in=dealer_ids)
+        if month_from:
+            stale = stale.filter(month__gte=month_start(month_from))
+        if month_to:
+            stale = stale.filter(month__lte=month_start(month_to))
+        stale.delete()
+
+        written = 0
+        for kind in kinds:
+            rows = _aggregate(kind, alias, month_from, month_to, dealer_ids)
+            written += len(DealerMonthlySummary.objects.using(alias).bulk_create(rows, batch_size=1000))
+    return written
+
+
+def _refresh_cell(alias, kind, dealer_id, month) -> None:
+    """Commit sonrası tek bayi-ay hücresini yenile; hata isteği bozmaz (reconcile düzeltir)."""
+    try:
+        rebuild_summaries(alias, [kind], month, month, [dealer_id])
+    except Exception:
+        logger.exception(f"[DealerSummary] {alias} dealer={dealer_id} {month:%Y-%m} {kind} güncellenemedi")
+
+
+def _cell(dealer_id, value):
+    if not dealer_id or not value:
+        return None
+    return dealer_id, month_start(value)
+
+
+def _remember_previous_cell(sender, instance, raw=False, using=None, **kwargs):
+    """Güncellemede eski bayi-ay hücresini sakla (bayi / tarih değişirse o hücre de yenilenir)."""
+    if raw or instance._state.adding or not instance.pk:
+        return
+    # Eski değerler yüklemede saklanır (ChangeTrackingMixin); ek sorgu yok
+    date_field = SOURCES[_KIND_BY_MODEL[sender]].date_field
+    instance._dealer_summary_previous = _cell(instance.previous('dealer'), instance.previous(date_field))
+
+
+def _schedule_refresh(sender, instance, using=None, raw=False, created=None, **kwargs):
+    # Güncellemede bayi / tarih / durum / tutar değişmediyse hücre aynı kalır
+    if raw or created is False and not instance.has_changed():
+        return
+    kind = _KIND_BY_MODEL[sender]
+    cells = {
+        _cell(instance.dealer_id, getattr(instance, SOURCES[kind].date_field)),
+        instance.__dict__.pop('_dealer_summary_previous', None),
+    }
+    for cell in cells - {None}:
+        transaction.on_commit(partial(_refresh_cell, using, kind, *cell), using=using)
+
+
+def schedule_summary_refresh(instance) -> None:
+    """Sinyal üretmeyen yazımdan (QuerySet.update) sonra kaydın hücresini commit sonrası yenile."""
+    _schedule_refresh(type(instance), instance, using=instance._state.db)
+
+
+def register_dealer_summaries() -> None:
+    """Kaynak modellerin kayıt / silme sinyallerini bağla (DealersConfig.ready)."""
+    for kind, source in SOURCES.items():
+        model = source.model_class
+        _KIND_BY_MODEL[model] = kind
+        uid = f'dealer_summary:{source.model}'
+        pre_save.connect(_remember_previous_cell, sender=model, dispatch_uid=f'{uid}:pre_save', weak=False)
+        post_save.connect(_schedule_refresh, sender=model, dispatch_uid=f'{uid}:post_save', weak=False)
+        post_delete.connect(_schedule_refresh, sender=model, dispatch_uid=f'{uid}:post_delete', weak=False)
+
+
+def summary_statistics(kind, sums=None, averages=None, dealer_ids=None, month_from=None, month_to=None) -> dict:
+    """
+    Özet tablosundan status_statistics() şeklinde istatistik (tek GROUP BY sorgusu).
+
+    Args:
+        kind: DealerMonthlySummary.Kind
+        sums: {'sonuç_adı': 'amount' | 'approved_amount'}
+        averages: {'sonuç_adı': 'amount' | 'approved_amount'}
+        dealer_ids: Sadece bu bayiler (None: hepsi)
+        month_from / month_to: Ay aralığı (dahil)
+
+    Returns:
+        {'total_count', <sums>, <averages>, 'by_status': {code: {'label', 'count'}}}
+    """
+    sums = sums or {}
+    averages = averages or {}
+
+    queryset = DealerMonthlySummary.objects.filter(kind=kind)
+    if dealer_ids is not None:
+        queryset = queryset.filter(dealer_id__in=dealer_ids)
+    if month_from:
+        queryset = queryset.filter(month__gte=month_start(month_from))
+    if month_to:
+        queryset = queryset.filter(month__lte=month_start(month_to))
+
+    rows = list(
+        queryset.order_by().values('status').annotate(
+            count_total=Sum('request_count'),
+            amount_total=Sum('amount'),
+            approved_total=Sum('approved_amount'),
+            approved_rows=Sum('approved_count'),
+        )
+    )
+
+    counts = {row['status']: row['count_total'] for row in rows}
+    total_count = sum(counts.values())
+    totals = {
+        'amount': sum(row['amount_total'] for row in rows),
+        'approved_amount': sum(row['approved_total'] for row in rows),
+    }
+    # Ortalama / toplam paydası: approved_amount null olabilir, sadece dolu kayıtlar sayılır
+    divisors = {'amount': total_count, 'approved_amount': sum(row['approved_rows'] for row in rows)}
+
+    stats = {'total_count': total_count}
+    stats.update({name: totals[field] if divisors[field] else None for name, field in sums.items()})
+    stats.update({
+        name: totals[field] / divisors[field] if divisors[field] else None
+        for name, field in averages.items()
+    })
+    stats['by_status'] = {
+        code: {'label': label, 'count': counts.get(code, 0)}
+        for code, label in SOURCES[kind].status_choices()
+    }
+    return stats
+
+
+def request_summary_statistics(request, kind, sums=None, averages=None) -> dict | None:
+    """
+    İstatistik action'ları için: istek özet tablosundan karşılanabiliyorsa
+    (rol kapsamı + en fazla ?dealer filtresi) sonucu döndür, yoksa None
+    (çağıran canlı sorguya düşer).
+    """
+    if not settings.DEALER_SUMMARY_READS:
+        return None
+    if set(request.query_params) - IGNORED_PARAMS - SUMMARY_PARAMS:
+        return None
+
+    user = request.user
+    if user.is_admin or user.is_moderator:
+        dealer_ids = None
+    elif user.is_bayi and user.dealer_id:
+        dealer_ids = [user.dealer_id]
+    else:
+        return None
+
+    dealer = request.query_params.get('dealer')
+    if dealer:
+        if not dealer.isdigit():
+            return None
+        dealer_ids = [int(dealer)] if dealer_ids is None or int(dealer) in dealer_ids else []
+
+    return summary_statistics(kind, sums=sums, averages=averages, dealer_ids=dealer_ids)
@@ -1,30 +1,68 @@
+from decimal import Decimal, InvalidOperation
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
-from .models import Dealer, DealerBudget, DealerBudgetPlan, Brand
+from .budgets import BudgetError, find_budget_plan, release_plan_budget, reserve_plan_budget
+from .models import Dealer, DealerBudget, DealerMonthlySummary, Brand
 from .serializers import (
     DealerSerializer,
     DealerDetailSerializer,
     DealerCreateUpdateSerializer,
     DealerBudgetSerializer,
+    DealerBudgetPlanSerializer,
     BrandSerializer
 )
 from .filters import DealerFilter, BrandFilter
+from .summaries import summary_statistics
 from apps.users.permissions import IsAdminOrModerator, IsOwnerOrAdmin
+from config.replicas import replica_reads
+from config.search import DocumentSearchFilter
+from config.status_stats import status_statistics
 
 User = get_user_model()
 
 
+def parse_budget_request(start_date, end_date, budget_amount):
+    """'YYYY-MM-DD' tarihleri ve tutarı (date, date, Decimal) olarak çöz."""
+    from datetime import datetime
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    if start > end:
+        raise ValueError('start_date > end_date')
+    return start, end, Decimal(str(budget_amount))
+
+
+def dealer_count_subquery(queryset):
+    """
+    Bayi başına kayıt sayısı (correlated subquery).
+    Birden fazla Count join'inin satırları çoğaltmasını önler.
+    """
+    counts = (
+        queryset.filter(dealer=OuterRef('pk'))
+        .order_by()
+        .values('dealer')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
 class DealerViewSet(viewsets.ModelViewSet):
     """ViewSet for Dealer CRUD operations"""
     queryset = Dealer.objects.all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, DocumentSearchFilter]
     filterset_class = DealerFilter  # Custom filter with icontains for city, district, etc.
     # icontains ile partial search (Türkçe karakterler dahil)
     search_fields = ['dealer_code', 'dealer_name', 'contact_first_name', 'contact_last_name', 'regional_manager', 'city', 'district', 'email']
@@ -63,14 +101,44 @@ class DealerViewSet(viewsets.ModelViewSet):
         
         # Admin and moderator can see all dealers
         if user.is_admin or user.is_moderator:
-            return queryset
+            return self.with_serializer_data(queryset)
         
         # Bayi can only see their own dealer
-        if user.is_bayi and user.dealer:
-            return queryset.filter(dealer_code=user.dealer.dealer_code)
+        if user.is_bayi and user.dealer_id:
+            return self.with_serializer_data(queryset.filter(pk=user.dealer_id))
         
         return queryset.none()
     
+    def with_serializer_data(self, queryset):
+        """
+        Serializer'ın ihtiyaç duyduğu sayıları ve ilişkileri sabit sayıda
+        sorguda yükle (sayfa boyutundan bağımsız).
+        """
+        if self.action not in ('list', 'retrieve', 'statistics'):
+            return queryset
+        
+        from datetime import datetime
+        from apps.incentives.models import IncentiveRequest
+        from apps.visuals.models import VisualRequest
+        
+        queryset = queryset.select_related('brand').annotate(
+            active_user_count=dealer_count_subquery(User.objects.filter(is_deleted=False)),
+        ).prefetch_related(
+            Prefetch(
+                'budgets',
+                queryset=DealerBudget.objects.filter(year=datetime.now().year),
+                to_attr='current_year_budgets',
+            ),
+        )
+        
+        if self.action == 'retrieve':
+            queryset = queryset.annotate(
+                visual_request_count=dealer_count_subquery(VisualRequest.objects.all()),
+                incentive_request_count=dealer_count_subquery(IncentiveRequest.objects.all()),
+            ).prefetch_related('budgets', 'budget_plans', 'users')
+        
+        return queryset
+    
     def destroy(self, request, *args, **kwargs):
         """Soft delete dealer instead of hard delete"""
         instance = self.get_object()
@@ -91,48 +159,39 @@ class DealerViewSet(viewsets.ModelViewSet):
         """Get statistics for a dealer"""
         dealer = self.get_object()
         
-        # Get current year budget
-        from datetime import datetime
-        current_year = datetime.now().year
-        
-        try:
-            current_budget = dealer.budgets.get(year=current_year)
-            budget_data = DealerBudgetSerializer(current_budget).data
-        except DealerBudget.DoesNotExist:
-            budget_data = None
+        # Current year budget (get_queryset Prefetch ile yükler)
+        current_budget = dealer.current_year_budgets[0] if dealer.current_year_budgets else None
+        budget_data = DealerBudgetSerializer(current_budget).data if current_budget else None
         
-        # Get request counts by status
-        visual_requests = dealer.visual_requests.all()
-        incentive_requests = dealer.incentive_requests.all()
+        # Toplam ve status bazlı sayılar: aylık özet tablosundan, kapalıysa talep tipi başına tek sorgu (cache'li)
+        if settings.DEALER_SUMMARY_READS:
+            visual_stats = summary_statistics(DealerMonthlySummary.Kind.VISUAL, dealer_ids=[dealer.pk])
+            incentive_stats = summary_statistics(DealerMonthlySummary.Kind.INCENTIVE, dealer_ids=[dealer.pk])
+        else:
+            visual_stats = status_statistics(dealer.visual_requests.all())
+            incentive_stats = status_statistics(dealer.incentive_requests.all())
         
         statistics = {
             'dealer': DealerSerializer(dealer).data,
             'current_budget': budget_data,
             'visual_requests': {
-                'total': visual_requests.count(),
-                'by_status': {}
+                'total': visual_stats['total_count'],
+                'by_status': {
+                    code: entry['count'] for code, entry in visual_stats['by_status'].items()
+                }
             },
             'incentive_requests': {
-                'total': incentive_requests.count(),
-                'by_status': {}
+                'total': incentive_stats['total_count'],
+                'by_status': {
+                    code: entry['count'] for code, entry in incentive_stats['by_status'].items()
+                }
             }
         }
         
-        # Count by status for visual requests
-        for status_choice in visual_requests.model.Status.choices:
-            status_code = status_choice[0]
-            count = visual_requests.filter(status=status_code).count()
-            statistics['visual_requests']['by_status'][status_code] = count
-        
-        # Count by status for incentive requests
-        for status_choice in incentive_requests.model.Status.choices:
-            status_code = status_choice[0]
-            count = incentive_requests.filter(status=status_code).count()
-            statistics['incentive_requests']['by_status'][status_code] = count
-        
         return Response(statistics)
     
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    @replica_reads
     def check_budget(self, request):
         """
         Anlık bütçe kontrolü - Kampanya formu doldurulurken bütçe yeterliliğini kontrol eder.
@@ -163,11 +222,8 @@ class DealerViewSet(viewsets.ModelViewSet):
             })
         
         try:
-            from datetime import datetime
-            start = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end = datetime.strptime(end_date, '%Y-%m-%d').date()
-            requested = float(requested_budget)
-        except (ValueError, TypeError):
+            start, end, requested = parse_budget_request(start_date, end_date, requested_budget)
+        except (ValueError, TypeError, InvalidOperation):
             return Response({
                 'valid': False,
                 'error': 'Geçersiz tarih veya bütçe formatı.',
@@ -176,77 +232,171 @@ class DealerViewSet(viewsets.ModelViewSet):
                 'requested_budget': 0,
             })
         
-        # Tarih aralığını kapsayan aktif bütçe planı bul
-        # Plan: start_date <= kampanya başlangıç VE end_date >= kampanya bitiş
-        matching_plans = DealerBudgetPlan.objects.filter(
-            dealer=dealer,
-            is_active=True,
-            start_date__lte=start,
-            end_date__gte=end
-        )
+        # Kapsayan plan, yoksa kısmen çakışan ilk plan - tek sorgu (period GiST index'i)
+        plan = find_budget_plan(dealer.pk, start, end)
         
-        if not matching_plans.exists():
-            # Tarih aralığında plan yok - ama belki kısmen kapsıyor?
-            partial_plans = DealerBudgetPlan.objects.filter(
-                dealer=dealer,
-                is_active=True,
-                start_date__lte=end,
-                end_date__gte=start
-            )
-            
-            if partial_plans.exists():
-                # Kısmen kapsayan planlar var
-                plan = partial_plans.first()
-                available = float(plan.budget_amount) - float(plan.used_amount)
-                return Response({
-                    'valid': False,
-                    'error': f'Seçilen tarih aralığı bütçe planını tam kapsamıyor. Mevcut plan: {plan.start_date.strftime("%d.%m.%Y")} - {plan.end_date.strftime("%d.%m.%Y")}',
-                    'warning': True,
-                    'has_plan': True,
-                    'plan_start': plan.start_date.strftime('%d.%m.%Y'),
-                    'plan_end': plan.end_date.strftime('%d.%m.%Y'),
-                    'available_budget': available,
-                    'requested_budget': requested,
-                })
-            
+        if plan is None:
             return Response({
                 'valid': False,
                 'error': 'Bu tarih aralığında tanımlı bir bütçe planınız bulunmuyor.',
                 'has_plan': False,
                 'available_budget': 0,
-                'requested_budget': requested,
+                'requested_budget': float(requested),
+            })
+        
+        available = plan.remaining_amount
+        plan_info = {
+            'has_plan': True,
+            'plan_start': plan.start_date.strftime('%d.%m.%Y'),
+            'plan_end': plan.end_date.strftime('%d.%m.%Y'),
+        }
+        
+        if not plan.covers:
+            return Response({
+                'valid': False,
+                'error': f'Seçilen tarih aralığı bütçe planını tam kapsamıyor. Mevcut plan: {plan_info["plan_start"]} - {plan_info["plan_end"]}',
+                'warning': True,
+                **plan_info,
+                'available_budget': float(available),
+                'requested_budget': float(requested),
             })
         
-        # En uygun planı seç (en dar tarih aralığı)
-        plan = matching_plans.order_by('start_date', '-end_date').first()
-        available = float(plan.budget_amount) - float(plan.used_amount)
+        budget_info = {
+            **plan_info,
+            'total_budget': float(plan.budget_amount),
+            'used_budget': float(plan.used_amount),
+            'available_budget': float(available),
+            'requested_budget': float(requested),
+        }
         
         if requested > available:
             return Response({
                 'valid': False,
                 'error': f'Yetersiz bütçe. Kullanılabilir: ₺{available:,.0f}, Talep edilen: ₺{requested:,.0f}',
-                'has_plan': True,
-                'plan_start': plan.start_date.strftime('%d.%m.%Y'),
-                'plan_end': plan.end_date.strftime('%d.%m.%Y'),
-                'total_budget': float(plan.budget_amount),
-                'used_budget': float(plan.used_amount),
-                'available_budget': available,
-                'requested_budget': requested,
+                **budget_info,
             })
         
         return Response({
             'valid': True,
             'message': f'Bütçe uygun. Kullanılabilir: ₺{available:,.0f}',
-            'has_plan': True,
-            'plan_start': plan.start_date.strftime('%d.%m.%Y'),
-            'plan_end': plan.end_date.strftime('%d.%m.%Y'),
-            'total_budget': float(plan.budget_amount),
-            'used_budget': float(plan.used_amount),
-            'available_budget': available,
-            'requested_budget': requested,
-            'remaining_after': available - requested,
+            **budget_info,
+            'remaining_after': float(available - requested),
         })
     
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminOrModerator], url_path='reserve-budget')
+    def reserve_budget(self, request, pk=None):
+        """
+        Bütçe rezervasyonu - kapsayan plandan tutarı rezerve eder (ledger satırı).
+        POST: { start_date, end_date, budget_amount }
+
+        Talebe bağlı olmayan elle ayırma içindir (release-budget ile iade edilir);
+        kampanya / teşvik talepleri onaya gönderilirken kendi rezervasyonlarını
+        yapar ve onayda harcamaya çevirir (budgets.sync_request_budget).
+        """
+        dealer = self.get_object()
+        try:
+            start, end, amount = parse_budget_request(
+                request.data.get('start_date'), request.data.get('end_date'), request.data.get('budget_amount')
+            )
+            plan = reserve_plan_budget(dealer.pk, start, end, amount, user=request.user)
+        except (ValueError, TypeError, InvalidOperation):
+            return Response({'error': 'Geçersiz tarih veya bütçe formatı.'}, status=status.HTTP_400_BAD_REQUEST)
+        except BudgetError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        
+        # Ledger satırı commit sonrası plan toplamına işlendi
+        plan.refresh_from_db()
+        return Response(DealerBudgetPlanSerializer(plan).data)
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminOrModerator], url_path='release-budget')
+    def release_budget(self, request, pk=None):
+        """
+        Rezervasyon iadesi - planın rezerve tutarından düşer (ledger satırı).
+        POST: { plan_id, budget_amount }
+        """
+        dealer = self.get_object()
+        try:
+            amount = Decimal(str(request.data.get('budget_amount')))
+            plan_id = int(request.data.get('plan_id'))
+        except (ValueError, TypeError, InvalidOperation):
+            return Response({'error': 'Geçersiz plan veya tutar.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not dealer.budget_plans.filter(pk=plan_id).exists():
+            return Response({'error': 'Bütçe planı bulunamadı.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            plan = release_plan_budget(plan_id, amount, user=request.user)
+        except BudgetError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        
+        # Ledger satırı commit sonrası plan toplamına işlendi
+        plan.refresh_from_db()
+        return Response(DealerBudgetPlanSerializer(plan).data)
+    
+    @action(detail=False, methods=['get', 'post'], permission_classes=[IsAdminOrModerator])
+    def broadcasts(self, request):
+        """
+        Toplu duyuru e-postaları.
+        GET: son duyurular ve gönderim durumları
+        POST: { subject, content, filters: {region, dealer_type, city, ...} }
+        Gönderim worker'da yapılır (manage.py send_broadcasts --loop); 202 döner.
+        """
+        from apps.users.email_utils import queue_broadcast
+        from apps.users.models import EmailBroadcast
+        from apps.users.serializers import EmailBroadcastSerializer
+        
+        if request.method == 'GET':
+            broadcasts = EmailBroadcast.objects.all()[:50]
+            return Response(EmailBroadcastSerializer(broadcasts, many=True).data)
+        
+        serializer = EmailBroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            broadcast, recipients = queue_broadcast(
+                serializer.validated_data['subject'],
+                serializer.validated_data['content'],
+                serializer.validated_data.get('filters'),
+                user=request.user,
+            )
+        except ValueError as e:
+            return Response({'filters': e.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(
+            {**EmailBroadcastSerializer(broadcast).data, 'estimated_recipients': recipients},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    @action(
+        detail=False, methods=['get', 'delete'], permission_classes=[IsAdminOrModerator],
+        url_path=r'broadcasts/(?P<broadcast_id>\d+)'
+    )
+    def broadcast_detail(self, request, broadcast_id=None):
+        """
+        GET: duyurunun gönderim durumu (?failed=1 ile başarısız alıcılar)
+        DELETE: gönderimi iptal et (gönderilmiş e-postalar geri alınmaz)
+        """
+        from apps.users.models import EmailBroadcast, EmailBroadcastRecipient
+        from apps.users.serializers import EmailBroadcastSerializer
+        
+        broadcast = EmailBroadcast.objects.filter(pk=broadcast_id).first()
+        if broadcast is None:
+            return Response({'detail': 'Bulunamadı.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.method == 'DELETE':
+            EmailBroadcast.objects.filter(
+                pk=broadcast.pk,
+                status__in=[EmailBroadcast.Status.QUEUED, EmailBroadcast.Status.SENDING]
+            ).update(status=EmailBroadcast.Status.CANCELLED, finished_at=timezone.now())
+            broadcast.refresh_from_db()
+        
+        data = EmailBroadcastSerializer(broadcast).data
+        if request.query_params.get('failed'):
+            data['failed_recipients'] = list(
+                broadcast.recipients.filter(status=EmailBroadcastRecipient.Status.FAILED)
+                .values('email', 'error')[:500]
+            )
+        return Response(data)
+    
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def register(self, request):
         """Public endpoint for dealer registration"""
@@ -295,35 +445,37 @@ class DealerViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            # Create dealer (status will be 'pasif' until admin approval)
-            # dealer_code boş bırakılır - admin sonradan atayacak
-            dealer = Dealer.objects.create(
-                dealer_name=data.get('dealer_name'),
-                dealer_type=data.get('dealer_type', 'yetkili'),
-                status='pasif',  # Requires admin approval
-                city=data.get('city'),
-                district=data.get('district'),
-                address=data.get('address'),
-                phone=data.get('phone'),
-                email=data.get('email'),
-                contact_first_name=data.get('contact_first_name', ''),
-                contact_last_name=data.get('contact_last_name', ''),
-                regional_manager=data.get('regional_manager', ''),
-                additional_emails=data.get('additional_emails', [])
-            )
+            # Bayi, kullanıcı ve bildirim e-postası (outbox) birlikte commit edilir
+            with transaction.atomic(using=router.db_for_write(Dealer)):
+                # Create dealer (status will be 'pasif' until admin approval)
+                # dealer_code boş bırakılır - admin sonradan atayacak
+                dealer = Dealer.objects.create(
+                    dealer_name=data.get('dealer_name'),
+                    dealer_type=data.get('dealer_type', 'yetkili'),
+                    status='pasif',  # Requires admin approval
+                    city=data.get('city'),
+                    district=data.get('district'),
+                    address=data.get('address'),
+                    phone=data.get('phone'),
+                    email=data.get('email'),
+                    contact_first_name=data.get('contact_first_name', ''),
+                    contact_last_name=data.get('contact_last_name', ''),
+                    regional_manager=data.get('regional_manager', ''),
+                    additional_emails=data.get('additional_emails', [])
+                )
             
-            # Create user account (inactive until admin approval)
-            # username = user_email (for login with email)
-            user = User.objects.create_user(
-                username=user_email,  # Email as username for login
-                email=user_email,     # Same email
-                password=data.get('password'),
-                first_name=data.get('contact_first_name', ''),
-                last_name=data.get('contact_last_name', ''),
-                role='bayi',
-                is_active=False,  # Inactive until admin approval
-                dealer=dealer
-            )
+                # Create user account (inactive until admin approval)
+                # username = user_email (for login with email)
+                user = User.objects.create_user(
+                    username=user_email,  # Email as username for login
+                    email=user_email,     # Same email
+                    password=data.get('password'),
+                    first_name=data.get('contact_first_name', ''),
+                    last_name=data.get('contact_last_name', ''),
+                    role='bayi',
+                    is_active=False,  # Inactive until admin approval
+                    dealer=dealer
+                )
             
             return Response(
                 {
@@ -364,8 +516,8 @@ class DealerBudgetViewSet(viewsets.ModelViewSet):
             return self.queryset
         
         # Bayi can only see their own budgets
-        if user.is_bayi and user.dealer:
-            return self.queryset.filter(dealer=user.dealer)
+        if user.is_bayi and user.dealer_id:
+            return self.queryset.filter(dealer_id=user.dealer_id)
         
         return self.queryset.none()
 
@@ -5,6 +5,12 @@ class IncentivesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.incentives'
     verbose_name = 'Teşvik Talepleri'
+    
+    def ready(self):
+        """Kayıt değişince cache'lenmiş status istatistiklerini geçersiz kıl"""
+        from config.status_stats import register_status_statistics
+        from .models import IncentiveRequest
+        register_status_statistics(IncentiveRequest)
 
 
 
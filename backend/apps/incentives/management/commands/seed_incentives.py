@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import router, transaction
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
@@ -6,7 +7,8 @@ import random
 
 from apps.incentives.models import IncentiveRequest
 from apps.dealers.models import Dealer
-from config.db_router import set_current_brand
+from apps.dealers.budgets import BudgetError
+from config.db_router import brand_command
 
 
 class Command(BaseCommand):
@@ -32,14 +34,12 @@ class Command(BaseCommand):
             help='Önce mevcut kayıtları sil'
         )
 
+    @brand_command
     def handle(self, *args, **options):
         brand = options['brand']
         count = options['count']
         clear = options['clear']
 
-        # Set database context for brand
-        set_current_brand(brand)
-
         # Mevcut bayileri al
         dealers = list(Dealer.objects.all())
         if not dealers:
@@ -233,23 +233,29 @@ class Command(BaseCommand):
             )
 
             # Create incentive request
-            incentive = IncentiveRequest.objects.create(
-                dealer=dealer,
-                incentive_title=title,
-                incentive_details=details,
-                purpose=random.choice(purposes),
-                target_audience=random.choice(target_audiences),
-                incentive_amount=amount,
-                event_time=random.choice(event_times),
-                event_location=venue[0],
-                event_venue=venue[1],
-                map_link=venue[2] if random.random() > 0.3 else "",
-                performance_metrics=random.choice(performance_metrics),
-                notes=note,
-                status=status,
-                admin_notes=admin_notes,
-                approved_amount=approved_amount,
-            )
+            # Onay bekleyen / onaylı talepler plandan bütçe düşer; plan yetmezse atla
+            try:
+                with transaction.atomic(using=router.db_for_write(IncentiveRequest)):
+                    incentive = IncentiveRequest.objects.create(
+                        dealer=dealer,
+                        incentive_title=title,
+                        incentive_details=details,
+                        purpose=random.choice(purposes),
+                        target_audience=random.choice(target_audiences),
+                        incentive_amount=amount,
+                        event_time=random.choice(event_times),
+                        event_location=venue[0],
+                        event_venue=venue[1],
+                        map_link=venue[2] if random.random() > 0.3 else "",
+                        performance_metrics=random.choice(performance_metrics),
+                        notes=note,
+                        status=status,
+                        admin_notes=admin_notes,
+                        approved_amount=approved_amount,
+                    )
+            except BudgetError as e:
+                self.stdout.write(self.style.WARNING(f'  Atlandı ({title[:50]}): {e}'))
+                continue
 
             # Manually set created_at
             IncentiveRequest.objects.filter(pk=incentive.pk).update(
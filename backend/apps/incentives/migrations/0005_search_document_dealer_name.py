@@ -0,0 +1,58 @@
+import unicodedata
+
+from django.db import migrations
+
+# config.search.normalize_search_text'ın dondurulmuş kopyası (migration sonradan değişmesin)
+TURKISH_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+})
+
+
+def normalize_search_text(*values):
+    text = ' '.join(str(value) for value in values if value).translate(TURKISH_FOLD)
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+SEARCH_DOCUMENT_FIELDS = ('incentive_title', 'incentive_details', 'dealer__dealer_name', 'event_venue', 'event_location')
+
+
+def refill_search_documents(apps, schema_editor):
+    """Arama metnine bayi adını ekle (bayi ayrı alt sorgu yerine kaydın kendi metninden aranır)"""
+    alias = schema_editor.connection.alias
+    Model = apps.get_model('incentives', 'IncentiveRequest')
+    local_fields = [field for field in SEARCH_DOCUMENT_FIELDS if '__' not in field]
+    queryset = (
+        Model.objects.using(alias).select_related('dealer')
+        .only('pk', 'dealer__dealer_name', *local_fields).order_by('pk')
+    )
+
+    batch = []
+    for obj in queryset.iterator(chunk_size=2000):
+        obj.search_document = normalize_search_text(*(
+            obj.dealer.dealer_name if field == 'dealer__dealer_name' and obj.dealer else getattr(obj, field, None)
+            for field in SEARCH_DOCUMENT_FIELDS
+        ))
+        batch.append(obj)
+        if len(batch) >= 2000:
+            Model.objects.using(alias).bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Model.objects.using(alias).bulk_update(batch, ['search_document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incentives', '0004_search_document'),
+        ('dealers', '0015_backfill_dealer_monthly_summaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(refill_search_documents, migrations.RunPython.noop),
+    ]
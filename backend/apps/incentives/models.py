@@ -1,6 +1,9 @@
 import uuid
 import os
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from config.change_tracking import ChangeTrackingMixin
+from config.search import SearchDocumentMixin
 from apps.dealers.models import Dealer
 
 
@@ -18,9 +21,14 @@ def incentive_reference_upload_path(instance, filename):
     return os.path.join('incentives/references', unique_filename)
 
 
-class IncentiveRequest(models.Model):
+class IncentiveRequest(ChangeTrackingMixin, SearchDocumentMixin, models.Model):
     """Teşvik Talebi (Incentive Request) model"""
     
+    tracked_fields = ('status', 'dealer', 'created_at', 'incentive_amount', 'approved_amount')
+    search_document_fields = (
+        'incentive_title', 'incentive_details', 'dealer__dealer_name', 'event_venue', 'event_location',
+    )
+    
     class Status(models.TextChoices):
         TASLAK = 'taslak', 'Taslak'
         ONAY_BEKLIYOR = 'onay_bekliyor', 'Onay Bekliyor'
@@ -149,10 +157,21 @@ class IncentiveRequest(models.Model):
         verbose_name='Güncellenme Tarihi'
     )
     
+    # Normalize arama metni (config.search) - save() içinde üretilir
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Arama Metni'
+    )
+    
     class Meta:
         verbose_name = 'Teşvik Talebi'
         verbose_name_plural = 'Teşvik Talepleri'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(name='incentivereq_search_trgm', fields=['search_document'], opclasses=['gin_trgm_ops']),
+        ]
     
     def __str__(self):
         return f"{self.dealer.dealer_name} - {self.incentive_title[:50]}"
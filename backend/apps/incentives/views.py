@@ -1,9 +1,10 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from django.db import router, transaction
 
 from .models import IncentiveRequest
 from .serializers import (
@@ -11,14 +12,20 @@ from .serializers import (
     IncentiveRequestDetailSerializer,
     IncentiveRequestCreateUpdateSerializer
 )
+from apps.dealers.budgets import BudgetError
+from apps.dealers.models import DealerMonthlySummary
+from apps.dealers.summaries import request_summary_statistics
 from apps.users.permissions import IsAdminOrModerator, IsOwnerOrAdmin
+from config.search import DocumentSearchFilter
+from config.status_board import status_board
+from config.status_stats import status_statistics
 
 
 class IncentiveRequestViewSet(viewsets.ModelViewSet):
     """ViewSet for IncentiveRequest CRUD operations"""
     queryset = IncentiveRequest.objects.select_related('dealer')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, DocumentSearchFilter]
     filterset_fields = ['status', 'dealer', 'event_time']
     search_fields = ['incentive_title', 'incentive_details', 'dealer__dealer_name', 'event_venue', 'event_location']
     ordering_fields = ['created_at', 'incentive_amount', 'updated_at', 'id', 'status', 'event_time', 'dealer__dealer_name', 'incentive_title', 'event_venue']
@@ -47,8 +54,8 @@ class IncentiveRequestViewSet(viewsets.ModelViewSet):
             return self.queryset
         
         # Bayi can only see their own requests
-        if user.is_bayi and user.dealer:
-            return self.queryset.filter(dealer=user.dealer)
+        if user.is_bayi and user.dealer_id:
+            return self.queryset.filter(dealer_id=user.dealer_id)
         
         return self.queryset.none()
     
@@ -56,11 +63,24 @@ class IncentiveRequestViewSet(viewsets.ModelViewSet):
         """Set dealer automatically for dealer users"""
         user = self.request.user
         
-        # If dealer user, automatically set their dealer
-        if user.is_bayi and user.dealer:
-            serializer.save(dealer=user.dealer)
-        else:
-            serializer.save()
+        # Talep ve bütçe rezervasyonu birlikte commit edilir; plan yetmezse talep oluşmaz
+        try:
+            with transaction.atomic(using=router.db_for_write(IncentiveRequest)):
+                # If dealer user, automatically set their dealer
+                if user.is_bayi and user.dealer:
+                    serializer.save(dealer=user.dealer)
+                else:
+                    serializer.save()
+        except BudgetError as e:
+            raise serializers.ValidationError({'incentive_amount': [str(e)]})
+    
+    def perform_update(self, serializer):
+        # Tutar değişikliği plandan düşen bütçeyi artırabilir; yetmezse kayıt geri alınır
+        try:
+            with transaction.atomic(using=router.db_for_write(IncentiveRequest)):
+                serializer.save()
+        except BudgetError as e:
+            raise serializers.ValidationError({'incentive_amount': [str(e)]})
     
     @action(detail=True, methods=['post'])
     def change_status(self, request, pk=None):
@@ -100,210 +120,45 @@ class IncentiveRequestViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        incentive_request.save()
+        # Onayda rezervasyon harcamaya çevrilir; plan bütçesi yetmezse durum kaydedilmez
+        try:
+            with transaction.atomic(using=router.db_for_write(IncentiveRequest)):
+                incentive_request.save()
+        except BudgetError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         
         serializer = IncentiveRequestDetailSerializer(incentive_request)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def by_status(self, request):
-        """Get requests grouped by status"""
+        """
+        Get requests grouped by status.
+        Tek sorgu (window function); ?limit=N, kolon için ?column=<status>&cursor=<next_cursor>
+        """
         queryset = self.filter_queryset(self.get_queryset())
-        
-        result = {}
-        for status_choice in IncentiveRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            requests = queryset.filter(status=status_code)
-            result[status_code] = {
-                'label': status_label,
-                'count': requests.count(),
-                'requests': IncentiveRequestSerializer(requests[:10], many=True).data
-            }
-        
-        return Response(result)
+        return Response(status_board(queryset, IncentiveRequestSerializer, request))
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get statistics for incentive requests"""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        from django.db.models import Sum, Count, Avg
-        
-        stats = queryset.aggregate(
-            total_count=Count('id'),
-            total_requested=Sum('incentive_amount'),
-            total_approved=Sum('approved_amount'),
-            avg_requested=Avg('incentive_amount'),
-            avg_approved=Avg('approved_amount')
+        # Filtre yoksa (veya sadece ?dealer) bayi aylık özet tablosundan
+        stats = request_summary_statistics(
+            request,
+            DealerMonthlySummary.Kind.INCENTIVE,
+            sums={'total_requested': 'amount', 'total_approved': 'approved_amount'},
+            averages={'avg_requested': 'amount', 'avg_approved': 'approved_amount'},
         )
+        if stats is not None:
+            return Response(stats)
         
-        # Count by status
-        status_counts = {}
-        for status_choice in IncentiveRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            count = queryset.filter(status=status_code).count()
-            status_counts[status_code] = {
-                'label': status_label,
-                'count': count
-            }
-        
-        stats['by_status'] = status_counts
-        
-        return Response(stats)
-
-
-from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-
-from .models import IncentiveRequest
-from .serializers import (
-    IncentiveRequestSerializer,
-    IncentiveRequestDetailSerializer,
-    IncentiveRequestCreateUpdateSerializer
-)
-from apps.users.permissions import IsAdminOrModerator, IsOwnerOrAdmin
-
-
-class IncentiveRequestViewSet(viewsets.ModelViewSet):
-    """ViewSet for IncentiveRequest CRUD operations"""
-    queryset = IncentiveRequest.objects.select_related('dealer')
-    permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['status', 'dealer', 'event_time']
-    search_fields = ['incentive_title', 'incentive_details', 'dealer__dealer_name', 'event_venue', 'event_location']
-    ordering_fields = ['created_at', 'incentive_amount', 'updated_at', 'id', 'status', 'event_time', 'dealer__dealer_name', 'incentive_title', 'event_venue']
-    ordering = ['-created_at']
-    
-    def get_serializer_class(self):
-        """Return appropriate serializer class"""
-        if self.action == 'retrieve':
-            return IncentiveRequestDetailSerializer
-        elif self.action in ['create', 'update', 'partial_update']:
-            return IncentiveRequestCreateUpdateSerializer
-        return IncentiveRequestSerializer
-    
-    def get_permissions(self):
-        """Admin/Moderator for status changes, Bayi can create own requests"""
-        if self.action in ['update', 'partial_update', 'destroy']:
-            return [IsOwnerOrAdmin()]
-        return [IsAuthenticated()]
-    
-    def get_queryset(self):
-        """Filter queryset based on user role"""
-        user = self.request.user
-        
-        # Admin and moderator can see all requests
-        if user.is_admin or user.is_moderator:
-            return self.queryset
-        
-        # Bayi can only see their own requests
-        if user.is_bayi and user.dealer:
-            return self.queryset.filter(dealer=user.dealer)
-        
-        return self.queryset.none()
-    
-    def perform_create(self, serializer):
-        """Set dealer automatically for dealer users"""
-        user = self.request.user
-        
-        # If dealer user, automatically set their dealer
-        if user.is_bayi and user.dealer:
-            serializer.save(dealer=user.dealer)
-        else:
-            serializer.save()
-    
-    @action(detail=True, methods=['post'])
-    def change_status(self, request, pk=None):
-        """Change status of incentive request (admin/moderator only)"""
-        incentive_request = self.get_object()
-        new_status = request.data.get('status')
-        approved_amount = request.data.get('approved_amount')
-        
-        if not new_status:
-            return Response(
-                {'error': 'Status field is required.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if new_status not in dict(IncentiveRequest.Status.choices):
-            return Response(
-                {'error': 'Invalid status value.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Only admin/moderator can change status
-        if not (request.user.is_admin or request.user.is_moderator):
-            return Response(
-                {'error': 'You do not have permission to perform this action.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        incentive_request.status = new_status
-        
-        # Set approved_amount if provided
-        if approved_amount:
-            try:
-                incentive_request.approved_amount = float(approved_amount)
-            except (ValueError, TypeError):
-                return Response(
-                    {'error': 'Invalid approved amount.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        incentive_request.save()
-        
-        serializer = IncentiveRequestDetailSerializer(incentive_request)
-        return Response(serializer.data)
-    
-    @action(detail=False, methods=['get'])
-    def by_status(self, request):
-        """Get requests grouped by status"""
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        result = {}
-        for status_choice in IncentiveRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            requests = queryset.filter(status=status_code)
-            result[status_code] = {
-                'label': status_label,
-                'count': requests.count(),
-                'requests': IncentiveRequestSerializer(requests[:10], many=True).data
-            }
-        
-        return Response(result)
-    
-    @action(detail=False, methods=['get'])
-    def statistics(self, request):
-        """Get statistics for incentive requests"""
         queryset = self.filter_queryset(self.get_queryset())
         
-        from django.db.models import Sum, Count, Avg
-        
-        stats = queryset.aggregate(
-            total_count=Count('id'),
-            total_requested=Sum('incentive_amount'),
-            total_approved=Sum('approved_amount'),
-            avg_requested=Avg('incentive_amount'),
-            avg_approved=Avg('approved_amount')
+        # Toplamlar ve status bazlı sayılar tek sorguda (brand bazlı cache'li)
+        stats = status_statistics(
+            queryset,
+            sums={'total_requested': 'incentive_amount', 'total_approved': 'approved_amount'},
+            averages={'avg_requested': 'incentive_amount', 'avg_approved': 'approved_amount'},
         )
         
-        # Count by status
-        status_counts = {}
-        for status_choice in IncentiveRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            count = queryset.filter(status=status_code).count()
-            status_counts[status_code] = {
-                'label': status_label,
-                'count': count
-            }
-        
-        stats['by_status'] = status_counts
-        
         return Response(stats)
-
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth import get_user_model
 
+from .models import EmailBroadcast, OutboxEmail
+
 User = get_user_model()
 
 
@@ -26,8 +28,39 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """E-posta kuyruğu (manage.py send_outbox_emails gönderir)"""
+    
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = [
+        'subject', 'template_name', 'context', 'recipients', 'from_email', 'plain_text',
+        'attempts', 'last_error', 'created_at', 'sent_at'
+    ]
+    actions = ['retry_now']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Seçilenleri hemen tekrar dene')
+    def retry_now(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.exclude(status=OutboxEmail.Status.SENT).update(
+            status=OutboxEmail.Status.PENDING, next_attempt_at=timezone.now(), attempts=0
+        )
+        self.message_user(request, f'{updated} e-posta kuyruğa alındı.')
 
 
-
-
-
+@admin.register(EmailBroadcast)
+class EmailBroadcastAdmin(admin.ModelAdmin):
+    """Toplu duyuru e-postaları (manage.py send_broadcasts gönderir)"""
+    
+    list_display = ['subject', 'status', 'total_count', 'sent_count', 'failed_count', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject']
+    readonly_fields = [
+        'status', 'total_count', 'sent_count', 'failed_count',
+        'created_by', 'created_at', 'started_at', 'finished_at'
+    ]
@@ -1,10 +1,28 @@
 """
 Email utility functions for sending templated emails
+
+E-postalar doğrudan gönderilmez; OutboxEmail kuyruğuna yazılır (çağıranın
+transaction'ı içinde) ve worker tarafından gönderilir:
+
+    python manage.py send_outbox_emails --brand all
+
+Böylece request süresi SMTP sunucusuna bağlı değildir; transaction geri
+alınırsa e-posta da gönderilmez.
 """
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+import logging
+import smtplib
+import time
+from datetime import datetime, timedelta
+
 from django.conf import settings
-from datetime import datetime
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import router, transaction
+from django.db.models import Count, F, Min, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+logger = logging.getLogger(__name__)
 
 
 def send_templated_email(
@@ -16,54 +34,328 @@ def send_templated_email(
     plain_text_message=None
 ):
     """
-    Send an email using HTML template
+    Queue an email using HTML template (OutboxEmail)
     
     Args:
         subject (str): Email subject
         template_name (str): Template path (e.g., 'emails/password_reset_email.html')
-        context (dict): Template context variables
+        context (dict): Template context variables (JSON serializable)
         recipient_list (list): List of recipient email addresses
         from_email (str, optional): Sender email address
         plain_text_message (str, optional): Plain text fallback message
         
     Returns:
-        bool: True if email was sent successfully, False otherwise
+        bool: True if email was queued successfully, False otherwise
     """
+    from .models import OutboxEmail
+    
+    recipients = [email for email in recipient_list if email]
+    if not recipients:
+        return False
+    
     try:
-        # Add default context variables
-        default_context = {
-            'logo_url': f"{settings.FRONTEND_URL}/assets/images/tofas-white-logo.png",
-            'year': datetime.now().year,
-        }
-        # Merge with provided context
-        full_context = {**default_context, **context}
+        # Savepoint: yazılamazsa çağıranın transaction'ı bozulmaz (Postgres'te
+        # hata sonrası transaction abort olur ve sonraki sorgular da hata verir)
+        with transaction.atomic(using=router.db_for_write(OutboxEmail)):
+            OutboxEmail.objects.create(
+                subject=subject,
+                template_name=template_name,
+                context=context,
+                recipients=recipients,
+                from_email=from_email or '',
+                plain_text=plain_text_message or '',
+            )
+        return True
+    except Exception:
+        logger.exception(f"[EmailOutbox] Kuyruğa yazılamadı: {subject}")
+        return False
+
+
+def render_email_html(template_name, context):
+    """E-posta şablonunu varsayılan context değişkenleriyle render et."""
+    default_context = {
+        'logo_url': f"{settings.FRONTEND_URL}/assets/images/tofas-white-logo.png",
+        'year': datetime.now().year,
+    }
+    return render_to_string(template_name, {**default_context, **context})
+
+
+def build_email_message(outbox_email, connection=None):
+    """OutboxEmail'i render edip gönderime hazır EmailMultiAlternatives'e çevir."""
+    html_content = render_email_html(outbox_email.template_name, outbox_email.context)
+    
+    # Use provided plain text or create a simple one
+    plain_text_message = outbox_email.plain_text or (
+        f"{outbox_email.subject}\n\nLütfen bu e-postayı HTML destekli bir e-posta istemcisinde açın."
+    )
+    
+    email_message = EmailMultiAlternatives(
+        subject=outbox_email.subject,
+        body=plain_text_message,
+        from_email=outbox_email.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=outbox_email.recipients,
+        connection=connection,
+    )
+    email_message.attach_alternative(html_content, "text/html")
+    return email_message
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Üstel bekleme: base * 2^(deneme-1), üst sınırlı."""
+    seconds = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def send_outbox_batch(batch_size=None) -> tuple[int, int]:
+    """
+    Zamanı gelmiş bekleyen e-postalardan bir batch'i gönder (aktif brand DB'si).
+    
+    Satırlar FOR UPDATE SKIP LOCKED ile alınır: paralel worker'lar aynı
+    e-postayı almaz, worker çökerse transaction geri alınır ve e-postalar
+    tekrar denenir. Batch tek SMTP bağlantısını kullanır.
+    
+    Returns:
+        (gönderilen, başarısız) sayıları
+    """
+    from .models import OutboxEmail
+    
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    sent = failed = 0
+    
+    # Kilitler brand DB'sinde alınmalı ('default' ayrı bağlantıdır)
+    with transaction.atomic(using=router.db_for_write(OutboxEmail)):
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if not batch:
+            return 0, 0
         
-        # Render HTML email
-        html_content = render_to_string(template_name, full_context)
+        connection = get_connection(fail_silently=False)
+        try:
+            for outbox_email in batch:
+                try:
+                    # Açık bağlantı varsa no-op; kopan bağlantı yeniden açılır
+                    connection.open()
+                    build_email_message(outbox_email, connection).send()
+                except Exception as e:
+                    failed += 1
+                    outbox_email.attempts += 1
+                    outbox_email.last_error = f"{type(e).__name__}: {e}"[:2000]
+                    if outbox_email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                        outbox_email.status = OutboxEmail.Status.FAILED
+                        logger.error(f"[EmailOutbox] #{outbox_email.pk} gönderilemedi, vazgeçildi: {outbox_email.last_error}")
+                    else:
+                        outbox_email.next_attempt_at = timezone.now() + _retry_delay(outbox_email.attempts)
+                        logger.warning(f"[EmailOutbox] #{outbox_email.pk} gönderilemedi (deneme {outbox_email.attempts}): {outbox_email.last_error}")
+                    # Bağlantı koptuysa sonraki e-posta yeni bağlantı açsın
+                    if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                        connection.close()
+                else:
+                    sent += 1
+                    outbox_email.status = OutboxEmail.Status.SENT
+                    outbox_email.sent_at = timezone.now()
+                    outbox_email.attempts += 1
+                    outbox_email.last_error = ''
+        finally:
+            connection.close()
         
-        # Use provided plain text or create a simple one
-        if not plain_text_message:
-            plain_text_message = f"{subject}\n\nLütfen bu e-postayı HTML destekli bir e-posta istemcisinde açın."
+        OutboxEmail.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    
+    return sent, failed
+
+
+def outbox_depth() -> dict:
+    """Kuyruk durumu (aktif brand DB'si): bekleyen, zamanı gelmiş, başarısız, en eski bekleyen (sn)."""
+    from .models import OutboxEmail
+    
+    now = timezone.now()
+    pending = Q(status=OutboxEmail.Status.PENDING)
+    stats = OutboxEmail.objects.aggregate(
+        pending=Count('pk', filter=pending),
+        due=Count('pk', filter=pending & Q(next_attempt_at__lte=now)),
+        failed=Count('pk', filter=Q(status=OutboxEmail.Status.FAILED)),
+        oldest=Min('created_at', filter=pending),
+    )
+    oldest = stats.pop('oldest')
+    stats['oldest_pending_s'] = round((now - oldest).total_seconds()) if oldest else 0
+    return stats
+
+
+def broadcast_dealer_queryset(filters):
+    """
+    Toplu e-posta alıcısı bayiler: silinmemiş, e-postası olan ve DealerFilter
+    parametrelerine uyan bayiler (status verilmezse sadece aktifler).
+    
+    Raises:
+        ValueError: geçersiz filtre
+    """
+    from apps.dealers.filters import DealerFilter
+    from apps.dealers.models import Dealer
+    
+    filters = {'status': 'aktif', **(filters or {})}
+    queryset = Dealer.objects.filter(is_deleted=False).exclude(email__isnull=True).exclude(email='')
+    filterset = DealerFilter(filters, queryset=queryset)
+    if not filterset.is_valid():
+        raise ValueError({field: list(errors) for field, errors in filterset.errors.items()})
+    return filterset.qs.order_by()
+
+
+def queue_broadcast(subject, content, filters=None, user=None):
+    """
+    Toplu e-postayı kuyruğa al; gönderim worker'da (manage.py send_broadcasts).
+    
+    Returns:
+        (EmailBroadcast, tahmini alıcı sayısı)
+    """
+    from .models import EmailBroadcast
+    
+    recipients = broadcast_dealer_queryset(filters).count()
+    broadcast = EmailBroadcast.objects.create(
+        subject=subject,
+        content=content,
+        filters=filters or {},
+        created_by=user,
+    )
+    return broadcast, recipients
+
+
+def prepare_broadcast(broadcast) -> int:
+    """
+    Alıcı satırlarını bayi sorgusundan akışla (iterator) chunk chunk yaz ve
+    gönderimi başlat. Aynı e-posta bir kez eklenir.
+    
+    Returns:
+        Alıcı sayısı
+    """
+    from .models import EmailBroadcast, EmailBroadcastRecipient
+    
+    chunk_size = settings.EMAIL_BROADCAST_CHUNK_SIZE * 10
+    with transaction.atomic(using=router.db_for_write(EmailBroadcast)):
+        broadcast = EmailBroadcast.objects.select_for_update().get(pk=broadcast.pk)
+        if broadcast.status != EmailBroadcast.Status.QUEUED:
+            return broadcast.total_count
         
-        # Set default from_email if not provided
-        if not from_email:
-            from_email = settings.DEFAULT_FROM_EMAIL
+        rows = broadcast_dealer_queryset(broadcast.filters).values_list('pk', 'email')
+        batch = []
+        for dealer_id, email in rows.iterator(chunk_size=chunk_size):
+            batch.append(EmailBroadcastRecipient(broadcast=broadcast, dealer_id=dealer_id, email=email.strip()))
+            if len(batch) >= chunk_size:
+                EmailBroadcastRecipient.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            EmailBroadcastRecipient.objects.bulk_create(batch, ignore_conflicts=True)
         
-        # Create email with both HTML and plain text
-        email_message = EmailMultiAlternatives(
-            subject=subject,
-            body=plain_text_message,
-            from_email=from_email,
-            to=recipient_list,
+        broadcast.total_count = broadcast.recipients.count()
+        broadcast.status = EmailBroadcast.Status.SENDING
+        broadcast.started_at = timezone.now()
+        broadcast.save(update_fields=['total_count', 'status', 'started_at'])
+    
+    return broadcast.total_count
+
+
+def send_broadcast_chunk(broadcast, html_content, connection, chunk_size=None) -> tuple[int, int]:
+    """
+    Bekleyen alıcılardan bir chunk'ı verilen (açık) bağlantıyla gönder.
+    Alıcılar SKIP LOCKED ile alınır; paralel worker'lar aynı alıcıya göndermez.
+    
+    Returns:
+        (gönderilen, başarısız) sayıları
+    """
+    from .models import EmailBroadcast, EmailBroadcastRecipient
+    
+    chunk_size = chunk_size or settings.EMAIL_BROADCAST_CHUNK_SIZE
+    plain_text = strip_tags(broadcast.content)
+    from_email = settings.DEFAULT_FROM_EMAIL
+    sent = failed = 0
+    
+    with transaction.atomic(using=router.db_for_write(EmailBroadcastRecipient)):
+        recipients = list(
+            EmailBroadcastRecipient.objects.select_for_update(skip_locked=True)
+            .filter(broadcast=broadcast, status=EmailBroadcastRecipient.Status.PENDING)
+            .order_by('pk')[:chunk_size]
         )
-        email_message.attach_alternative(html_content, "text/html")
-        email_message.send(fail_silently=False)
+        for recipient in recipients:
+            # Şablon bir kez render edildi; alıcı başına sadece zarf oluşturulur
+            message = EmailMultiAlternatives(
+                subject=broadcast.subject,
+                body=plain_text,
+                from_email=from_email,
+                to=[recipient.email],
+                connection=connection,
+            )
+            message.attach_alternative(html_content, "text/html")
+            try:
+                connection.open()
+                message.send()
+            except Exception as e:
+                failed += 1
+                recipient.status = EmailBroadcastRecipient.Status.FAILED
+                recipient.error = f"{type(e).__name__}: {e}"[:2000]
+                if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                    connection.close()
+            else:
+                sent += 1
+                recipient.status = EmailBroadcastRecipient.Status.SENT
+                recipient.sent_at = timezone.now()
         
-        return True
-        
-    except Exception as e:
-        print(f"Email sending error: {e}")
-        return False
+        EmailBroadcastRecipient.objects.bulk_update(recipients, ['status', 'error', 'sent_at'])
+        EmailBroadcast.objects.filter(pk=broadcast.pk).update(
+            sent_count=F('sent_count') + sent,
+            failed_count=F('failed_count') + failed,
+        )
+    
+    return sent, failed
+
+
+def run_broadcast(broadcast, rate=None, chunk_size=None, log=None):
+    """
+    Toplu e-postayı baştan sona gönder (yarıda kalmışsa kaldığı yerden).
+    Tek SMTP bağlantısı, chunk'lar arası hız sınırı (rate: e-posta/sn, 0: sınırsız).
+    
+    Returns:
+        Güncel EmailBroadcast
+    """
+    from .models import EmailBroadcast
+    
+    rate = settings.EMAIL_BROADCAST_RATE if rate is None else rate
+    chunk_size = chunk_size or settings.EMAIL_BROADCAST_CHUNK_SIZE
+    
+    prepare_broadcast(broadcast)
+    broadcast.refresh_from_db()
+    html_content = render_email_html(broadcast.template_name, {'content': broadcast.content})
+    
+    connection = get_connection(fail_silently=False)
+    try:
+        while broadcast.status == EmailBroadcast.Status.SENDING:
+            started = time.monotonic()
+            sent, failed = send_broadcast_chunk(broadcast, html_content, connection, chunk_size)
+            if not sent and not failed:
+                break
+            if log:
+                log(f'#{broadcast.pk}: {sent} gönderildi, {failed} başarısız')
+            
+            # Hız sınırı: chunk en az len/rate saniye sürsün
+            if rate:
+                time.sleep(max(0.0, (sent + failed) / rate - (time.monotonic() - started)))
+            # İptal edildi mi?
+            broadcast.refresh_from_db(fields=['status'])
+    finally:
+        connection.close()
+    
+    # İptal edilmediyse tamamla (bekleyen alıcı kalmadı)
+    EmailBroadcast.objects.filter(pk=broadcast.pk, status=EmailBroadcast.Status.SENDING).update(
+        status=EmailBroadcast.Status.DONE, finished_at=timezone.now()
+    )
+    broadcast.refresh_from_db()
+    logger.info(
+        f"[EmailBroadcast] #{broadcast.pk} {broadcast.status}: "
+        f"{broadcast.sent_count}/{broadcast.total_count} gönderildi, {broadcast.failed_count} başarısız"
+    )
+    return broadcast
 
 
 def send_password_reset_email(user, reset_url):
@@ -0,0 +1,103 @@
+import logging
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.users.email_utils import outbox_depth, send_outbox_batch
+from config.db_router import brand_context
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'E-posta kuyruğunu (OutboxEmail) gönderen worker; varsayılan olarak sürekli çalışır'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--brand',
+            type=str,
+            default='all',
+            choices=['ford', 'tofas', 'all'],
+            help='Marka seçimi (ford, tofas veya all)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Zamanı gelmiş e-postaları gönderip çık'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Kuyruk boşken bekleme süresi (saniye)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Tek SMTP bağlantısıyla gönderilecek e-posta sayısı'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Sadece kuyruk durumunu yazdır'
+        )
+
+    def handle(self, *args, **options):
+        brands = ['ford', 'tofas'] if options['brand'] == 'all' else [options['brand']]
+
+        if options['stats']:
+            for brand in brands:
+                self.report(brand)
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        last_report = 0
+        while not self.stopping:
+            processed = 0
+            for brand in brands:
+                with brand_context(brand):
+                    # Zamanı gelmiş e-posta kalmayana kadar batch batch gönder
+                    while not self.stopping:
+                        try:
+                            sent, failed = send_outbox_batch(options['batch_size'])
+                        except Exception:
+                            logger.exception(f"[EmailOutbox] {brand} batch gönderilemedi")
+                            break
+                        if sent or failed:
+                            self.stdout.write(f'  [{brand}] {sent} gönderildi, {failed} başarısız')
+                        processed += sent + failed
+                        if sent + failed < options['batch_size']:
+                            break
+
+            if options['once']:
+                for brand in brands:
+                    self.report(brand)
+                break
+
+            # Kuyruk derinliği dakikada bir
+            if time.monotonic() - last_report >= 60:
+                for brand in brands:
+                    self.report(brand)
+                last_report = time.monotonic()
+
+            if not processed:
+                connections.close_all()
+                time.sleep(options['interval'])
+
+    def report(self, brand):
+        with brand_context(brand):
+            stats = outbox_depth()
+        self.stdout.write(
+            f"[{brand}] kuyruk: {stats['pending']} bekleyen ({stats['due']} zamanı gelmiş), "
+            f"{stats['failed']} başarısız, en eski bekleyen {stats['oldest_pending_s']}s"
+        )
+
+    def stop(self, *args):
+        self.stopping = True
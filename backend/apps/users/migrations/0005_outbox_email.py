@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:18
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_dealer_user_foreignkey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Konu')),
+                ('template_name', models.CharField(max_length=255, verbose_name='Şablon')),
+                ('context', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Şablon Context')),
+                ('recipients', models.JSONField(default=list, verbose_name='Alıcılar')),
+                ('from_email', models.CharField(blank=True, max_length=255, verbose_name='Gönderen')),
+                ('plain_text', models.TextField(blank=True, verbose_name='Düz Metin')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('sent', 'Gönderildi'), ('failed', 'Başarısız')], default='pending', max_length=10, verbose_name='Durum')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme Sayısı')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Sonraki Deneme')),
+                ('last_error', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Gönderilme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Giden E-posta',
+                'verbose_name_plural': 'Giden E-postalar',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='outbox_pending')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0014_budget_ledger'),
+        ('users', '0005_outbox_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailBroadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Konu')),
+                ('content', models.TextField(verbose_name='İçerik (HTML)')),
+                ('template_name', models.CharField(default='emails/base_email.html', max_length=255, verbose_name='Şablon')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='Bayi Filtreleri')),
+                ('status', models.CharField(choices=[('queued', 'Sırada'), ('sending', 'Gönderiliyor'), ('done', 'Tamamlandı'), ('cancelled', 'İptal Edildi')], default='queued', max_length=10, verbose_name='Durum')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='Alıcı Sayısı')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='Gönderilen')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Başarısız')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Başlama Tarihi')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş Tarihi')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan')),
+            ],
+            options={
+                'verbose_name': 'Toplu E-posta',
+                'verbose_name_plural': 'Toplu E-postalar',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmailBroadcastRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='E-posta')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('sent', 'Gönderildi'), ('failed', 'Başarısız')], default='pending', max_length=10, verbose_name='Durum')),
+                ('error', models.TextField(blank=True, verbose_name='Hata')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Gönderilme Tarihi')),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='users.emailbroadcast', verbose_name='Toplu E-posta')),
+                ('dealer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='dealers.dealer', verbose_name='Bayi')),
+            ],
+            options={
+                'verbose_name': 'Toplu E-posta Alıcısı',
+                'verbose_name_plural': 'Toplu E-posta Alıcıları',
+                'indexes': [models.Index(fields=['broadcast', 'status'], name='broadcastrcpt_status')],
+                'unique_together': {('broadcast', 'email')},
+            },
+        ),
+    ]
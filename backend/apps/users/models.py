@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
+from config.change_tracking import ChangeTrackingMixin
+
 
 class ActiveUserManager(UserManager):
     """Custom manager that excludes soft-deleted users"""
@@ -15,9 +18,11 @@ class AllUsersManager(UserManager):
     pass
 
 
-class User(AbstractUser):
+class User(ChangeTrackingMixin, AbstractUser):
     """Custom User model with role-based access"""
     
+    tracked_fields = ('is_active', 'is_deleted')
+
     class Role(models.TextChoices):
         ADMIN = 'admin', 'Admin'
         MODERATOR = 'moderator', 'Moderator'
@@ -76,6 +81,13 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
+    def save(self, *args, **kwargs):
+        """Override save to invalidate the cached auth principal"""
+        super().save(*args, **kwargs)
+        
+        from config.authentication import invalidate_user_principal
+        invalidate_user_principal(self.pk, brand=self._state.db)
+    
     def soft_delete(self, reason=''):
         """Kullanıcıyı soft delete yap"""
         self.is_deleted = True
@@ -113,3 +125,151 @@ class User(AbstractUser):
     def is_creative_agency(self):
         return self.role == self.Role.CREATIVE_AGENCY
 
+
+class OutboxEmail(models.Model):
+    """
+    Gönderilecek e-posta (transactional outbox).
+    İş değişikliğiyle aynı transaction'da yazılır; şablon render ve SMTP
+    gönderimi worker'da yapılır (manage.py send_outbox_emails).
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Bekliyor'
+        SENT = 'sent', 'Gönderildi'
+        FAILED = 'failed', 'Başarısız'
+    
+    subject = models.CharField(max_length=255, verbose_name='Konu')
+    template_name = models.CharField(max_length=255, verbose_name='Şablon')
+    context = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='Şablon Context')
+    recipients = models.JSONField(default=list, verbose_name='Alıcılar')
+    from_email = models.CharField(max_length=255, blank=True, verbose_name='Gönderen')
+    plain_text = models.TextField(blank=True, verbose_name='Düz Metin')
+    
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Durum'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Deneme Sayısı')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Sonraki Deneme')
+    last_error = models.TextField(blank=True, verbose_name='Son Hata')
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Gönderilme Tarihi')
+    
+    class Meta:
+        verbose_name = 'Giden E-posta'
+        verbose_name_plural = 'Giden E-postalar'
+        ordering = ['-created_at']
+        indexes = [
+            # Worker kuyruğu: sadece bekleyenler
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbox_pending',
+                condition=models.Q(status='pending')
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.recipients)}"
+
+
+class EmailBroadcast(models.Model):
+    """
+    Bayilere toplu duyuru e-postası.
+    Alıcılar worker'da (manage.py send_broadcasts) bayi filtresinden çıkarılır;
+    şablon bir kez render edilir, gönderim tek SMTP bağlantısıyla chunk'lar
+    halinde ve hız sınırlı yapılır.
+    """
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Sırada'
+        SENDING = 'sending', 'Gönderiliyor'
+        DONE = 'done', 'Tamamlandı'
+        CANCELLED = 'cancelled', 'İptal Edildi'
+    
+    subject = models.CharField(max_length=255, verbose_name='Konu')
+    content = models.TextField(verbose_name='İçerik (HTML)')
+    template_name = models.CharField(
+        max_length=255,
+        default='emails/base_email.html',
+        verbose_name='Şablon'
+    )
+    # DealerFilter parametreleri (örn. {"region": "Marmara", "dealer_type": "yetkili"})
+    filters = models.JSONField(default=dict, blank=True, verbose_name='Bayi Filtreleri')
+    
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name='Durum'
+    )
+    total_count = models.PositiveIntegerField(default=0, verbose_name='Alıcı Sayısı')
+    sent_count = models.PositiveIntegerField(default=0, verbose_name='Gönderilen')
+    failed_count = models.PositiveIntegerField(default=0, verbose_name='Başarısız')
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Oluşturan'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Başlama Tarihi')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Bitiş Tarihi')
+    
+    class Meta:
+        verbose_name = 'Toplu E-posta'
+        verbose_name_plural = 'Toplu E-postalar'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+
+class EmailBroadcastRecipient(models.Model):
+    """Toplu e-postanın alıcı bazlı gönderim durumu"""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Bekliyor'
+        SENT = 'sent', 'Gönderildi'
+        FAILED = 'failed', 'Başarısız'
+    
+    broadcast = models.ForeignKey(
+        EmailBroadcast,
+        on_delete=models.CASCADE,
+        related_name='recipients',
+        verbose_name='Toplu E-posta'
+    )
+    dealer = models.ForeignKey(
+        'dealers.Dealer',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Bayi'
+    )
+    email = models.EmailField(verbose_name='E-posta')
+    
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Durum'
+    )
+    error = models.TextField(blank=True, verbose_name='Hata')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Gönderilme Tarihi')
+    
+    class Meta:
+        verbose_name = 'Toplu E-posta Alıcısı'
+        verbose_name_plural = 'Toplu E-posta Alıcıları'
+        unique_together = ['broadcast', 'email']
+        indexes = [
+            models.Index(fields=['broadcast', 'status'], name='broadcastrcpt_status'),
+        ]
+    
+    def __str__(self):
+        return f"{self.email} ({self.get_status_display()})"
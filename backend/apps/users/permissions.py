@@ -8,6 +8,18 @@ class IsAdmin(permissions.BasePermission):
         return request.user and request.user.is_authenticated and request.user.is_admin
 
 
+class IsSuperAdmin(permissions.BasePermission):
+    """Permission class for super-admins managing all brands (cross-brand endpoints)"""
+    
+    def has_permission(self, request, view):
+        return (
+            request.user and
+            request.user.is_authenticated and
+            request.user.is_admin and
+            request.user.is_superuser
+        )
+
+
 class IsAdminOrModerator(permissions.BasePermission):
     """Permission class for admin or moderator users"""
     
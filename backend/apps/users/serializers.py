@@ -2,6 +2,8 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from .models import EmailBroadcast
+
 User = get_user_model()
 
 
@@ -240,3 +242,20 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
             raise serializers.ValidationError({"new_password": "Şifreler eşleşmiyor."})
         return attrs
 
+
+class EmailBroadcastSerializer(serializers.ModelSerializer):
+    """Toplu duyuru e-postası - oluşturma ve gönderim durumu"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    filters = serializers.DictField(child=serializers.CharField(), required=False)
+    
+    class Meta:
+        model = EmailBroadcast
+        fields = [
+            'id', 'subject', 'content', 'filters', 'status', 'status_display',
+            'total_count', 'sent_count', 'failed_count',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'total_count', 'sent_count', 'failed_count',
+            'created_at', 'started_at', 'finished_at'
+        ]
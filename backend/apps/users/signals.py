@@ -14,30 +14,26 @@ User = get_user_model()
 @receiver(pre_save, sender=User)
 def user_activated_notification(sender, instance, **kwargs):
     """Kullanıcı aktif edildiğinde mail gönder (sadece bayi rolü için)"""
-    if instance.pk:  # Sadece güncelleme için
-        try:
-            old_instance = User.objects.get(pk=instance.pk)
-            
-            # is_active False'dan True'ya değişti mi ve rolü bayi mi?
-            if not old_instance.is_active and instance.is_active and instance.role == 'bayi':
-                # Kullanıcı aktif edildi! Mail gönder
-                if instance.email:
-                    # Bayi adını al
-                    dealer_name = "Bayiniz"
-                    if instance.dealer:
-                        dealer_name = instance.dealer.dealer_name
-                    
-                    send_templated_email(
-                        subject='Kayıt talebiniz onaylandı.',
-                        template_name='emails/base_email.html',
-                        context={
-                            'content': f"""
-                                <strong>{dealer_name}</strong> için oluşturduğunuz talep yönetici tarafından onaylandı.<br><br>
-                                Kullanıcı adı ve şifreniz ile bu linkten giriş yapabilirsiniz: <a href="{settings.FRONTEND_URL}/dealer-login">{settings.FRONTEND_URL}/dealer-login</a>
-                            """
-                        },
-                        recipient_list=[instance.email],
-                    )
-                    
-        except User.DoesNotExist:
-            pass
+    if not instance._state.adding:  # Sadece güncelleme için
+        # is_active False'dan True'ya değişti mi ve rolü bayi mi? (eski değer: ChangeTrackingMixin)
+        # Silinmiş kullanıcının geri yüklenmesi (restore) bildirim göndermez
+        was_inactive = instance.previous('is_active') is False and not instance.previous('is_deleted')
+        if was_inactive and instance.is_active and instance.role == 'bayi':
+            # Kullanıcı aktif edildi! Mail gönder
+            if instance.email:
+                # Bayi adını al
+                dealer_name = "Bayiniz"
+                if instance.dealer:
+                    dealer_name = instance.dealer.dealer_name
+                
+                send_templated_email(
+                    subject='Kayıt talebiniz onaylandı.',
+                    template_name='emails/base_email.html',
+                    context={
+                        'content': f"""
+                            <strong>{dealer_name}</strong> için oluşturduğunuz talep yönetici tarafından onaylandı.<br><br>
+                            Kullanıcı adı ve şifreniz ile bu linkten giriş yapabilirsiniz: <a href="{settings.FRONTEND_URL}/dealer-login">{settings.FRONTEND_URL}/dealer-login</a>
+                        """
+                    },
+                    recipient_list=[instance.email],
+                )
@@ -5,6 +5,12 @@ class VisualsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.visuals'
     verbose_name = 'Görsel İstekleri'
+    
+    def ready(self):
+        """Kayıt değişince cache'lenmiş status istatistiklerini geçersiz kıl"""
+        from config.status_stats import register_status_statistics
+        from .models import VisualRequest
+        register_status_statistics(VisualRequest)
 
 
 
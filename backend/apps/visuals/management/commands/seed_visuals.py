@@ -9,7 +9,7 @@ from apps.visuals.models import (
     VisualRequestCreative
 )
 from apps.dealers.models import Dealer
-from config.db_router import set_current_brand
+from config.db_router import brand_command
 
 
 class Command(BaseCommand):
@@ -35,14 +35,12 @@ class Command(BaseCommand):
             help='Önce mevcut kayıtları sil'
         )
 
+    @brand_command
     def handle(self, *args, **options):
         brand = options['brand']
         count = options['count']
         clear = options['clear']
 
-        # Set database context for brand
-        set_current_brand(brand)
-
         # Mevcut bayileri al
         dealers = list(Dealer.objects.all())
         if not dealers:
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:04
+
+import unicodedata
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# config.search.normalize_search_text'ın dondurulmuş kopyası (migration sonradan değişmesin)
+TURKISH_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+})
+
+
+def normalize_search_text(*values):
+    text = ' '.join(str(value) for value in values if value).translate(TURKISH_FOLD)
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+SEARCH_DOCUMENT_FIELDS = ('creative_work_request', 'work_details')
+
+
+def fill_search_documents(apps, schema_editor):
+    """Mevcut kayıtların search_document'ını doldur (index'ten önce, batch'ler halinde)"""
+    Model = apps.get_model('visuals', 'VisualRequest')
+    queryset = Model.objects.using(schema_editor.connection.alias).only('pk', *SEARCH_DOCUMENT_FIELDS).order_by('pk')
+
+    batch = []
+    for obj in queryset.iterator(chunk_size=2000):
+        obj.search_document = normalize_search_text(*(getattr(obj, field) for field in SEARCH_DOCUMENT_FIELDS))
+        batch.append(obj)
+        if len(batch) >= 2000:
+            Model.objects.using(schema_editor.connection.alias).bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Model.objects.using(schema_editor.connection.alias).bulk_update(batch, ['search_document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dealers', '0012_search_document'),
+        ('visuals', '0007_dealer_user_foreignkey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visualrequest',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Arama Metni'),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='visualrequest',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='visualreq_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,6 +1,9 @@
 import uuid
 import os
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from config.change_tracking import ChangeTrackingMixin
+from config.search import SearchDocumentMixin
 from apps.dealers.models import Dealer
 
 
@@ -25,9 +28,12 @@ def visual_delivered_upload_path(instance, filename):
     return os.path.join('visuals/delivered', unique_filename)
 
 
-class VisualRequest(models.Model):
+class VisualRequest(ChangeTrackingMixin, SearchDocumentMixin, models.Model):
     """Görsel İsteği (Visual Request) model"""
     
+    tracked_fields = ('status', 'dealer', 'created_at')
+    search_document_fields = ('creative_work_request', 'work_details', 'dealer__dealer_name')
+    
     class Status(models.TextChoices):
         TASLAK = 'taslak', 'Taslak'
         GORSEL_BEKLIYOR = 'gorsel_bekliyor', 'Görsel Bekliyor'
@@ -122,10 +128,21 @@ class VisualRequest(models.Model):
         verbose_name='Güncellenme Tarihi'
     )
     
+    # Normalize arama metni (config.search) - save() içinde üretilir
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Arama Metni'
+    )
+    
     class Meta:
         verbose_name = 'Görsel İsteği'
         verbose_name_plural = 'Görsel İstekleri'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(name='visualreq_search_trgm', fields=['search_document'], opclasses=['gin_trgm_ops']),
+        ]
     
     def __str__(self):
         return f"{self.dealer.dealer_name} - {self.creative_work_request[:50]}"
@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 
 from .models import VisualRequest, VisualRequestReferenceFile, VisualRequestDeliveredFile
 from .serializers import (
@@ -15,13 +15,15 @@ from .serializers import (
     VisualRequestDeliveredFileSerializer
 )
 from apps.users.permissions import IsAdminOrModerator, IsOwnerOrAdmin
+from config.search import DocumentSearchFilter
+from config.status_board import status_board
 
 
 class VisualRequestViewSet(viewsets.ModelViewSet):
     """ViewSet for VisualRequest CRUD operations"""
     queryset = VisualRequest.objects.select_related('dealer').prefetch_related('sizes', 'creatives', 'reference_files', 'delivered_files')
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, DocumentSearchFilter]
     filterset_fields = ['status', 'dealer', 'deadline', 'assigned_to']
     search_fields = ['creative_work_request', 'work_details', 'dealer__dealer_name']
     ordering_fields = ['created_at', 'deadline', 'updated_at', 'id', 'status', 'quantity_request', 'dealer__dealer_name', 'creative_work_request']
@@ -54,8 +56,8 @@ class VisualRequestViewSet(viewsets.ModelViewSet):
             return self.queryset.filter(assigned_to='creative_agency')
         
         # Bayi can only see their own requests
-        if user.is_bayi and user.dealer:
-            return self.queryset.filter(dealer=user.dealer)
+        if user.is_bayi and user.dealer_id:
+            return self.queryset.filter(dealer_id=user.dealer_id)
         
         return self.queryset.none()
     
@@ -109,21 +111,12 @@ class VisualRequestViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_status(self, request):
-        """Get requests grouped by status"""
+        """
+        Get requests grouped by status.
+        Tek sorgu (window function); ?limit=N, kolon için ?column=<status>&cursor=<next_cursor>
+        """
         queryset = self.filter_queryset(self.get_queryset())
-        
-        result = {}
-        for status_choice in VisualRequest.Status.choices:
-            status_code = status_choice[0]
-            status_label = status_choice[1]
-            requests = queryset.filter(status=status_code)
-            result[status_code] = {
-                'label': status_label,
-                'count': requests.count(),
-                'requests': VisualRequestSerializer(requests[:10], many=True).data
-            }
-        
-        return Response(result)
+        return Response(status_board(queryset, VisualRequestSerializer, request))
     
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_file(self, request, pk=None):
@@ -0,0 +1,124 @@
+"""
+Request-scoped JWT Authentication
+
+BrandMiddleware Bearer token'ı zaten doğruluyor (brand claim'i için).
+Bu modül aynı doğrulanmış token'ı DRF tarafında tekrar kullanır ve
+kullanıcıyı kısa ömürlü, brand bazlı bir principal cache'inden yükler.
+
+Akış:
+1. BrandMiddleware token'ı bir kez doğrular → request.jwt_validated_token
+2. BrandJWTAuthentication token'ı request'ten alır (ikinci imza kontrolü yok)
+3. Kullanıcı principal cache'inden gelir (role, dealer_id, is_active...)
+   → hot list endpoint'lerinde auth sorgusu yapılmaz
+
+Cache invalidation: User.save (soft_delete / restore dahil) ve
+Dealer.soft_delete'in toplu update'i invalidate_user_principal çağırır.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import brand_scope
+from .db_router import get_current_brand
+
+# Principal olarak cache'lenen alanlar (attname). Geri kalan alanlar deferred
+# kalır ve ilk erişimde Django tarafından lazy yüklenir.
+PRINCIPAL_FIELDS = (
+    'id', 'username', 'role', 'dealer_id',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def _principal_cache_key(user_id) -> str:
+    # Brand prefix'i cache KEY_FUNCTION ekler (config.cache.make_brand_key)
+    return f'auth:principal:{user_id}'
+
+
+def invalidate_user_principal(user_id, brand: str | None = None) -> None:
+    """
+    Kullanıcının cache'lenmiş principal'ını sil.
+
+    Args:
+        user_id: User primary key
+        brand: 'ford' veya 'tofas'; verilmezse mevcut brand context kullanılır
+    """
+    if user_id is None:
+        return
+    with brand_scope(brand):
+        cache.delete(_principal_cache_key(user_id))
+
+
+def load_user_principal(user_model, user_id):
+    """
+    Kullanıcıyı principal cache'inden (yoksa DB'den) yükle.
+
+    Dönen instance gerçek bir User modelidir (FK atamaları, save() vb.
+    çalışır); PRINCIPAL_FIELDS dışındaki alanlar deferred'dir.
+
+    Returns:
+        User instance veya None (kullanıcı yoksa / silinmişse)
+    """
+    brand = get_current_brand()
+    key = _principal_cache_key(user_id)
+    principal = cache.get(key)
+
+    if principal is None:
+        principal = (
+            user_model.objects.filter(pk=user_id)
+            .values(*PRINCIPAL_FIELDS)
+            .first()
+        ) or {}  # Kullanıcı yoksa boş dict cache'lenir (negatif cache)
+        cache.set(key, principal, settings.AUTH_PRINCIPAL_CACHE_TTL)
+
+    if not principal:
+        return None
+
+    field_names = [
+        f.attname for f in user_model._meta.concrete_fields
+        if f.attname in principal
+    ]
+    values = [principal[name] for name in field_names]
+    return user_model.from_db(brand, field_names, values)
+
+
+class BrandJWTAuthentication(JWTAuthentication):
+    """
+    BrandMiddleware'in doğruladığı token'ı yeniden kullanan JWT authentication.
+
+    Middleware token'ı doğrulayamadıysa (veya hiç çalışmadıysa) standart
+    JWTAuthentication akışına düşer; hata mesajları değişmez.
+
+    Usage:
+        REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] =
+            ['config.authentication.BrandJWTAuthentication']
+    """
+
+    def authenticate(self, request):
+        validated_token = getattr(request._request, 'jwt_validated_token', None)
+        if validated_token is None:
+            return super().authenticate(request)
+
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        # Token revoke kontrolü password hash gerektirir, cache'lenmez
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = load_user_principal(self.user_model, user_id)
+
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,255 @@
+"""
+API Benchmark Senaryoları
+
+Release öncesi endpoint throughput'unu ölçmek için senaryolar ve runner.
+Senaryolar Django test client (in-process) veya çalışan bir sunucu
+(--base-url) üzerinden, seed'lenmiş brand veritabanlarına karşı koşulur.
+
+Her senaryo / brand için:
+- p50 / p95 / p99 / ortalama latency (ms)
+- Sorgu sayısı (QueryAccountingMiddleware'in Server-Timing header'ından). Test
+  client ile koşulurken QUERY_SERVER_TIMING ölçüm süresince açılır, tüm
+  senaryolarda sayılır. --base-url ile koşulurken sunucuda QUERY_SERVER_TIMING
+  (varsayılan: DEBUG) kapalıysa bayi senaryolarında sorgu sayısı boş kalır.
+- Response boyutu (byte)
+
+Sonuçlar JSON olarak saklanır; iki çalıştırma compare_results ile
+karşılaştırılabilir (commit'ler arası regresyon takibi).
+
+Usage:
+    python manage.py benchmark_api --brand all --iterations 50
+    python manage.py benchmark_api --scenario dealers-list --compare benchmark-results/önceki.json
+"""
+import json
+import math
+import re
+import statistics
+import subprocess
+import time
+from contextlib import nullcontext
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.test.utils import override_settings
+
+from .db_router import brand_context
+
+# Server-Timing: db;dur=12.3;desc="8 queries"
+_SERVER_TIMING_DB_RE = re.compile(r'(?:^|,\s*)db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+class Scenario:
+    """
+    Tek bir endpoint ölçümü.
+
+    Args:
+        name: Senaryo adı (örn. 'dealers-list')
+        method: HTTP method
+        path: URL; '{dealer_id}' gibi placeholder'lar brand context'inden doldurulur
+        role: Token'ı kullanılacak kullanıcı ('admin' veya 'bayi')
+        data: POST body (callable ise her brand için üretilir)
+    """
+
+    def __init__(self, name: str, method: str, path: str, role: str = 'admin', data=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.role = role
+        self.data = data
+
+    def build(self, context: dict) -> tuple[str, dict | None]:
+        data = self.data(context) if callable(self.data) else self.data
+        return self.path.format(**context), data
+
+
+def _check_budget_payload(context: dict) -> dict:
+    start = date.today().replace(day=1)
+    return {
+        'start_date': start.isoformat(),
+        'end_date': (start + timedelta(days=27)).isoformat(),
+        'budget_amount': 1000,
+    }
+
+
+SCENARIOS = [
+    Scenario('dealers-list', 'GET', '/api/dealers/'),
+    Scenario('dealers-detail', 'GET', '/api/dealers/{dealer_id}/'),
+    Scenario('dealers-statistics', 'GET', '/api/dealers/{dealer_id}/statistics/'),
+    Scenario('dealers-check-budget', 'POST', '/api/dealers/check_budget/', role='bayi', data=_check_budget_payload),
+    Scenario('campaigns-list', 'GET', '/api/campaigns/requests/'),
+    Scenario('campaigns-detail', 'GET', '/api/campaigns/requests/{campaign_id}/'),
+    Scenario('campaigns-statistics', 'GET', '/api/campaigns/requests/statistics/'),
+    Scenario('campaigns-by-status', 'GET', '/api/campaigns/requests/by_status/'),
+    Scenario('incentives-statistics', 'GET', '/api/incentives/requests/statistics/'),
+    Scenario('incentives-by-status', 'GET', '/api/incentives/requests/by_status/'),
+    Scenario('visuals-by-status', 'GET', '/api/visuals/requests/by_status/'),
+]
+
+
+def percentile(values: list, pct: float) -> float | None:
+    """Nearest-rank percentile (values sıralı olmak zorunda değil)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class BenchmarkRunner:
+    """
+    Senaryoları brand bazlı çalıştırır.
+
+    base_url verilmezse Django test client kullanılır (in-process,
+    middleware'ler dahil); verilirse istekler HTTP ile gönderilir.
+    """
+
+    def __init__(self, base_url: str | None = None):
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self._contexts = {}
+        self._tokens = {}
+
+        if self.base_url:
+            import requests
+            self._session = requests.Session()
+        else:
+            from django.test import Client
+            host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h), 'localhost')
+            self._client = Client(HTTP_HOST=host)
+
+    def brand_context_data(self, brand: str) -> dict:
+        """Senaryo path'leri için örnek kayıt id'leri ve token'lar."""
+        if brand in self._contexts:
+            return self._contexts[brand]
+
+        from apps.campaigns.models import CampaignRequest
+        from apps.users.models import User
+        from apps.users.serializers import CustomTokenObtainPairSerializer
+
+        with brand_context(brand):
+            admin = User.objects.filter(role=User.Role.ADMIN, is_active=True).order_by('pk').first()
+            bayi = (
+                User.objects.filter(role=User.Role.BAYI, is_active=True, dealer__isnull=False)
+                .select_related('dealer').order_by('pk').first()
+            )
+            campaign_id = CampaignRequest.objects.order_by('-pk').values_list('pk', flat=True).first()
+
+            tokens = {
+                role: str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+                for role, user in (('admin', admin), ('bayi', bayi)) if user
+            }
+
+        self._tokens[brand] = tokens
+        self._contexts[brand] = {
+            'brand': brand,
+            'dealer_id': bayi.dealer_id if bayi else None,
+            'campaign_id': campaign_id,
+        }
+        return self._contexts[brand]
+
+    def _query_timing(self):
+        """
+        In-process çalışırken Server-Timing header'ını her role aç (normalde
+        DEBUG kapalıyken sadece admin görür). Uzak sunucunun ayarı buradan
+        değiştirilemez.
+        """
+        if self.base_url:
+            return nullcontext()
+        return override_settings(QUERY_ACCOUNTING_ENABLED=True, QUERY_SERVER_TIMING=True)
+
+    def _send(self, method: str, path: str, token: str, data) -> tuple[int, int, int | None]:
+        """İsteği gönder → (status, response byte, sorgu sayısı)"""
+        headers = {'Authorization': f'Bearer {token}'}
+
+        if self.base_url:
+            response = self._session.request(method, self.base_url + path, json=data, headers=headers)
+            body = response.content
+            server_timing = response.headers.get('Server-Timing', '')
+        else:
+            response = self._client.generic(
+                method, path,
+                data=json.dumps(data) if data is not None else '',
+                content_type='application/json',
+                HTTP_AUTHORIZATION=headers['Authorization'],
+            )
+            body = response.content
+            server_timing = response.get('Server-Timing', '')
+
+        match = _SERVER_TIMING_DB_RE.search(server_timing)
+        return response.status_code, len(body), int(match.group(1)) if match else None
+
+    def run(self, scenario: Scenario, brand: str, iterations: int, warmup: int = 3) -> dict:
+        context = self.brand_context_data(brand)
+        token = self._tokens[brand].get(scenario.role)
+
+        if token is None:
+            return {'skipped': f"'{scenario.role}' rolünde aktif kullanıcı yok"}
+        if any(f'{{{key}}}' in scenario.path and context[key] is None for key in context):
+            return {'skipped': 'Senaryo için örnek kayıt yok (seed edilmemiş)'}
+
+        path, data = scenario.build(context)
+
+        with self._query_timing():
+            for _ in range(warmup):
+                self._send(scenario.method, path, token, data)
+
+            latencies, sizes, queries, status_codes = [], [], [], {}
+            for _ in range(iterations):
+                started = time.perf_counter()
+                status_code, size, query_count = self._send(scenario.method, path, token, data)
+                latencies.append((time.perf_counter() - started) * 1000)
+                sizes.append(size)
+                if query_count is not None:
+                    queries.append(query_count)
+                status_codes[str(status_code)] = status_codes.get(str(status_code), 0) + 1
+
+        return {
+            'path': path,
+            'method': scenario.method,
+            'iterations': iterations,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'min_ms': round(min(latencies), 2),
+            'max_ms': round(max(latencies), 2),
+            'queries': max(queries) if queries else None,
+            'response_bytes': round(statistics.fmean(sizes)),
+            'status_codes': status_codes,
+        }
+
+
+def compare_results(previous: dict, current: dict) -> list[dict]:
+    """
+    İki benchmark çalıştırmasını karşılaştır (p95 ve sorgu sayısı farkları).
+
+    Returns:
+        [{'brand', 'scenario', 'p95_before', 'p95_after', 'p95_change_pct',
+          'queries_before', 'queries_after'}, ...]
+    """
+    rows = []
+    for brand, scenarios in current.get('results', {}).items():
+        for name, result in scenarios.items():
+            before = previous.get('results', {}).get(brand, {}).get(name)
+            if not before or 'p95_ms' not in before or 'p95_ms' not in result:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else None
+            rows.append({
+                'brand': brand,
+                'scenario': name,
+                'p95_before': before['p95_ms'],
+                'p95_after': result['p95_ms'],
+                'p95_change_pct': round(change, 1) if change is not None else None,
+                'queries_before': before.get('queries'),
+                'queries_after': result.get('queries'),
+            })
+    return rows
@@ -9,24 +9,33 @@ Bu middleware sadece authenticated request'ler için brand set eder.
 Login sırasında serializer brand'i body'den alıp DB router'a set eder.
 """
 import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpRequest, HttpResponse
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from .db_router import set_current_brand, clear_current_brand
+from . import replicas
 
 logger = logging.getLogger(__name__)
 
 
-def detect_brand_from_token(request: HttpRequest) -> str | None:
+def get_validated_token(request: HttpRequest):
     """
-    JWT token'dan brand claim'i oku.
+    Bearer token'ı doğrula ve sonucu request üzerinde sakla.
+    
+    Token request başına bir kez doğrulanır; DRF tarafındaki
+    BrandJWTAuthentication aynı token'ı request.jwt_validated_token'dan alır.
     
     Args:
         request: Django HttpRequest
     
     Returns:
-        Brand string veya None (token yoksa/geçersizse)
+        Validated token veya None (token yoksa/geçersizse)
     """
+    if hasattr(request, 'jwt_validated_token'):
+        return request.jwt_validated_token
+    
+    request.jwt_validated_token = None
     auth_header = request.headers.get('Authorization', '')
     
     if not auth_header.startswith('Bearer '):
@@ -35,19 +44,35 @@ def detect_brand_from_token(request: HttpRequest) -> str | None:
     try:
         jwt_auth = JWTAuthentication()
         raw_token = auth_header.split(' ')[1]
-        validated_token = jwt_auth.get_validated_token(raw_token)
-        
-        # Token'dan brand claim'i al
-        brand = validated_token.get('brand')
-        
-        if brand in ('ford', 'tofas'):
-            return brand
-        
-        return None
-        
+        request.jwt_validated_token = jwt_auth.get_validated_token(raw_token)
     except (InvalidToken, TokenError, Exception) as e:
         logger.debug(f"Token validation failed: {e}")
+    
+    return request.jwt_validated_token
+
+
+def detect_brand_from_token(request: HttpRequest) -> str | None:
+    """
+    JWT token'dan brand claim'i oku.
+    
+    Args:
+        request: Django HttpRequest
+    
+    Returns:
+        Brand string veya None (token yoksa/geçersizse)
+    """
+    validated_token = get_validated_token(request)
+    
+    if validated_token is None:
         return None
+    
+    # Token'dan brand claim'i al
+    brand = validated_token.get('brand')
+    
+    if brand in ('ford', 'tofas'):
+        return brand
+    
+    return None
 
 
 class BrandMiddleware:
@@ -55,6 +80,7 @@ class BrandMiddleware:
     Middleware that detects and sets the current brand for each request.
     
     - Authenticated requests: JWT token'daki brand claim'i kullanılır
+      (doğrulanmış token request.jwt_validated_token'da saklanır)
     - Unauthenticated requests (login/register): Brand set edilmez,
       serializer request body'den alıp set eder
     
@@ -63,10 +89,16 @@ class BrandMiddleware:
         'config.brand_middleware.BrandMiddleware',
     """
     
+    sync_capable = True
+    async_capable = True
+    
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
     
-    def __call__(self, request: HttpRequest) -> HttpResponse:
+    def _set_brand(self, request: HttpRequest) -> None:
         # JWT token varsa brand'i al
         token_brand = detect_brand_from_token(request)
         
@@ -78,14 +110,38 @@ class BrandMiddleware:
         else:
             # Unauthenticated request - brand set edilmez
             # Login/register serializer'ları body'den brand alıp set_current_brand çağıracak
+            # Önceki request'ten kalan bir brand olmamalı
+            clear_current_brand()
             request.brand = None
             logger.debug("No JWT token, brand not set (login/register will set from body)")
         
+        # Safe-method request'lerde okumalar read replica'ya gidebilir
+        replicas.begin_request(request, request.brand)
+    
+    def _clear_brand(self, request: HttpRequest) -> None:
+        # Request write yaptıysa kullanıcı bir süre primary'ye yapışır
+        replicas.end_request(request, request.brand)
+        clear_current_brand()
+    
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+        
+        self._set_brand(request)
         try:
             response = self.get_response(request)
         finally:
             # Request sonrası temizlik
-            clear_current_brand()
+            self._clear_brand(request)
+        
+        return response
+    
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # ASGI: her request kendi task context'inde çalışır
+        self._set_brand(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._clear_brand(request)
         
         return response
-
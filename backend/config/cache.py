@@ -0,0 +1,210 @@
+"""
+Brand-namespaced Cache
+
+settings.CACHES['default'] gunicorn worker'ları arasında paylaşımlıdır
+(Redis veya dosya tabanlı, bkz. CACHE_URL). Ford ve Tofaş verisi aynı
+backend'de tutulduğu için her key aktif brand ile prefix'lenir:
+
+    <KEY_PREFIX>:<version>:<brand>:<key>      (brand yoksa 'global')
+
+Uygulama kodu doğrudan django.core.cache.cache kullanabilir; brand ayrımı
+KEY_FUNCTION seviyesinde yapılır. Liste / istatistik / config lookup'ları
+için brand_cache yardımcıları:
+
+    brand_cache.get_or_set('dealers', f'list:{params}', compute, timeout=60)
+    brand_cache.invalidate('dealers')          # namespace versiyonunu artır
+
+Namespace'ler versiyonludur: invalidate() eski key'leri silmez, versiyonu
+artırır; eski değerler TIMEOUT ile kendiliğinden düşer.
+
+Hit/miss sayaçları namespace bazlıdır ve process bazlı tutulur
+(bkz. get_cache_stats, api/health/cache/).
+"""
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models.signals import post_delete, post_save
+
+from .db_router import BRANDS, brand_context, peek_current_brand
+
+logger = logging.getLogger(__name__)
+
+_MISS = object()
+
+# Namespace bazlı hit/miss sayaçları (process bazlı)
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0})
+_stats_lock = threading.Lock()
+
+
+def make_brand_key(key: str, key_prefix: str, version: int) -> str:
+    """
+    CACHES KEY_FUNCTION: key'i aktif brand ile prefix'ler.
+
+    Usage:
+        CACHES['default']['KEY_FUNCTION'] = 'config.cache.make_brand_key'
+    """
+    brand = peek_current_brand() or 'global'
+    return f'{key_prefix}:{version}:{brand}:{key}'
+
+
+def brand_scope(brand: str | None):
+    """
+    Verilen brand (veya DB alias'ı) için cache brand context'i.
+    'ford_replica' gibi alias'lar brand'e indirgenir; brand verilmemişse
+    veya tanınmıyorsa mevcut context kullanılır.
+    """
+    if brand:
+        brand = brand.removesuffix('_replica')
+    if brand in BRANDS and brand != peek_current_brand():
+        return brand_context(brand)
+    return contextlib.nullcontext()
+
+
+def _count(namespace: str, field: str) -> None:
+    with _stats_lock:
+        _stats[namespace][field] += 1
+
+
+class BrandCache:
+    """
+    Namespace'li, versiyonlu ve sayaçlı cache yardımcıları.
+
+    Tüm metodlar opsiyonel brand parametresi alır; verilmezse aktif brand
+    context kullanılır (KEY_FUNCTION üzerinden).
+    """
+
+    def _version_key(self, namespace: str) -> str:
+        return f'ns:{namespace}'
+
+    def namespace_version(self, namespace: str) -> int:
+        """Namespace'in aktif versiyonu (yoksa oluşturulur)."""
+        version_key = self._version_key(namespace)
+        version = cache.get(version_key)
+        if version is None:
+            # Eviction sonrası eski versiyonlara dönülmesin diye zaman bazlı başlangıç
+            cache.add(version_key, int(time.time() * 1000), None)
+            version = cache.get(version_key)
+        return version
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f'{namespace}:v{self.namespace_version(namespace)}:{key}'
+
+    def get(self, namespace: str, key: str, default=None, brand: str | None = None):
+        with brand_scope(brand):
+            value = cache.get(self._key(namespace, key), _MISS)
+        if value is _MISS:
+            _count(namespace, 'misses')
+            return default
+        _count(namespace, 'hits')
+        return value
+
+    def set(self, namespace: str, key: str, value, timeout=DEFAULT_TIMEOUT, brand: str | None = None) -> None:
+        with brand_scope(brand):
+            cache.set(self._key(namespace, key), value, timeout)
+        _count(namespace, 'sets')
+
+    def delete(self, namespace: str, key: str, brand: str | None = None) -> None:
+        with brand_scope(brand):
+            cache.delete(self._key(namespace, key))
+
+    def get_or_set(self, namespace: str, key: str, default, timeout=DEFAULT_TIMEOUT, brand: str | None = None):
+        """
+        Cache'te varsa döndür, yoksa default'u (callable ise çağırıp) cache'le.
+
+        Args:
+            namespace: Örn. 'dealers', 'campaigns.stats'
+            key: Namespace içindeki key (query parametreleri vb.)
+            default: Değer veya değeri üreten callable
+            timeout: Saniye; verilmezse CACHES TIMEOUT
+            brand: Aktif context dışındaki bir brand için
+
+        Returns:
+            Cache'teki veya yeni üretilen değer
+        """
+        with brand_scope(brand):
+            full_key = self._key(namespace, key)
+            value = cache.get(full_key, _MISS)
+            if value is not _MISS:
+                _count(namespace, 'hits')
+                return value
+
+            _count(namespace, 'misses')
+            value = default() if callable(default) else default
+            cache.set(full_key, value, timeout)
+            _count(namespace, 'sets')
+            return value
+
+    def invalidate(self, namespace: str, brand: str | None = None) -> None:
+        """Namespace'teki tüm key'leri geçersiz kıl (versiyonu artır)."""
+        with brand_scope(brand):
+            version_key = self._version_key(namespace)
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                cache.set(version_key, int(time.time() * 1000), None)
+        _count(namespace, 'invalidations')
+        logger.debug(f"[Cache] {namespace} invalidate edildi (brand={brand or peek_current_brand()})")
+
+
+brand_cache = BrandCache()
+
+
+def model_namespace(model) -> str:
+    """Model için varsayılan namespace (örn. 'dealers.dealer')."""
+    return model._meta.label_lower
+
+
+def invalidate_on_change(*models, namespace: str | None = None) -> None:
+    """
+    Model kaydedildiğinde / silindiğinde namespace'i invalidate et.
+    Namespace verilmezse her model kendi model_namespace'ini kullanır.
+
+    Not: QuerySet.update() / bulk_create sinyal üretmez; bu yollar
+    brand_cache.invalidate'i elle çağırmalıdır.
+
+    Usage (AppConfig.ready içinde):
+        invalidate_on_change(Dealer)
+        invalidate_on_change(Campaign, CampaignRequest, namespace='campaigns.stats')
+    """
+    def _handler(sender, instance, **kwargs):
+        brand_cache.invalidate(namespace or model_namespace(sender), brand=instance._state.db)
+
+    for model in models:
+        uid = f'brand_cache:{namespace or model_namespace(model)}:{model_namespace(model)}'
+        post_save.connect(_handler, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(_handler, sender=model, weak=False, dispatch_uid=uid)
+
+
+def get_cache_stats() -> dict:
+    """
+    Namespace bazlı hit ratio (process bazlı).
+
+    Returns:
+        {
+            'pid': worker process id,
+            'backend': cache backend sınıfı,
+            'namespaces': {
+                'dealers': {'hits', 'misses', 'sets', 'invalidations', 'hit_ratio'},
+                ...
+            }
+        }
+    """
+    with _stats_lock:
+        snapshot = {ns: dict(counters) for ns, counters in _stats.items()}
+
+    for counters in snapshot.values():
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_ratio'] = round(counters['hits'] / lookups, 3) if lookups else None
+
+    return {
+        'pid': os.getpid(),
+        'backend': settings.CACHES[DEFAULT_CACHE_ALIAS]['BACKEND'].rsplit('.', 1)[-1],
+        'namespaces': snapshot,
+    }
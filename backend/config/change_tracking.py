@@ -0,0 +1,109 @@
+"""
+Change Tracking
+
+Durum geçişlerini yakalamak için save() / pre_save sinyallerinde eski satırı
+tekrar okumak (Model.objects.get(pk=...)) her güncellemeye bir sorgu ekler.
+Bunun yerine izlenen alanların değerleri kayıt veritabanından yüklenirken
+(from_db) ve her kayıttan sonra instance üzerinde saklanır:
+
+- has_changed('status'): alan yüklendiğinden / son kayıttan beri değişti mi
+- previous('status'): yüklendiğindeki / son kayıttaki değer
+
+Model:
+    class Dealer(ChangeTrackingMixin, SearchDocumentMixin, models.Model):
+        tracked_fields = ('status',)
+
+Sinyal:
+    if instance.previous('status') != 'aktif' and instance.status == 'aktif': ...
+
+Notlar:
+- Snapshot super().save() döndükten sonra yenilenir; pre_save ve post_save
+  sinyalleri kaydedilmekte olan değişikliği görür
+- ForeignKey alanlarında değer id'dir (previous('dealer') → dealer_id)
+- Yeni kayıtta (_state.adding) previous() None, has_changed() True döner
+- Yüklenirken ertelenmiş (only/defer) alanda previous() eski değeri tek
+  sorguyla okur (yalnızca kayıttan önce anlamlı); has_changed() alan
+  sonradan atandıysa True döner
+- QuerySet.update / bulk_update snapshot'ı güncellemez
+"""
+
+_SNAPSHOT_ATTR = '_tracked_snapshot'
+
+
+class ChangeTrackingMixin:
+    """Model mixin'i: tracked_fields değerlerini yüklemede ve kayıttan sonra saklar."""
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def _tracked_attnames(self, fields=None) -> dict:
+        """İzlenen alan adı → attname (fields verilirse yalnızca onlar)."""
+        attnames = {}
+        for name in self.tracked_fields:
+            field = self._meta.get_field(name)
+            if fields is None or name in fields or field.attname in fields:
+                attnames[name] = field.attname
+        return attnames
+
+    def _take_snapshot(self, fields=None) -> None:
+        snapshot = self.__dict__.setdefault(_SNAPSHOT_ATTR, {})
+        for name, attname in self._tracked_attnames(fields).items():
+            if attname in self.__dict__:
+                snapshot[name] = self.__dict__[attname]
+
+    def _snapshot(self) -> dict:
+        return self.__dict__.get(_SNAPSHOT_ATTR, {})
+
+    def previous(self, field):
+        """
+        Alanın yüklendiğindeki / son kayıttaki değeri.
+
+        Raises:
+            ValueError: Alan tracked_fields içinde değilse
+        """
+        if field not in self.tracked_fields:
+            raise ValueError(f"{type(self).__name__}.{field} izlenen bir alan değil (tracked_fields)")
+        if self._state.adding:
+            return None
+
+        snapshot = self._snapshot()
+        if field not in snapshot:
+            # Ertelenmiş alan: eski değeri bir kez oku
+            attname = self._meta.get_field(field).attname
+            row = (
+                type(self)._base_manager.using(self._state.db)
+                .filter(pk=self.pk).values_list(attname, flat=True)
+            )
+            self.__dict__.setdefault(_SNAPSHOT_ATTR, {})[field] = row.first()
+        return self._snapshot()[field]
+
+    def has_changed(self, *fields) -> bool:
+        """Verilen (boşsa tüm izlenen) alanlardan biri değişti mi."""
+        fields = fields or self.tracked_fields
+        unknown = set(fields) - set(self.tracked_fields)
+        if unknown:
+            raise ValueError(f"{type(self).__name__}: izlenmeyen alan(lar) {sorted(unknown)} (tracked_fields)")
+        if self._state.adding:
+            return True
+
+        snapshot = self._snapshot()
+        for name, attname in self._tracked_attnames().items():
+            if name not in fields:
+                continue
+            if attname not in self.__dict__:
+                continue  # Ertelenmiş ve atanmamış: değişmemiş
+            if name not in snapshot or self.__dict__[attname] != snapshot[name]:
+                return True
+        return False
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._take_snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._take_snapshot(fields)
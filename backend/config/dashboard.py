@@ -0,0 +1,135 @@
+"""
+Cross-brand Admin Dashboard
+
+Her iki brand'i yöneten super-admin'ler için kampanya, teşvik ve görsel
+istatistiklerini ford ve tofas veritabanlarında paralel hesaplar.
+
+Akış:
+1. Her brand için bir task BrandThreadPoolExecutor'a gönderilir
+2. Task kendi brand_context'ini açar (router doğru DB'ye gider)
+3. Sonuçlar brand bazlı breakdown + toplamlar olarak birleştirilir
+
+Toplam süre ≈ yavaş olan brand'in süresi (toplamı değil).
+Bir brand'in DB'sine ulaşılamazsa diğer brand'in sonuçları yine döner.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from apps.users.permissions import IsSuperAdmin
+from .db_router import BRANDS, BrandThreadPoolExecutor, brand_context
+from .status_stats import status_statistics
+
+logger = logging.getLogger(__name__)
+
+# Process bazlı, brand başına bir thread yeterli
+_executor = BrandThreadPoolExecutor(max_workers=len(BRANDS), thread_name_prefix='brand-dashboard')
+
+
+def brand_statistics() -> dict:
+    """Aktif brand context'i için kampanya / teşvik / görsel istatistikleri."""
+    from apps.campaigns.models import CampaignRequest
+    from apps.dealers.models import DealerMonthlySummary
+    from apps.dealers.summaries import summary_statistics
+    from apps.incentives.models import IncentiveRequest
+    from apps.visuals.models import VisualRequest
+
+    if settings.DEALER_SUMMARY_READS:
+        # Bayi aylık özet tablosundan: maliyet geçmişle değil bayi × ay sayısıyla büyür
+        Kind = DealerMonthlySummary.Kind
+        return {
+            'campaigns': summary_statistics(Kind.CAMPAIGN, sums={'total_budget': 'amount'}),
+            'incentives': summary_statistics(
+                Kind.INCENTIVE,
+                sums={'total_requested': 'amount', 'total_approved': 'approved_amount'},
+            ),
+            'visuals': summary_statistics(Kind.VISUAL),
+        }
+
+    return {
+        'campaigns': status_statistics(CampaignRequest.objects.all(), sums={'total_budget': 'budget'}),
+        'incentives': status_statistics(
+            IncentiveRequest.objects.all(),
+            sums={'total_requested': 'incentive_amount', 'total_approved': 'approved_amount'},
+        ),
+        'visuals': status_statistics(VisualRequest.objects.all()),
+    }
+
+
+def _run_for_brand(brand: str) -> dict:
+    """Executor task'ı: brand context'ini açar, thread'in bağlantılarını kapatır."""
+    started = time.monotonic()
+    try:
+        with brand_context(brand):
+            stats = brand_statistics()
+        return {'ok': True, 'stats': stats, 'elapsed_ms': round((time.monotonic() - started) * 1000, 1)}
+    except Exception as e:
+        logger.exception(f"[Dashboard] {brand} istatistikleri alınamadı")
+        return {'ok': False, 'error': str(e), 'elapsed_ms': round((time.monotonic() - started) * 1000, 1)}
+    finally:
+        # Worker thread'ler uzun ömürlü; bağlantıyı (pool'a) geri ver
+        connections.close_all()
+
+
+def _merge(results: dict) -> dict:
+    """Başarılı brand sonuçlarını toplar; ortalamaları toplamlardan hesaplar."""
+    totals = {}
+
+    for result in results.values():
+        if not result['ok']:
+            continue
+        for section, stats in result['stats'].items():
+            merged = totals.setdefault(section, {'by_status': {}})
+            for name, value in stats.items():
+                if name == 'by_status':
+                    for code, entry in value.items():
+                        bucket = merged['by_status'].setdefault(code, {'label': entry['label'], 'count': 0})
+                        bucket['count'] += entry['count']
+                else:
+                    merged[name] = merged.get(name, 0) + (value or 0)
+
+    campaigns = totals.get('campaigns')
+    if campaigns:
+        campaigns['avg_budget'] = (
+            campaigns['total_budget'] / campaigns['total_count'] if campaigns['total_count'] else None
+        )
+    incentives = totals.get('incentives')
+    if incentives:
+        count = incentives['total_count']
+        incentives['avg_requested'] = incentives['total_requested'] / count if count else None
+        incentives['avg_approved'] = incentives['total_approved'] / count if count else None
+
+    return totals
+
+
+def collect_cross_brand_statistics(brands=BRANDS) -> dict:
+    """
+    Brand istatistiklerini paralel topla ve birleştir.
+
+    Returns:
+        {
+            'totals': {'campaigns': {...}, 'incentives': {...}, 'visuals': {...}},
+            'brands': {'ford': {'ok', 'stats' | 'error', 'elapsed_ms'}, ...},
+            'elapsed_ms': toplam süre
+        }
+    """
+    started = time.monotonic()
+    futures = {brand: _executor.submit(_run_for_brand, brand) for brand in brands}
+    results = {brand: future.result() for brand, future in futures.items()}
+
+    return {
+        'totals': _merge(results),
+        'brands': results,
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsSuperAdmin])
+def cross_brand_dashboard(request):
+    """Super-admin: ford + tofas birleşik istatistikleri (brand bazlı breakdown ile)"""
+    return Response(collect_cross_brand_statistics())
@@ -0,0 +1,113 @@
+"""
+Per-brand Database Connection Pools
+
+settings.DATABASES'teki brand alias'ları (ford, tofas) psycopg3 pool ile
+yapılandırılır (bkz. settings._configure_connection). Bu modül:
+
+1. warm_up_pools(): Worker boot'unda pool'ları açar ve min_size kadar
+   bağlantıyı önceden kurar (ilk request'te bağlantı kurulum gecikmesi olmaz)
+2. get_pool_stats(): Brand bazlı in-use / idle / bekleme istatistikleri
+
+Not: Pool'lar process bazlıdır; her gunicorn worker'ının kendi pool'u vardır.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Pool kullanan brand veritabanları (replica'lar tanımlıysa onlar da)
+BRAND_ALIASES = ('ford', 'tofas')
+
+
+def pooled_aliases() -> tuple:
+    """Brand primary + tanımlı replica alias'ları"""
+    return tuple(
+        alias
+        for brand in BRAND_ALIASES
+        for alias in (brand, f'{brand}_replica')
+        if alias in settings.DATABASES
+    )
+
+
+def get_pool(alias: str):
+    """
+    Alias için psycopg ConnectionPool'u döndür.
+
+    Returns:
+        ConnectionPool veya None (pool kapalıysa / backend desteklemiyorsa)
+    """
+    return getattr(connections[alias], 'pool', None)
+
+
+def warm_up_pools(aliases=None) -> None:
+    """
+    Pool'ları aç ve min_size bağlantı hazır olana kadar bekle.
+
+    Veritabanına ulaşılamazsa worker boot'u engellenmez; pool ilk
+    checkout'ta bağlanmayı tekrar dener.
+    """
+    for alias in aliases or pooled_aliases():
+        pool = get_pool(alias)
+        if pool is None:
+            continue
+
+        try:
+            pool.open(wait=True, timeout=settings.DB_POOL_TIMEOUT)
+            logger.info(f"[DBPool] {alias} pool hazır (min_size={pool.min_size})")
+        except Exception as e:
+            logger.warning(f"[DBPool] {alias} pool ısıtılamadı: {e}")
+
+
+def get_pool_stats(aliases=None) -> dict:
+    """
+    Brand bazlı pool istatistikleri.
+
+    Returns:
+        {
+            'pid': worker process id,
+            'pools': {
+                'ford': {'enabled', 'min_size', 'max_size', 'size', 'in_use',
+                         'idle', 'waiting', 'requests', 'requests_queued',
+                         'wait_ms_total', 'wait_ms_avg', 'connection_errors',
+                         'connections_lost'},
+                ...
+            }
+        }
+    """
+    pools = {}
+
+    for alias in aliases or pooled_aliases():
+        pool = get_pool(alias)
+        if pool is None:
+            pools[alias] = {'enabled': False}
+            continue
+
+        stats = pool.get_stats()
+        size = stats.get('pool_size', 0)
+        idle = stats.get('pool_available', 0)
+        requests_num = stats.get('requests_num', 0)
+        wait_ms = stats.get('requests_wait_ms', 0)
+
+        pools[alias] = {
+            'enabled': True,
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            'size': size,
+            'in_use': size - idle,
+            'idle': idle,
+            'waiting': stats.get('requests_waiting', 0),
+            'requests': requests_num,
+            'requests_queued': stats.get('requests_queued', 0),
+            'wait_ms_total': wait_ms,
+            'wait_ms_avg': round(wait_ms / requests_num, 2) if requests_num else 0,
+            'connection_errors': stats.get('connections_errors', 0),
+            'connections_lost': stats.get('connections_lost', 0),
+        }
+
+    return {
+        'pid': os.getpid(),
+        'pools': pools,
+    }
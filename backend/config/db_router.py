@@ -2,35 +2,60 @@
 Multi-tenant Database Router
 
 Bu modül, brand bazlı veritabanı yönlendirmesi için gerekli
-thread-local storage ve database router içerir.
+brand context (contextvars) ve database router içerir.
 
 Akış:
-1. Request gelir → BrandMiddleware Host header'dan brand belirler
-2. Brand, thread-local storage'a kaydedilir
-3. DB Router, her query için thread-local'dan brand okur
+1. Request gelir → BrandMiddleware JWT token'dan brand belirler
+2. Brand, context variable'a kaydedilir
+3. DB Router, her query için context'ten brand okur
 4. Doğru veritabanına yönlendirir (ford veya tofas)
+
+contextvars kullanıldığı için brand context:
+- ASGI event loop'unda her task'a ayrı tutulur
+- sync_to_async / async_to_sync çağrılarına kendiliğinden taşınır
+- ThreadPoolExecutor'a taşınmaz → BrandThreadPoolExecutor kullanın
+
+Kullanım:
+    with brand_context('ford'):
+        Dealer.objects.count()
+
+    @brand_context('tofas')
+    def nightly_job(): ...
+
+    class Command(BaseCommand):
+        @brand_command
+        def handle(self, *args, **options): ...  # --brand parametresinden
 """
-import threading
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ContextDecorator
 from typing import Optional
 
-# Thread-local storage for brand context
-# Her request/thread için ayrı brand değeri tutulur
-_brand_context = threading.local()
+# Brand context - her request/task için ayrı brand değeri tutulur
+_current_brand: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    'current_brand', default=None
+)
+
+BRANDS = ('ford', 'tofas')
 
 
-def set_current_brand(brand: str) -> None:
+def set_current_brand(brand: str) -> contextvars.Token:
     """
-    Set the current brand for this request/thread.
+    Set the current brand for this request/context.
     
     Args:
         brand: 'ford' veya 'tofas'
+    
+    Returns:
+        Token (reset_current_brand ile önceki değere dönmek için)
     """
-    _brand_context.brand = brand
+    return _current_brand.set(brand)
 
 
 def get_current_brand() -> str:
     """
-    Get the current brand for this request/thread.
+    Get the current brand for this request/context.
     
     Returns:
         Current brand
@@ -38,23 +63,92 @@ def get_current_brand() -> str:
     Raises:
         RuntimeError: Brand seçilmemişse hata fırlatır
     """
-    brand = getattr(_brand_context, 'brand', None)
+    brand = _current_brand.get()
     if brand is None:
         raise RuntimeError(
             "Brand context not set! "
-            "Use set_current_brand('ford') or set_current_brand('tofas') before database operations. "
+            "Use brand_context('ford') or brand_context('tofas') before database operations. "
             "For management commands, add --brand parameter."
         )
     return brand
 
 
+def peek_current_brand() -> Optional[str]:
+    """Brand context'i hata fırlatmadan oku (set edilmemişse None)."""
+    return _current_brand.get()
+
+
+def reset_current_brand(token: contextvars.Token) -> None:
+    """set_current_brand'den dönen token ile önceki brand'e dön."""
+    _current_brand.reset(token)
+
+
 def clear_current_brand() -> None:
     """
     Clear the brand context after request is complete.
-    Memory leak önleme için request sonrası çağrılmalı.
+    Sonraki request'e brand sızmaması için request sonrası çağrılmalı.
     """
-    if hasattr(_brand_context, 'brand'):
-        del _brand_context.brand
+    _current_brand.set(None)
+
+
+class brand_context(ContextDecorator):
+    """
+    Brand context'i bir blok veya fonksiyon süresince set eder,
+    çıkışta önceki değere döner (iç içe kullanılabilir).
+    
+    Usage:
+        with brand_context('ford'):
+            ...
+        
+        @brand_context('tofas')
+        def sync_job(): ...
+    """
+    
+    def __init__(self, brand: str):
+        if brand not in BRANDS:
+            raise ValueError(f"Geçersiz brand: {brand!r}. Seçenekler: {', '.join(BRANDS)}")
+        self.brand = brand
+        self._token = None
+    
+    def _recreate_cm(self):
+        # Decorator olarak her çağrıda yeni instance (thread/reentrancy güvenli)
+        return type(self)(self.brand)
+    
+    def __enter__(self):
+        self._token = set_current_brand(self.brand)
+        return self.brand
+    
+    def __exit__(self, *exc):
+        reset_current_brand(self._token)
+        return False
+
+
+def brand_command(handle):
+    """
+    Management command handle() decorator'ü.
+    --brand parametresindeki brand'i handle() süresince set eder.
+    
+    Usage:
+        @brand_command
+        def handle(self, *args, **options): ...
+    """
+    @functools.wraps(handle)
+    def wrapper(self, *args, **options):
+        with brand_context(options['brand']):
+            return handle(self, *args, **options)
+    return wrapper
+
+
+class BrandThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    submit() anındaki context'i (brand dahil) worker thread'e taşıyan
+    ThreadPoolExecutor. Standart executor context kopyalamaz; worker
+    thread'lerde brand set edilmemiş olur.
+    """
+    
+    def submit(self, fn, /, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
 
 
 class BrandDatabaseRouter:
@@ -68,18 +162,25 @@ class BrandDatabaseRouter:
     Databases:
         - 'ford': Ford veritabanı
         - 'tofas': Tofaş veritabanı (default)
+        - 'ford_replica' / 'tofas_replica': Opsiyonel read replica'lar
+          (bkz. config.replicas)
     """
     
     def db_for_read(self, model, **hints) -> str:
         """
         Return the database alias to use for read operations.
+        Safe-method request'lerde sağlıklı replica varsa replica döner.
         """
-        return get_current_brand()
+        from .replicas import choose_read_alias
+        return choose_read_alias(get_current_brand())
     
     def db_for_write(self, model, **hints) -> str:
         """
         Return the database alias to use for write operations.
+        Write sonrası okumalar primary'ye sabitlenir (read-your-writes).
         """
+        from .replicas import pin_to_primary
+        pin_to_primary()
         return get_current_brand()
     
     def allow_relation(self, obj1, obj2, **hints) -> bool:
@@ -92,8 +193,8 @@ class BrandDatabaseRouter:
     
     def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints) -> bool:
         """
-        Allow migrations on all databases.
-        Her iki DB'de de aynı şema olmalı.
+        Allow migrations on all primary databases.
+        Her iki DB'de de aynı şema olmalı; replica'lar replikasyonla güncellenir.
         """
-        return True
-
+        from .replicas import is_replica_alias
+        return not is_replica_alias(db)
@@ -0,0 +1,369 @@
+"""
+Index Advisor
+
+ViewSet'lerin filtre / sıralama tanımlarından ve canlı sorgu istatistiklerinden
+(pg_stat_statements) eksik index önerileri üretir.
+
+Akış (brand başına):
+1. Aday index'ler:
+   - filterset_fields / FilterSet exact filtreleri × varsayılan sıralama
+     → (dealer_id, created_at), (status, created_at) ...
+   - Varsayılan sıralama ve ordering_fields → (created_at), (budget) ...
+   - pg_stat_statements'ta sık / yavaş sorguların WHERE = ve ORDER BY kolonları
+2. Brand DB'sinde zaten var olan index'lerin ön eki (prefix) kapsıyorsa elenir
+3. EXPLAIN maliyeti: temsilî sorgu (filtre + sıralama + LIMIT) planlanır;
+   hypopg eklentisi varsa hipotetik index ile tekrar planlanıp kazanç hesaplanır
+4. İstenirse öneriler için review'a açık migration dosyaları yazılır
+
+search_fields aramaları config.search (trigram index) ile karşılanır, burada aday üretilmez.
+"""
+import json
+import logging
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models
+from django.db.migrations import Migration
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.operations import AddIndex
+from django.db.migrations.writer import MigrationWriter
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.viewsets import GenericViewSet
+
+logger = logging.getLogger(__name__)
+
+# Migration'a varsayılan olarak giren öncelik
+HIGH, LOW = 'high', 'low'
+
+# FilterSet'te index'e aday lookup'lar (icontains / search index'ten yararlanmaz)
+EQUALITY_LOOKUPS = {'exact', 'in', 'isnull'}
+
+
+class Candidate:
+    """
+    Önerilen index.
+
+    Args:
+        model: Django modeli
+        fields: Model alan adları (index sırasıyla)
+        priority: HIGH (filtre + sıralama) / LOW (tek başına sıralama)
+    """
+
+    def __init__(self, model, fields, priority):
+        self.model = model
+        self.fields = tuple(fields)
+        self.priority = priority
+        self.reasons = set()
+        self.calls = 0
+        self.total_ms = 0.0
+        self.cost_before = None
+        self.cost_after = None
+
+    @property
+    def table(self) -> str:
+        return self.model._meta.db_table
+
+    @property
+    def columns(self) -> tuple:
+        return tuple(self.model._meta.get_field(field).column for field in self.fields)
+
+    @property
+    def benefit_pct(self) -> float | None:
+        if not self.cost_before or self.cost_after is None:
+            return None
+        return round((self.cost_before - self.cost_after) / self.cost_before * 100, 1)
+
+    def as_index(self) -> models.Index:
+        index = models.Index(fields=list(self.fields))
+        index.set_name_with_model(self.model)
+        return index
+
+    def as_dict(self) -> dict:
+        return {
+            'table': self.table,
+            'columns': list(self.columns),
+            'priority': self.priority,
+            'reasons': sorted(self.reasons),
+            'statement_calls': self.calls,
+            'statement_total_ms': round(self.total_ms, 1),
+            'cost_before': self.cost_before,
+            'cost_after': self.cost_after,
+            'benefit_pct': self.benefit_pct,
+        }
+
+
+def collect_viewsets(patterns=None) -> list:
+    """URLconf'taki queryset'li GenericViewSet sınıfları (tekrarsız)."""
+    found = []
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            found.extend(cls for cls in collect_viewsets(pattern.url_patterns) if cls not in found)
+        elif isinstance(pattern, URLPattern):
+            cls = getattr(pattern.callback, 'cls', None)
+            if cls and issubclass(cls, GenericViewSet) and cls.queryset is not None and cls not in found:
+                found.append(cls)
+    return found
+
+
+def _local_field(model, name):
+    """Index'lenebilir yerel alan (ilişki üzerinden lookup'lar ve pk hariç)."""
+    if not name or '__' in name:
+        return None
+    try:
+        field = model._meta.get_field(name.lstrip('-'))
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.primary_key or field.many_to_many:
+        return None
+    return field
+
+
+def _filter_fields(viewset, model) -> list:
+    """filterset_fields + filterset_class'ın eşitlik filtreleri."""
+    names = list(getattr(viewset, 'filterset_fields', None) or [])
+    filterset_class = getattr(viewset, 'filterset_class', None)
+    if filterset_class:
+        names += [
+            f.field_name for f in filterset_class.base_filters.values()
+            if f.lookup_expr in EQUALITY_LOOKUPS
+        ]
+    # 'brand_id' gibi attname'ler alan adına çevrilir
+    attnames = {field.attname: field.name for field in model._meta.concrete_fields}
+    fields = []
+    for name in names:
+        field = _local_field(model, attnames.get(name, name))
+        if field and field.name not in fields:
+            fields.append(field.name)
+    return fields
+
+
+def declared_candidates(viewsets) -> dict:
+    """ViewSet tanımlarından aday index'ler: {(table, fields): Candidate}"""
+    candidates = {}
+
+    def add(model, fields, priority, reason):
+        key = (model._meta.db_table, tuple(fields))
+        candidate = candidates.setdefault(key, Candidate(model, fields, priority))
+        if priority == HIGH:
+            candidate.priority = HIGH
+        candidate.reasons.add(reason)
+
+    for viewset in viewsets:
+        model = viewset.queryset.model
+        name = viewset.__name__
+        ordering = viewset.ordering or model._meta.ordering or []
+        ordering = [ordering] if isinstance(ordering, str) else list(ordering)
+        default_order = _local_field(model, ordering[0]) if ordering else None
+
+        for field_name in _filter_fields(viewset, model):
+            if default_order and default_order.name != field_name:
+                add(model, [field_name, default_order.name], HIGH, f'{name}: filter {field_name} + ordering')
+            else:
+                add(model, [field_name], HIGH, f'{name}: filter {field_name}')
+
+        if default_order:
+            add(model, [default_order.name], HIGH, f'{name}: default ordering')
+
+        for order_name in getattr(viewset, 'ordering_fields', None) or []:
+            if order_name == '__all__':
+                continue
+            field = _local_field(model, order_name)
+            if field:
+                add(model, [field.name], LOW, f'{name}: ordering_fields')
+
+    return candidates
+
+
+def existing_index_columns(alias: str, table: str) -> list:
+    """Brand DB'sindeki index / pk / unique kolon listeleri."""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        tuple(info['columns'])
+        for info in constraints.values()
+        if info['columns'] and (info['index'] or info['primary_key'] or info['unique'])
+    ]
+
+
+def is_covered(candidate: Candidate, existing: list) -> bool:
+    """Mevcut bir index adayın kolonlarıyla başlıyorsa (prefix) aday gereksiz."""
+    columns = candidate.columns
+    return any(index[:len(columns)] == columns for index in existing)
+
+
+def statement_stats(alias: str, limit: int = 200) -> list | None:
+    """
+    pg_stat_statements'tan bu DB'nin en çok süre harcayan sorguları.
+    Eklenti yoksa / okunamıyorsa None.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT query, calls, total_exec_time
+                FROM pg_stat_statements
+                WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+                ORDER BY total_exec_time DESC
+                LIMIT %s
+                """,
+                [limit],
+            )
+            return [{'query': q, 'calls': calls, 'total_ms': total} for q, calls, total in cursor.fetchall()]
+    except Exception as e:
+        logger.warning(f"[IndexAdvisor] {alias}: pg_stat_statements okunamadı ({e})")
+        return None
+
+
+def _statement_columns(query: str, table: str) -> tuple[list, list]:
+    """Sorgu metninden bu tablonun WHERE (=, IN) ve ORDER BY kolonları."""
+    quoted = re.escape(f'"{table}"')
+    where = re.findall(rf'{quoted}\."(\w+)"\s*(?:=|IN\b)', query, re.IGNORECASE)
+    order = re.findall(rf'ORDER BY\s+{quoted}\."(\w+)"', query, re.IGNORECASE)
+    return list(dict.fromkeys(where)), order
+
+
+def apply_statement_stats(candidates: dict, models_by_table: dict, statements: list) -> None:
+    """
+    Canlı sorgularla adayları ağırlıklandır ve sık WHERE / ORDER BY
+    kombinasyonlarından yeni aday üret.
+    """
+    for statement in statements:
+        for table, model in models_by_table.items():
+            if f'"{table}"' not in statement['query']:
+                continue
+            where, order = _statement_columns(statement['query'], table)
+            by_column = {field.column: field.name for field in model._meta.concrete_fields}
+
+            fields = [by_column[c] for c in where if c in by_column and c != model._meta.pk.column]
+            if order and order[0] in by_column and by_column[order[0]] not in fields:
+                fields.append(by_column[order[0]])
+            if fields:
+                key = (table, tuple(fields))
+                candidate = candidates.setdefault(key, Candidate(model, fields, HIGH))
+                candidate.reasons.add('pg_stat_statements')
+
+            for candidate in candidates.values():
+                if candidate.table == table and set(candidate.columns) <= set(where) | set(order):
+                    candidate.calls += statement['calls']
+                    candidate.total_ms += statement['total_ms']
+
+
+def _plan_cost(cursor, sql: str, params) -> float:
+    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Total Cost']
+
+
+def representative_query(candidate: Candidate, alias: str):
+    """Adayın hizmet ettiği sorgu: ön kolonlarda örnek değerle eşitlik, son kolonda sıralama, LIMIT 20."""
+    manager = candidate.model._base_manager.using(alias)
+    *filters, order = candidate.fields
+    sample = manager.exclude(**{f'{f}__isnull': True for f in filters}).values(*filters).first() if filters else {}
+    if filters and not sample:
+        return None
+    queryset = manager.filter(**sample).order_by(f'-{order}')[:20]
+    return queryset.query.sql_with_params()
+
+
+def estimate_benefit(candidate: Candidate, alias: str, hypopg: bool) -> None:
+    """EXPLAIN maliyeti; hypopg varsa hipotetik index ile sonrası."""
+    query = representative_query(candidate, alias)
+    if query is None:
+        return
+    sql, params = query
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        candidate.cost_before = _plan_cost(cursor, sql, params)
+        if hypopg:
+            columns = ', '.join(connection.ops.quote_name(c) for c in candidate.columns)
+            cursor.execute(
+                'SELECT * FROM hypopg_create_index(%s)',
+                [f'CREATE INDEX ON {connection.ops.quote_name(candidate.table)} ({columns})'],
+            )
+            try:
+                candidate.cost_after = _plan_cost(cursor, sql, params)
+            finally:
+                cursor.execute('SELECT hypopg_reset()')
+
+
+def _has_extension(alias: str, name: str) -> bool:
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_extension WHERE extname = %s', [name])
+        return cursor.fetchone() is not None
+
+
+def advise(alias: str, viewsets=None) -> dict:
+    """
+    Tek brand DB'si için öneriler.
+
+    Returns:
+        {'candidates': [Candidate, ...] (kapsanmayanlar, kazanca göre sıralı),
+         'covered': kapsanan aday sayısı, 'pg_stat_statements': bool, 'hypopg': bool}
+    """
+    viewsets = viewsets if viewsets is not None else collect_viewsets()
+    candidates = declared_candidates(viewsets)
+    models_by_table = {vs.queryset.model._meta.db_table: vs.queryset.model for vs in viewsets}
+
+    statements = statement_stats(alias)
+    if statements:
+        apply_statement_stats(candidates, models_by_table, statements)
+
+    existing = {table: existing_index_columns(alias, table) for table in models_by_table}
+    missing = [c for c in candidates.values() if not is_covered(c, existing[c.table])]
+
+    postgres = connections[alias].vendor == 'postgresql'
+    hypopg = postgres and _has_extension(alias, 'hypopg')
+    if postgres:
+        for candidate in missing:
+            try:
+                estimate_benefit(candidate, alias, hypopg)
+            except Exception as e:
+                logger.warning(f"[IndexAdvisor] {alias} {candidate.table}{candidate.columns}: EXPLAIN başarısız ({e})")
+
+    missing.sort(key=lambda c: (
+        c.priority != HIGH,
+        -(c.benefit_pct or 0),
+        -c.total_ms,
+        -(c.cost_before or 0),
+    ))
+    return {
+        'candidates': missing,
+        'covered': len(candidates) - len(missing),
+        'pg_stat_statements': statements is not None,
+        'hypopg': hypopg,
+    }
+
+
+def write_migrations(candidates, name: str = 'advised_indexes') -> list:
+    """
+    Öneriler için app başına AddIndex migration'ı yaz (review için).
+    Model Meta.indexes'e de eklenmeli; aksi halde makemigrations index'i geri siler.
+
+    Returns:
+        Yazılan dosya yolları
+    """
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    by_app = {}
+    for candidate in candidates:
+        by_app.setdefault(candidate.model._meta.app_label, []).append(candidate)
+
+    paths = []
+    for app_label, items in sorted(by_app.items()):
+        leaf = loader.graph.leaf_nodes(app_label)[0][1]
+        number = int(leaf.split('_', 1)[0]) + 1
+        migration = Migration(f'{number:04d}_{name}', app_label)
+        migration.dependencies = [(app_label, leaf)]
+        migration.operations = [
+            AddIndex(model_name=c.model._meta.model_name, index=c.as_index()) for c in items
+        ]
+        writer = MigrationWriter(migration)
+        with open(writer.path, 'w', encoding='utf-8') as f:
+            f.write(writer.as_string())
+        paths.append(writer.path)
+    return paths
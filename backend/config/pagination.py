@@ -1,26 +1,124 @@
-from rest_framework.pagination import PageNumberPagination
+"""
+Pagination
 
+Varsayılan: sayfa numaralı (?page=, ?page_size=), kesin COUNT(*) ile.
+Büyük tablolar için istek bazlı (opt-in) iki mod:
 
-class CustomPageNumberPagination(PageNumberPagination):
+- ?count=estimated: COUNT(*) yerine tahmini toplam. Filtresiz listede
+  Postgres istatistiği (pg_class.reltuples), aksi halde PAGINATION_COUNT_CAP
+  ile sınırlı sayım. Tahmin aşılırsa son sayfalar 404 dönebilir.
+- ?cursor=: Keyset (cursor) pagination; OFFSET yok, derin sayfalar da sabit
+  maliyetli. İlk sayfa için boş cursor (?cursor=), sonraki sayfalar için
+  yanıttaki next / previous linkleri. Mevcut ?ordering= alanlarıyla çalışır
+  (ilişki alanları hariç, örn. dealer__dealer_name).
+
+Yanıt her modda react-admin dataProvider.getList uyumlu: results + count
+(tahmini modlarda ek olarak count_estimated: true).
+"""
+from django.conf import settings
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset) -> int:
     """
-    Custom pagination class that allows client to set page_size
-    via query parameter.
+    COUNT(*) yerine ucuz toplam.
+
+    Filtresiz ve büyük tabloda Postgres planner istatistiği, diğer
+    durumlarda PAGINATION_COUNT_CAP ile sınırlı sayım
+    (SELECT COUNT(*) FROM (... LIMIT cap)).
+    """
+    cap = settings.PAGINATION_COUNT_CAP
+    connection = connections[queryset.db]
+
+    if not queryset.query.where and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # ANALYZE görmemiş tabloda reltuples -1; küçük tabloda kesin sayım zaten ucuz
+        if row and row[0] is not None and row[0] >= cap:
+            return row[0]
+
+    return queryset.order_by()[:cap].count()
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """Toplamı estimate_count ile hesaplayan Django paginator'ı."""
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    ?ordering= ile uyumlu cursor pagination.
+    Sıralama view'ın OrderingFilter'ından gelir; eşit değerlerde sabit sıra
+    için sona pk eklenir.
     """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
 
+    def get_ordering(self, request, queryset, view):
+        # OrderingFilter sıralama vermezse queryset / model sıralaması
+        self.ordering = tuple(queryset.query.order_by or queryset.model._meta.ordering or ('-pk',))
+        ordering = list(super().get_ordering(request, queryset, view))
+
+        if '__' in ordering[0]:
+            raise ValidationError({'ordering': 'Cursor pagination ilişki alanına göre sıralamayı desteklemez.'})
+
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering.append('-pk' if ordering[0].startswith('-') else 'pk')
+        return tuple(ordering)
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     """
     Custom pagination class that allows client to set page_size
     via query parameter.
+    Opt-in: ?count=estimated (tahmini toplam), ?cursor= (keyset pagination).
     """
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    cursor_paginator = None
+    estimated = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated = request.query_params.get(self.count_query_param) == 'estimated'
 
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = KeysetCursorPagination()
+            self.estimated = True
+            self.estimated_count = estimate_count(queryset)
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
 
+        if self.estimated:
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
 
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return Response({
+                'count': self.estimated_count,
+                'count_estimated': True,
+                'next': self.cursor_paginator.get_next_link(),
+                'previous': self.cursor_paginator.get_previous_link(),
+                'results': data,
+            })
 
+        response = super().get_paginated_response(data)
+        if self.estimated:
+            response.data['count_estimated'] = True
+        return response
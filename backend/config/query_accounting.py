@@ -0,0 +1,221 @@
+"""
+Per-request Query Accounting
+
+Her request için SQL sorgu sayısı ve süresi DB alias bazlı (ford, tofas,
+ford_replica...) tutulur:
+
+1. Tüm bağlantılara execute wrapper eklenir (connection_created sinyali ile
+   her thread'de bağlantı açıldığında; açık bağlantılara request başında)
+2. Wrapper sorguları request'in QueryCollector'üne yazar (contextvar;
+   BrandThreadPoolExecutor task'larındaki sorgular da request'e sayılır)
+3. Response'a Server-Timing header'ı eklenir (tarayıcı devtools'ta görünür);
+   alias bazlı DB süreleri dışarı sızmasın diye yalnızca QUERY_SERVER_TIMING
+   açıkken (varsayılan: DEBUG) veya admin kullanıcılara
+4. QUERY_BUDGET aşılırsa veya aynı SQL şekli QUERY_N_PLUS_ONE_THRESHOLD
+   kez tekrarlanırsa view adı ve action ile birlikte loglanır
+
+Usage:
+    settings.py MIDDLEWARE'e (BrandMiddleware'den önce) ekle:
+    'config.query_accounting.QueryAccountingMiddleware',
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Aktif request'in collector'ü (request dışında None → wrapper hiçbir şey yapmaz)
+_collector: contextvars.ContextVar = contextvars.ContextVar('query_collector', default=None)
+
+# SQL şekli: literal'ler ve IN listeleri normalize edilir
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+_NUMBER_RE = re.compile(r'\b\d+\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+
+def sql_shape(sql: str) -> str:
+    """Parametreleri farklı ama yapısı aynı sorguları aynı şekle indirger."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _NUMBER_RE.sub('?', sql)
+
+
+class QueryCollector:
+    """Bir request'in alias bazlı sorgu sayısı, süresi ve SQL şekilleri."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = defaultdict(int)
+        self.durations = defaultdict(float)
+        self.shapes = Counter()
+
+    def record(self, alias: str, sql: str, duration: float) -> None:
+        shape = sql_shape(sql)
+        with self._lock:
+            self.counts[alias] += 1
+            self.durations[alias] += duration
+            self.shapes[shape] += 1
+
+    @property
+    def total_count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def total_duration(self) -> float:
+        return sum(self.durations.values())
+
+    def repeated_shapes(self, threshold: int) -> list:
+        """threshold ve üzeri tekrarlanan SQL şekilleri (olası N+1)."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+def _accounting_wrapper(alias: str):
+    def wrapper(execute, sql, params, many, context):
+        collector = _collector.get()
+        if collector is None:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            collector.record(alias, sql, time.perf_counter() - started)
+
+    wrapper.query_accounting = True
+    return wrapper
+
+
+def _ensure_wrapper(connection) -> None:
+    """Bağlantı nesnesine (thread başına bir kez) accounting wrapper'ı ekle."""
+    if not any(getattr(w, 'query_accounting', False) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(_accounting_wrapper(connection.alias))
+
+
+@receiver(connection_created)
+def install_accounting_wrapper(sender, connection, **kwargs):
+    _ensure_wrapper(connection)
+
+
+def _view_label(request: HttpRequest) -> tuple[str, str]:
+    """Loglar için (view adı, DRF action) döndür."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return request.path, '-'
+
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return match.view_name or match._func_path, action
+
+
+class QueryAccountingMiddleware:
+    """
+    Request başına sorgu sayısı / süresi, Server-Timing header'ı ve
+    sorgu bütçesi / N+1 uyarıları.
+
+    Settings:
+        QUERY_ACCOUNTING_ENABLED: Kapalıysa middleware hiçbir şey yapmaz
+        QUERY_BUDGET: Request başına beklenen maksimum sorgu sayısı
+        QUERY_N_PLUS_ONE_THRESHOLD: Aynı SQL şeklinin tekrar eşiği
+        QUERY_SERVER_TIMING: Server-Timing header'ı herkese (kapalıysa sadece admin'e)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if not settings.QUERY_ACCOUNTING_ENABLED:
+            return self.get_response(request)
+
+        # Middleware yüklenmeden önce açılmış bağlantılar için
+        for connection in connections.all(initialized_only=True):
+            _ensure_wrapper(connection)
+
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+
+        self._finish(request, response, collector, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.QUERY_ACCOUNTING_ENABLED:
+            return await self.get_response(request)
+
+        # sync_to_async context'i taşır; view thread'indeki sorgular da sayılır
+        collector = QueryCollector()
+        token = _collector.set(collector)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _collector.reset(token)
+
+        self._finish(request, response, collector, time.perf_counter() - started)
+        return response
+
+    def _finish(self, request: HttpRequest, response: HttpResponse, collector: QueryCollector, elapsed: float) -> None:
+        if self._show_timing(request):
+            response['Server-Timing'] = self._server_timing(collector, elapsed)
+
+        total = collector.total_count
+        if not total:
+            return
+
+        view_name, action = _view_label(request)
+        db_ms = collector.total_duration * 1000
+        per_alias = ', '.join(f'{alias}={count}' for alias, count in sorted(collector.counts.items()))
+
+        if total > settings.QUERY_BUDGET:
+            logger.warning(
+                f"[QueryBudget] {request.method} {request.path} view={view_name} action={action} "
+                f"queries={total} (budget {settings.QUERY_BUDGET}) db={db_ms:.1f}ms [{per_alias}]"
+            )
+
+        for shape, count in collector.repeated_shapes(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                f"[N+1] {request.method} {request.path} view={view_name} action={action} "
+                f"{count}x {shape[:300]}"
+            )
+
+    @staticmethod
+    def _show_timing(request: HttpRequest) -> bool:
+        if settings.QUERY_SERVER_TIMING:
+            return True
+        # DRF kimlik doğrulaması request.user'ı alttaki HttpRequest'e de yazar
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_authenticated and getattr(user, 'is_admin', False))
+
+    @staticmethod
+    def _server_timing(collector: QueryCollector, elapsed: float) -> str:
+        metrics = [
+            f'db;dur={collector.total_duration * 1000:.1f};desc="{collector.total_count} queries"'
+        ]
+        for alias in sorted(collector.counts):
+            metrics.append(
+                f'db-{alias};dur={collector.durations[alias] * 1000:.1f};desc="{collector.counts[alias]} queries"'
+            )
+        metrics.append(f'total;dur={elapsed * 1000:.1f}')
+        return ', '.join(metrics)
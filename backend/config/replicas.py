@@ -0,0 +1,195 @@
+"""
+Read Replica Routing
+
+BrandDatabaseRouter.db_for_read, okuma sorgularını aşağıdaki koşullar
+sağlandığında '<brand>_replica' alias'ına gönderir:
+
+1. settings.DATABASES'te replica tanımlı
+2. Request safe-method (GET/HEAD/OPTIONS) veya view @replica_reads ile
+   işaretli (ör. check_budget POST'u sadece okuma yapar)
+3. Primary'ye yapışma yok: bu request'te write yapılmadı ve kullanıcı son
+   REPLICA_STICKY_SECONDS içinde write yapmadı (read-your-writes)
+4. Replica sağlıklı ve lag REPLICA_MAX_LAG_SECONDS altında
+
+Management command'ler ve background işler varsayılan olarak primary okur.
+
+Not: Kullanıcı bazlı stickiness cache üzerinden tutulur; worker'lar arası
+çalışması için paylaşımlı cache backend gerekir.
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Bu context'te okumalar replica'ya gidebilir mi?
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+# Primary'ye yapışma (bu request'te write yapıldı / sticky kullanıcı)
+_primary_pinned = contextvars.ContextVar('primary_pinned', default=False)
+# Bu request'te write yapıldı mı? (request sonunda stickiness için)
+_primary_written = contextvars.ContextVar('primary_written', default=False)
+
+# Replica sağlık durumu (process bazlı): alias → (checked_at, healthy)
+_health = {}
+_health_lock = threading.Lock()
+
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_alias(brand: str) -> str | None:
+    """Brand için tanımlı replica alias'ı (yoksa None)."""
+    alias = f'{brand}_replica'
+    return alias if alias in settings.DATABASES else None
+
+
+def is_replica_alias(alias: str) -> bool:
+    return alias.endswith('_replica')
+
+
+def _sticky_cache_key(user_id) -> str:
+    # Brand prefix'i cache KEY_FUNCTION ekler (config.cache.make_brand_key)
+    return f'replica:sticky:{user_id}'
+
+
+def begin_request(request, brand: str | None) -> None:
+    """
+    BrandMiddleware tarafından request başında çağrılır.
+    Safe-method request'lerde replica okumalarını açar.
+    """
+    _primary_pinned.set(False)
+    _primary_written.set(False)
+    _replica_reads.set(False)
+
+    if not brand or not replica_alias(brand):
+        return
+
+    user_id = _request_user_id(request)
+    if user_id is not None and cache.get(_sticky_cache_key(user_id)):
+        # Kullanıcı yakın zamanda write yaptı → primary'den oku
+        _primary_pinned.set(True)
+
+    _replica_reads.set(request.method in SAFE_METHODS)
+
+
+def end_request(request, brand: str | None) -> None:
+    """
+    Request sonunda çağrılır. Request write yaptıysa kullanıcıyı
+    REPLICA_STICKY_SECONDS boyunca primary'ye yapıştırır.
+    """
+    wrote = _primary_written.get()
+    _primary_pinned.set(False)
+    _primary_written.set(False)
+    _replica_reads.set(False)
+
+    if not wrote or not brand or not replica_alias(brand):
+        return
+
+    user_id = _request_user_id(request)
+    if user_id is not None:
+        cache.set(_sticky_cache_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def _request_user_id(request):
+    validated_token = getattr(request, 'jwt_validated_token', None)
+    if validated_token is None:
+        return None
+    return validated_token.get('user_id')
+
+
+def pin_to_primary() -> None:
+    """Bu context'teki sonraki okumaları primary'ye sabitle (write sonrası)."""
+    _primary_pinned.set(True)
+    _primary_written.set(True)
+
+
+def replica_reads(view_method):
+    """
+    Safe-method olmayan ama sadece okuma yapan view'ları replica'ya açar.
+    Stickiness kuralları yine geçerlidir.
+
+    Usage:
+        @action(detail=False, methods=['post'])
+        @replica_reads
+        def check_budget(self, request): ...
+    """
+    @functools.wraps(view_method)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return view_method(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+def choose_read_alias(brand: str) -> str:
+    """
+    Okuma için alias seç: uygunsa replica, değilse primary (brand).
+    """
+    if not _replica_reads.get() or _primary_pinned.get():
+        return brand
+
+    alias = replica_alias(brand)
+    if alias is None:
+        return brand
+
+    # Primary'de açık transaction varsa aynı bağlantıdan oku
+    if connections[brand].in_atomic_block:
+        return brand
+
+    if not replica_is_healthy(alias):
+        return brand
+
+    return alias
+
+
+def replica_is_healthy(alias: str) -> bool:
+    """
+    Replica erişilebilir ve lag eşiğin altında mı?
+    Sonuç REPLICA_HEALTH_CHECK_INTERVAL saniye boyunca process içinde cache'lenir.
+    """
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return checked[1]
+
+    with _health_lock:
+        checked = _health.get(alias)
+        if checked and now - checked[0] < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+            return checked[1]
+
+        healthy = False
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(REPLICA_LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+            healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                logger.warning(f"[Replica] {alias} lag {lag:.1f}s, primary'ye düşülüyor")
+        except Exception as e:
+            logger.warning(f"[Replica] {alias} erişilemiyor, primary'ye düşülüyor: {e}")
+
+        _health[alias] = (time.monotonic(), healthy)
+        return healthy
+
+
+def get_replica_status() -> dict:
+    """Process bazlı replica sağlık durumu (introspection)."""
+    return {
+        alias: {'healthy': healthy, 'checked_ago': round(time.monotonic() - checked_at, 1)}
+        for alias, (checked_at, healthy) in _health.items()
+    }
@@ -0,0 +1,195 @@
+"""
+Search Documents
+
+Liste aramaları (SearchFilter) çok kolonda UPPER(...) LIKE '%x%' ile tablo
+taraması yapar ve Türkçe İ/ı harflerini yanlış eşler. Bunun yerine her
+satırda normalize edilmiş tek bir arama metni (search_document) tutulur:
+
+- Küçük harf, Türkçe harfler ve aksanlar katlanır (İ/I/ı/i → i, ş → s, ...)
+- Postgres'te GIN trigram index'i (gin_trgm_ops) ile LIKE '%x%' index'ten
+  karşılanır; sonuçlar word_similarity ile sıralanır
+- İlişkili alanlar (örn. dealer__dealer_name) kaydın kendi metnine
+  kopyalanır; arama tek kolonda ve tek index'te kalır. İlişkili kayıtta
+  alan değişince (Dealer.dealer_name) bağlı kayıtların metni yenilenir;
+  bunun için alan ilişkili modelin tracked_fields'ında olmalı
+- View'ın search_fields'ı modelin search_document_fields'ı ile aynı olmalı
+
+Model:
+    class Dealer(SearchDocumentMixin, models.Model):
+        search_document_fields = ('dealer_code', 'dealer_name', ...)
+        search_document = models.TextField(blank=True, default='', editable=False)
+
+        class Meta:
+            indexes = [GinIndex(name='dealer_search_trgm', fields=['search_document'],
+                                opclasses=['gin_trgm_ops'])]
+
+ViewSet (SearchFilter yerine, OrderingFilter'dan sonra):
+    filter_backends = [DjangoFilterBackend, OrderingFilter, DocumentSearchFilter]
+"""
+import functools
+import unicodedata
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+# Türkçe büyük/küçük harf ve aksan katlama (str.lower() 'İ' için 'i̇' üretir)
+TURKISH_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i',
+    'Ş': 's', 'ş': 's',
+    'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u',
+    'Ö': 'o', 'ö': 'o',
+    'Ç': 'c', 'ç': 'c',
+})
+
+
+def normalize_search_text(*values) -> str:
+    """Değerleri birleştirip küçük harfe, Türkçe/aksan katlanmış ve tek boşluklu metne çevir."""
+    text = ' '.join(str(value) for value in values if value).translate(TURKISH_FOLD)
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+def _resolve(obj, path: str):
+    """'dealer__dealer_name' gibi bir yolu instance üzerinde çöz (ara değer None ise None)."""
+    for name in path.split('__'):
+        obj = getattr(obj, name, None)
+        if obj is None:
+            return None
+    return obj
+
+
+@functools.cache
+def _dependent_documents(model) -> tuple:
+    """
+    Metninde model'in alanlarını taşıyan modeller.
+
+    Returns:
+        ((bağlı model, ilişki adı, model'in alanları), ...)
+    """
+    dependents = []
+    for candidate in apps.get_models():
+        related = {}
+        for path in getattr(candidate, 'search_document_fields', ()):
+            if '__' not in path:
+                continue
+            relation, field = path.split('__', 1)
+            if candidate._meta.get_field(relation).related_model is model:
+                related.setdefault(relation, []).append(field)
+        dependents += [(candidate, relation, tuple(fields)) for relation, fields in related.items()]
+    return tuple(dependents)
+
+
+class SearchDocumentMixin:
+    """
+    Model mixin'i: save() sırasında search_document_fields'tan search_document üretir.
+    Sinyal üretmeyen toplu işlemlerde (bulk_create) build_search_document() elle
+    çağrılmalı; mevcut kayıtlar için: manage.py rebuild_search_documents
+    """
+    search_document_fields = ()
+
+    def build_search_document(self) -> str:
+        return normalize_search_text(*(_resolve(self, field) for field in self.search_document_fields))
+
+    def save(self, *args, **kwargs):
+        # Kısmi kayıtlarda (örn. update_fields=['fb_push_status']) metin kaynakları
+        # değişmez; ilişkili alanları çözmek için ek sorgu yapılmaz
+        update_fields = kwargs.get('update_fields')
+        local_fields = {field.split('__', 1)[0] for field in self.search_document_fields}
+        if update_fields is None or set(update_fields) & local_fields:
+            self.search_document = self.build_search_document()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_document'}
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            self._refresh_dependent_documents()
+
+    def _refresh_dependent_documents(self) -> None:
+        """Bu kaydın alanlarını metninde taşıyan bağlı kayıtları yenile (alan değiştiyse)."""
+        for model, relation, fields in _dependent_documents(type(self)):
+            # ChangeTrackingMixin: save() snapshot'ı super().save() döndükten sonra yeniler
+            has_changed = getattr(self, 'has_changed', None)
+            if has_changed is not None and not has_changed(*fields):
+                continue
+            queryset = model._base_manager.using(self._state.db).filter(**{relation: self})
+            refresh_search_documents(model, queryset=queryset)
+
+
+def refresh_search_documents(model, batch_size: int = 2000, queryset=None) -> int:
+    """
+    Mevcut kayıtların search_document'ını yeniden hesapla.
+
+    Args:
+        queryset: Yenilenecek kayıtlar (varsayılan: aktif brand DB'sindeki tümü)
+
+    Returns:
+        Güncellenen kayıt sayısı
+    """
+    fields = model.search_document_fields
+    relations = sorted({field.rsplit('__', 1)[0] for field in fields if '__' in field})
+    queryset = model._base_manager.all() if queryset is None else queryset
+    queryset = (
+        queryset.select_related(*relations)
+        .only('pk', 'search_document', *relations, *fields)
+        .order_by('pk')
+    )
+    manager = model._base_manager.db_manager(queryset.db)
+
+    changed, updated = [], 0
+    for obj in queryset.iterator(chunk_size=batch_size):
+        document = obj.build_search_document()
+        if document != obj.search_document:
+            obj.search_document = document
+            changed.append(obj)
+        if len(changed) >= batch_size:
+            updated += manager.bulk_update(changed, ['search_document'])
+            changed = []
+    if changed:
+        updated += manager.bulk_update(changed, ['search_document'])
+    return updated
+
+
+class DocumentSearchFilter(SearchFilter):
+    """
+    SearchFilter'ın search_document tabanlı karşılığı (?search=).
+
+    Tüm terimler (AND) model'in search_document'ında aranır; view'ın
+    search_fields'ı (lookup önekleri hariç) model'in search_document_fields'ı
+    ile aynı olmalı, aksi halde metin beyan edilenden farklı alanları arar.
+
+    Postgres'te, istekte ?ordering= yoksa sonuçlar benzerliğe göre sıralanır;
+    bunun için OrderingFilter'dan sonra listelenmelidir.
+    """
+
+    def get_search_terms(self, request):
+        return [term for term in map(normalize_search_text, super().get_search_terms(request)) if term]
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+
+        model = queryset.model
+        declared = {field.lstrip('^=@$') for field in search_fields}
+        if declared != set(model.search_document_fields):
+            raise ImproperlyConfigured(
+                f"{type(view).__name__}.search_fields {sorted(declared)} "
+                f"{model.__name__}.search_document_fields ile aynı olmalı"
+            )
+
+        for term in terms:
+            queryset = queryset.filter(search_document__contains=term)
+
+        explicit_ordering = request.query_params.get(OrderingFilter.ordering_param)
+        if connections[queryset.db].vendor == 'postgresql' and not explicit_ordering:
+            from django.contrib.postgres.search import TrigramWordSimilarity
+            queryset = queryset.annotate(
+                search_rank=TrigramWordSimilarity(' '.join(terms), 'search_document')
+            ).order_by('-search_rank', *(queryset.query.order_by or model._meta.ordering))
+
+        return queryset
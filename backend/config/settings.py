@@ -2,6 +2,8 @@
 Django settings for Ford Bayi Otomasyonu project.
 """
 import os
+import tempfile
+import warnings
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
@@ -81,6 +83,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files in production
     'corsheaders.middleware.CorsMiddleware',
+    'config.query_accounting.QueryAccountingMiddleware',  # Query sayısı / Server-Timing / N+1
     'config.brand_middleware.BrandMiddleware',  # Multi-tenant brand detection
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -118,48 +121,153 @@ WSGI_APPLICATION = 'config.wsgi.application'
 DATABASE_URL_FORD = config('DATABASE_URL_FORD', default=None)
 DATABASE_URL_TOFAS = config('DATABASE_URL_TOFAS', default=None)
 
+# Connection Pool (psycopg3 + Django 5 native pool)
+# Her gunicorn worker'ı brand başına bir pool tutar; pool'lar worker boot'unda
+# ısıtılır (gunicorn.conf.py → config.db_pool.warm_up_pools).
+# Pool kapalıysa persistent connection (CONN_MAX_AGE) kullanılır.
+DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=True, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=8, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=float)  # checkout bekleme süresi (sn)
+DB_POOL_MAX_IDLE = config('DB_POOL_MAX_IDLE', default=300, cast=float)  # boşta bekleyen bağlantı ömrü (sn)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)  # pool kapalıyken
+
+
+def _configure_connection(db):
+    """Brand DB ayarlarına pool veya persistent connection ayarlarını ekle"""
+    # Bağlantı sağlık kontrolü. Pool kapalıyken request başında yapılır; pool
+    # açıkken Django request başındaki kontrolü atlar ve bunun yerine pool'u
+    # check=ConnectionPool.check_connection ile kurar (her checkout'ta denenir,
+    # failover sonrası ölü bağlantı verilmez). Bu yüzden OPTIONS['pool']'a ayrıca
+    # 'check' yazılmaz (aynı argüman iki kez verilir, pool kurulamaz).
+    db['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL_ENABLED:
+        # Pool, persistent connection ile birlikte kullanılamaz
+        db['CONN_MAX_AGE'] = 0
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'max_idle': DB_POOL_MAX_IDLE,
+        }
+    else:
+        db['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    return db
+
+
+def _default_connection(db):
+    """
+    'default' alias (migration / brand'siz işler): brand DB'sinin ayarları,
+    kendi OPTIONS'ı ve pool'suz (her worker'da üçüncü bir pool açılmasın).
+    """
+    options = {key: value for key, value in db.get('OPTIONS', {}).items() if key != 'pool'}
+    return {**db, 'OPTIONS': options, 'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else db['CONN_MAX_AGE']}
+
+
 if DATABASE_URL_FORD and DATABASE_URL_TOFAS:
     # Production: Ayrı URL'lerden konfigüre et
-    _ford_db = dj_database_url.config(default=DATABASE_URL_FORD, conn_max_age=600)
-    _tofas_db = dj_database_url.config(default=DATABASE_URL_TOFAS, conn_max_age=600)
+    _ford_db = _configure_connection(dj_database_url.config(default=DATABASE_URL_FORD))
+    _tofas_db = _configure_connection(dj_database_url.config(default=DATABASE_URL_TOFAS))
     DATABASES = {
-        'default': _ford_db.copy(),  # Migration için default gerekli
+        'default': _default_connection(_ford_db),  # Migration için default gerekli
         'ford': _ford_db,
         'tofas': _tofas_db,
     }
 else:
     # Development: Local PostgreSQL (tek user, iki database)
-    _ford_db = {
+    _ford_db = _configure_connection({
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': config('FORD_DB_NAME', default='ford_db'),
         'USER': config('FORD_DB_USER', default='postgres'),
         'PASSWORD': config('FORD_DB_PASSWORD', default='postgres'),
         'HOST': config('FORD_DB_HOST', default='postgres'),
         'PORT': config('FORD_DB_PORT', default='5432'),
-    }
-    _tofas_db = {
+    })
+    _tofas_db = _configure_connection({
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': config('TOFAS_DB_NAME', default='tofas_db'),
         'USER': config('TOFAS_DB_USER', default='postgres'),
         'PASSWORD': config('TOFAS_DB_PASSWORD', default='postgres'),
         'HOST': config('TOFAS_DB_HOST', default='postgres'),
         'PORT': config('TOFAS_DB_PORT', default='5432'),
-    }
+    })
     DATABASES = {
-        'default': _ford_db.copy(),  # Migration için default gerekli
+        'default': _default_connection(_ford_db),  # Migration için default gerekli
         'ford': _ford_db,
         'tofas': _tofas_db,
     }
 
+# Read Replica'lar (opsiyonel): ford_replica / tofas_replica
+# Production: DATABASE_URL_FORD_REPLICA / DATABASE_URL_TOFAS_REPLICA
+# Development: FORD_DB_REPLICA_HOST / TOFAS_DB_REPLICA_HOST (diğer ayarlar primary'den)
+# Safe-method (GET/HEAD/OPTIONS) okumaları replica'ya gider; write sonrası
+# kullanıcı REPLICA_STICKY_SECONDS boyunca primary'ye yapışır.
+for _brand, _primary_db in (('ford', _ford_db), ('tofas', _tofas_db)):
+    _replica_url = config(f'DATABASE_URL_{_brand.upper()}_REPLICA', default=None)
+    _replica_host = config(f'{_brand.upper()}_DB_REPLICA_HOST', default=None)
+    if _replica_url:
+        _replica_db = _configure_connection(dj_database_url.parse(_replica_url))
+    elif _replica_host:
+        _replica_db = _configure_connection({
+            **_primary_db,
+            'HOST': _replica_host,
+            'PORT': config(f'{_brand.upper()}_DB_REPLICA_PORT', default=_primary_db['PORT']),
+            'OPTIONS': {**_primary_db.get('OPTIONS', {})},
+        })
+    else:
+        continue
+    # Testlerde replica primary'nin aynası olur
+    _replica_db['TEST'] = {'MIRROR': _brand}
+    DATABASES[f'{_brand}_replica'] = _replica_db
+
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+REPLICA_HEALTH_CHECK_INTERVAL = config('REPLICA_HEALTH_CHECK_INTERVAL', default=5, cast=float)
+
 # Database Router - Brand'e göre DB seçimi
 DATABASE_ROUTERS = ['config.db_router.BrandDatabaseRouter']
 
-# Cache (Simple in-memory cache for development)
-CACHES = {
-    'default': {
+# Cache - gunicorn worker'ları ve container'lar arasında paylaşımlı
+# CACHE_URL:
+#   redis://host:6379/0        → Redis (production'da gerekli)
+#   file:///tmp/ford-cache     → Dosya tabanlı (varsayılan; container bazlı, atomik değil)
+#   locmem://                  → Process bazlı (sadece tek process'li testler için)
+# Tüm key'ler config.cache.make_brand_key ile aktif brand'e göre prefix'lenir
+CACHE_URL = config('CACHE_URL', default=f"file://{os.path.join(tempfile.gettempdir(), 'ford-cache')}")
+
+# Brand cache, istatistikler, replica yapışkanlığı ve Meta API token bucket'ı
+# container'lar arası paylaşım ve atomik incr ister. Redis yoksa uygulama yine
+# açılır (deploy'u kırmasın) ama her process başlangıcında uyarı verilir.
+if not DEBUG and not CACHE_URL.startswith(('redis://', 'rediss://')):
+    warnings.warn(
+        f'DEBUG kapalı ama CACHE_URL Redis değil ({CACHE_URL or "tanımsız"}): cache container '
+        f'bazlı kalır, Meta API token bucket devre dışıdır. CACHE_URL=redis://... ayarlayın.',
+        RuntimeWarning,
+    )
+
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    _cache_backend = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    }
+elif CACHE_URL.startswith('file://'):
+    _cache_backend = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_URL[len('file://'):],
+    }
+else:
+    _cache_backend = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'ford-cache',
     }
+
+CACHES = {
+    'default': {
+        **_cache_backend,
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='ford-bayi'),
+        'KEY_FUNCTION': 'config.cache.make_brand_key',
+        'TIMEOUT': config('CACHE_DEFAULT_TIMEOUT', default=300, cast=int),
+    }
 }
 
 # Password validation
@@ -230,7 +338,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # BrandMiddleware'in doğruladığı token'ı tekrar kullanır (tek doğrulama)
+        'config.authentication.BrandJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -256,6 +365,33 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Auth principal cache (role, dealer_id, is_active) - saniye cinsinden TTL
+# User.save / soft_delete / restore cache'i invalidate eder
+AUTH_PRINCIPAL_CACHE_TTL = config('AUTH_PRINCIPAL_CACHE_TTL', default=60, cast=int)
+
+# Status istatistikleri cache süresi (config.status_stats) - model kaydında invalidate edilir
+STATUS_STATS_CACHE_TTL = config('STATUS_STATS_CACHE_TTL', default=300, cast=int)
+
+# Dashboard / istatistikler bayi aylık özet tablosundan okunsun mu (apps.dealers.summaries)
+# Tablo dealers.0015 migration'ında doldurulur; tutarsızlıkta: python manage.py rebuild_dealer_summaries --brand all
+DEALER_SUMMARY_READS = config('DEALER_SUMMARY_READS', default=True, cast=bool)
+
+# by_status board'larında kolon başına kayıt sayısı (config.status_board)
+STATUS_BOARD_LIMIT = config('STATUS_BOARD_LIMIT', default=10, cast=int)
+STATUS_BOARD_MAX_LIMIT = config('STATUS_BOARD_MAX_LIMIT', default=100, cast=int)
+
+# ?count=estimated / ?cursor= modlarında sınırlı sayımın üst sınırı (config.pagination)
+# Filtresiz listede tablo bu boyutu aşarsa Postgres reltuples tahmini kullanılır
+PAGINATION_COUNT_CAP = config('PAGINATION_COUNT_CAP', default=10000, cast=int)
+
+# Query accounting (config.query_accounting)
+# Request başına sorgu bütçesi aşılırsa / aynı SQL şekli eşik kadar tekrarlanırsa loglanır
+QUERY_ACCOUNTING_ENABLED = config('QUERY_ACCOUNTING_ENABLED', default=True, cast=bool)
+QUERY_BUDGET = config('QUERY_BUDGET', default=20, cast=int)
+QUERY_N_PLUS_ONE_THRESHOLD = config('QUERY_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+# Server-Timing header'ı (alias bazlı DB süreleri) herkese gösterilsin mi; kapalıyken sadece admin görür
+QUERY_SERVER_TIMING = config('QUERY_SERVER_TIMING', default=DEBUG, cast=bool)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -289,3 +425,35 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@tofas.com.tr')
+
+# E-posta kuyruğu (apps.users.email_utils, manage.py send_outbox_emails)
+# Worker tek SMTP bağlantısıyla batch gönderir; hatada üstel bekleme ile tekrar dener
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = config('EMAIL_OUTBOX_RETRY_BASE_SECONDS', default=30, cast=int)
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = config('EMAIL_OUTBOX_RETRY_MAX_SECONDS', default=3600, cast=int)
+
+# Toplu duyuru e-postaları (manage.py send_broadcasts): chunk başına alıcı, saniyede en fazla e-posta (0: sınırsız)
+EMAIL_BROADCAST_CHUNK_SIZE = config('EMAIL_BROADCAST_CHUNK_SIZE', default=100, cast=int)
+EMAIL_BROADCAST_RATE = config('EMAIL_BROADCAST_RATE', default=10, cast=float)
+
+# Facebook gönderim işleri (apps.campaigns.services.facebook_push, manage.py run_facebook_push_jobs)
+# Bu süreden uzun 'running' kalan iş (worker çöktü) başarısız sayılır; Graph API zinciri
+# idempotent olmadığından otomatik tekrar denenmez, admin yeniden gönderir
+FB_PUSH_JOB_TIMEOUT_SECONDS = config('FB_PUSH_JOB_TIMEOUT_SECONDS', default=900, cast=int)
+# Worker kuyrukta birden çok iş bulursa bu kadarını tek Graph API batch akışıyla gönderir (1: batch yok)
+FB_PUSH_BATCH_SIZE = config('FB_PUSH_BATCH_SIZE', default=12, cast=int)
+
+# Meta Graph API rate limit (apps.campaigns.services.meta_api_client)
+# Reklam hesabı başına paylaşımlı token bucket: pencere başına RATE_PER_SECOND * WINDOW_SECONDS istek;
+# kullanım (x-business-use-case-usage / x-app-usage) THRESHOLD yüzdesini geçince kapasite doğrusal düşer,
+# PAUSE yüzdesinde hesap bir pencere durdurulur
+META_API_RATE_PER_SECOND = config('META_API_RATE_PER_SECOND', default=5, cast=float)
+META_API_WINDOW_SECONDS = config('META_API_WINDOW_SECONDS', default=10, cast=int)
+META_API_USAGE_THRESHOLD = config('META_API_USAGE_THRESHOLD', default=75, cast=float)
+META_API_USAGE_PAUSE = config('META_API_USAGE_PAUSE', default=95, cast=float)
+# Throttling hatalarında jitter'lı üstel bekleme ile tekrar; beklenecek süre MAX_WAIT'i aşarsa hata
+META_API_MAX_RETRIES = config('META_API_MAX_RETRIES', default=5, cast=int)
+META_API_RETRY_BASE_SECONDS = config('META_API_RETRY_BASE_SECONDS', default=2, cast=float)
+META_API_RETRY_MAX_SECONDS = config('META_API_RETRY_MAX_SECONDS', default=120, cast=float)
+META_API_MAX_WAIT_SECONDS = config('META_API_MAX_WAIT_SECONDS', default=300, cast=float)
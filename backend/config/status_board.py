@@ -0,0 +1,125 @@
+"""
+Status Boards (Kanban)
+
+Kampanya / teşvik / görsel by_status board'ları tek sorguyla üretilir:
+
+    ROW_NUMBER() OVER (PARTITION BY status ORDER BY created_at DESC, id DESC)
+    COUNT(*)     OVER (PARTITION BY status)
+
+Her status'un ilk N kaydı ve status toplamı aynı taramadan gelir (status
+başına COUNT + slice sorgusu yerine).
+
+"Daha fazla yükle": Kolonun next_cursor'ı ile ?column=<status>&cursor=<...>
+çağrılır; sadece o kolonun sonraki N kaydı döner (keyset pagination).
+
+Usage:
+    @action(detail=False, methods=['get'])
+    def by_status(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(status_board(queryset, CampaignRequestSerializer, request))
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(obj, order_field: str = 'created_at') -> str:
+    value = getattr(obj, order_field)
+    raw = f'{value.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValidationError({'cursor': 'Geçersiz cursor.'})
+
+
+def _board_limit(request) -> int:
+    try:
+        limit = int(request.query_params.get('limit', settings.STATUS_BOARD_LIMIT))
+    except ValueError:
+        raise ValidationError({'limit': 'Sayı olmalı.'})
+    return max(1, min(limit, settings.STATUS_BOARD_MAX_LIMIT))
+
+
+def status_board(queryset, serializer_class, request, status_field: str = 'status', order_field: str = 'created_at') -> dict:
+    """
+    by_status board'unu üret.
+
+    Args:
+        queryset: Filtrelenmiş queryset
+        serializer_class: Kart serializer'ı
+        request: DRF request (limit / column / cursor parametreleri)
+
+    Query params:
+        limit: Kolon başına kayıt (varsayılan STATUS_BOARD_LIMIT)
+        column + cursor: Sadece bu kolonun cursor'dan sonraki kayıtları
+
+    Returns:
+        {status: {'label', 'count', 'requests', 'next_cursor'}}
+        (column modunda 'count' dönmez)
+    """
+    limit = _board_limit(request)
+    labels = dict(queryset.model._meta.get_field(status_field).choices)
+
+    column = request.query_params.get('column')
+    if column:
+        if column not in labels:
+            raise ValidationError({'column': 'Geçersiz status.'})
+        return {column: _load_more(queryset, serializer_class, column, labels[column],
+                                   request.query_params.get('cursor'), limit, status_field, order_field)}
+
+    ordering = [F(order_field).desc(), F('pk').desc()]
+    rows = list(
+        queryset.annotate(
+            board_rank=Window(RowNumber(), partition_by=[F(status_field)], order_by=ordering),
+            board_total=Window(Count('pk'), partition_by=[F(status_field)]),
+        )
+        .filter(board_rank__lte=limit)
+        .order_by(status_field, '-' + order_field, '-pk')
+    )
+
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(getattr(row, status_field), []).append(row)
+
+    board = {}
+    for code, label in labels.items():
+        items = grouped.get(code, [])
+        count = items[0].board_total if items else 0
+        board[code] = {
+            'label': label,
+            'count': count,
+            'requests': serializer_class(items, many=True).data,
+            'next_cursor': encode_cursor(items[-1], order_field) if count > len(items) else None,
+        }
+    return board
+
+
+def _load_more(queryset, serializer_class, column, label, cursor, limit, status_field, order_field) -> dict:
+    queryset = queryset.filter(**{status_field: column})
+
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{order_field}__lt': value}) | Q(**{order_field: value, 'pk__lt': pk})
+        )
+
+    items = list(queryset.order_by('-' + order_field, '-pk')[:limit + 1])
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    return {
+        'label': label,
+        'requests': serializer_class(items, many=True).data,
+        'next_cursor': encode_cursor(items[-1], order_field) if has_more else None,
+    }
@@ -0,0 +1,113 @@
+"""
+Status Statistics
+
+Kampanya / teşvik / görsel talepleri için toplam, tutar, ortalama ve
+status bazlı sayıları tek bir conditional aggregation sorgusuyla hesaplar
+(status başına ayrı COUNT yerine).
+
+Sonuçlar brand_cache'te model namespace'i altında, queryset'in SQL
+imzasına göre cache'lenir (filtre / rol / bayi farkları ayrı key olur).
+Model kaydedildiğinde / silindiğinde namespace invalidate edilir
+(register_status_statistics, AppConfig.ready içinde).
+
+Usage:
+    stats = status_statistics(
+        queryset,
+        sums={'total_budget': 'budget'},
+        averages={'avg_budget': 'budget'},
+    )
+    # {'total_count': 12, 'total_budget': ..., 'avg_budget': ...,
+    #  'by_status': {'taslak': {'label': 'Taslak', 'count': 3}, ...}}
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Avg, Count, Q, Sum
+
+from .cache import brand_cache, invalidate_on_change, model_namespace
+
+
+def register_status_statistics(*models) -> None:
+    """Model değiştiğinde cache'lenmiş istatistikleri geçersiz kıl."""
+    invalidate_on_change(*models)
+
+
+def invalidate_status_statistics(*models, brand: str | None = None) -> None:
+    """
+    Sinyal üretmeyen toplu işlemler (update / bulk_create) sonrası
+    istatistik cache'ini elle geçersiz kıl.
+    """
+    for model in models:
+        brand_cache.invalidate(model_namespace(model), brand=brand)
+
+
+def _signature(queryset) -> str:
+    """Queryset'in filtre imzası (SQL + parametreler)."""
+    return hashlib.sha1(str(queryset.query).encode()).hexdigest()
+
+
+def _compute(queryset, status_field: str, sums: dict, averages: dict) -> dict:
+    status_choices = queryset.model._meta.get_field(status_field).choices
+
+    aggregates = {'total_count': Count('pk')}
+    aggregates.update({name: Sum(field) for name, field in sums.items()})
+    aggregates.update({name: Avg(field) for name, field in averages.items()})
+    aggregates.update({
+        f'status__{code}': Count('pk', filter=Q(**{status_field: code}))
+        for code, _ in status_choices
+    })
+
+    # Sıralama aggregate'i etkilemez; ORDER BY'ı sorgudan çıkar
+    row = queryset.order_by().aggregate(**aggregates)
+
+    stats = {name: row[name] for name in ['total_count', *sums, *averages]}
+    stats['by_status'] = {
+        code: {'label': label, 'count': row[f'status__{code}']}
+        for code, label in status_choices
+    }
+    return stats
+
+
+def status_statistics(
+    queryset,
+    sums: dict | None = None,
+    averages: dict | None = None,
+    status_field: str = 'status',
+    use_cache: bool = True,
+) -> dict:
+    """
+    Filtrelenmiş queryset için tek sorguda istatistik.
+
+    Args:
+        queryset: Filtrelenmiş queryset (view'ın filter_queryset(get_queryset()) sonucu)
+        sums: {'sonuç_adı': 'alan'} toplanacak alanlar
+        averages: {'sonuç_adı': 'alan'} ortalaması alınacak alanlar
+        status_field: Status alanı (choices'lı)
+        use_cache: False ise cache atlanır
+
+    Returns:
+        {'total_count', <sums>, <averages>, 'by_status': {code: {'label', 'count'}}}
+    """
+    sums = sums or {}
+    averages = averages or {}
+
+    def compute():
+        return _compute(queryset, status_field, sums, averages)
+
+    if not use_cache:
+        return compute()
+
+    try:
+        signature = _signature(queryset)
+    except EmptyResultSet:
+        # .none() (örn. bayisi olmayan kullanıcı): SQL'i yok, aggregate sorgusuz sıfır döner
+        return compute()
+
+    key = f'stats:{status_field}:{",".join(sums)}:{",".join(averages)}:{signature}'
+    return brand_cache.get_or_set(
+        model_namespace(queryset.model),
+        key,
+        compute,
+        timeout=settings.STATUS_STATS_CACHE_TTL,
+    )
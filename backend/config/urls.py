@@ -6,13 +6,47 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 from rest_framework.routers import DefaultRouter
 from apps.users.views import UserViewSet
+from apps.users.permissions import IsAdmin
+from config.cache import get_cache_stats
+from config.dashboard import cross_brand_dashboard
+from config.db_pool import get_pool_stats
+from config.replicas import get_replica_status
 
 # Health check view
 def health_check(request):
     return HttpResponse("OK", content_type="text/plain")
 
+
+# DB connection pool ve replica istatistikleri (worker bazlı, admin only)
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def db_pool_stats(request):
+    return Response({**get_pool_stats(), 'replicas': get_replica_status()})
+
+
+# Cache namespace hit ratio'ları (worker bazlı, admin only)
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    return Response(get_cache_stats())
+
+
+# Meta Graph API kullanımı ve rate limit durumu (aktif brand'in reklam hesabı, admin only)
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def meta_api_stats(request):
+    from apps.campaigns.models import MetaAdsConfig
+    from apps.campaigns.services.meta_api_client import get_meta_api_usage
+
+    config = MetaAdsConfig.get_config()
+    if not config:
+        return Response({'ad_account_id': None})
+    return Response(get_meta_api_usage(config.ad_account_id))
+
 # Users router
 users_router = DefaultRouter()
 users_router.register('', UserViewSet, basename='user')
@@ -20,6 +54,12 @@ users_router.register('', UserViewSet, basename='user')
 urlpatterns = [
     # Health check
     path('api/health/', health_check, name='health_check'),
+    path('api/health/db-pools/', db_pool_stats, name='db_pool_stats'),
+    path('api/health/cache/', cache_stats, name='cache_stats'),
+    path('api/health/meta-api/', meta_api_stats, name='meta_api_stats'),
+    
+    # Super-admin cross-brand dashboard (ford + tofas)
+    path('api/dashboard/cross-brand/', cross_brand_dashboard, name='cross_brand_dashboard'),
     
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
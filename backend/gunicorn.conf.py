@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for Ford Bayi Otomasyonu.
+
+Dockerfile CMD'deki bind/worker/thread parametreleri bu dosyadaki
+değerleri ezer; buradaki hook'lar her durumda çalışır.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def post_worker_init(worker):
+    """Worker uygulamayı yükledikten sonra brand DB pool'larını ısıt"""
+    from config.db_pool import warm_up_pools
+    warm_up_pools()
+
+
+def worker_exit(server, worker):
+    """Worker kapanırken pool bağlantılarını düzgünce kapat"""
+    from django.db import connections
+    from config.db_pool import pooled_aliases
+
+    for alias in pooled_aliases():
+        close_pool = getattr(connections[alias], 'close_pool', None)
+        if close_pool:
+            close_pool()